@@ -0,0 +1,155 @@
+import asyncio
+import heapq
+import itertools
+import time
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+
+from metrics import Counter, Histogram
+from order_utils import classify_utterance
+
+ADMISSION_CONFIG = {
+    "max_concurrent": 32,       # turns handled at once; roughly DB workers plus the pure-CPU turns
+    "max_queue": 256,           # turns allowed to wait for a slot
+    "deadline_seconds": 5.0,    # Dialogflow stops waiting for the webhook after this
+    "reserve_seconds": 1.0      # time a turn needs once admitted; waiting past deadline - reserve is pointless
+}
+
+# Lower runs first. Menu, price, stock and status lookups only read, so they
+# are served ahead of turns that may write an order, booking or ticket.
+PRIORITY_READ = 0
+PRIORITY_WRITE = 1
+PRIORITY_NAMES = {PRIORITY_READ: "read", PRIORITY_WRITE: "write"}
+
+READ_INTENTS = {"Product_FAQ", "Product_Details", "Show_Menu", "Check_Status", "View_Cart"}
+
+SHED = Counter("karachibites_admission_shed", "Webhook turns answered with system_error instead of run", ["reason", "priority"])
+WAIT_SECONDS = Histogram("karachibites_admission_wait_seconds", "Time turns waited for an admission slot", ["priority"])
+
+
+class AdmissionRejected(Exception):
+    """Raised when a turn is shed instead of admitted; reason is queue_full, deadline or displaced"""
+
+    def __init__(self, reason: str):
+        super().__init__(f"Webhook turn shed: {reason}")
+        self.reason = reason
+
+
+def request_priority(req: Dict[str, Any]) -> int:
+    """PRIORITY_READ for turns that only look things up, else PRIORITY_WRITE"""
+    query_result = req.get("queryResult", {})
+    if query_result.get("intent", {}).get("displayName", "") in READ_INTENTS:
+        return PRIORITY_READ
+    signals = classify_utterance(query_result.get("queryText", "").strip().lower())
+    if signals.is_price_query or signals.is_stock_query:
+        return PRIORITY_READ
+    return PRIORITY_WRITE
+
+
+class AdmissionController:
+    """Cap concurrent webhook turns, queue the overflow by priority and shed what cannot make the deadline
+
+    A turn that would have to wait past its deadline (less the time it needs
+    to run) is shed straight away rather than timing out at Dialogflow and
+    being retried on top of the backlog. When the queue is full a new read
+    displaces the newest queued write. Turns already running are never
+    interrupted, so a write is either made and answered or not made at all.
+    """
+
+    def __init__(
+        self,
+        max_concurrent: int = ADMISSION_CONFIG["max_concurrent"],
+        max_queue: int = ADMISSION_CONFIG["max_queue"],
+        deadline_seconds: float = ADMISSION_CONFIG["deadline_seconds"],
+        reserve_seconds: float = ADMISSION_CONFIG["reserve_seconds"]
+    ):
+        self.max_concurrent = max_concurrent
+        self.max_queue = max_queue
+        self.deadline_seconds = deadline_seconds
+        self.reserve_seconds = reserve_seconds
+        self._active = 0
+        # (priority, sequence, future); futures resolve when a slot is handed over
+        self._waiting: List[Tuple[int, int, "asyncio.Future[None]"]] = []
+        self._sequence = itertools.count()
+        self._stats = {"admitted": 0, "queued": 0, "shed": 0}
+
+    def _shed(self, reason: str, priority: int) -> AdmissionRejected:
+        self._stats["shed"] += 1
+        SHED.labels(reason, PRIORITY_NAMES[priority]).inc()
+        return AdmissionRejected(reason)
+
+    def _displace_for(self, priority: int) -> bool:
+        """Shed the newest queued turn of a lower priority to make room; False if there is none"""
+        candidates = [entry for entry in self._waiting if entry[0] > priority]
+        if not candidates:
+            return False
+        victim = max(candidates, key=lambda entry: (entry[0], entry[1]))
+        self._waiting.remove(victim)
+        heapq.heapify(self._waiting)
+        victim[2].set_exception(self._shed("displaced", victim[0]))
+        return True
+
+    def _release(self) -> None:
+        if self._waiting:
+            # The slot passes straight to the first waiter; _active stays the same
+            heapq.heappop(self._waiting)[2].set_result(None)
+            return
+        self._active -= 1
+
+    def _abandon(self, entry: Tuple[int, int, "asyncio.Future[None]"]) -> Optional[BaseException]:
+        """Take a waiter that gave up out of the queue; returns its shed error if it had been displaced"""
+        waiter = entry[2]
+        if not waiter.done():
+            waiter.cancel()
+            self._waiting.remove(entry)
+            heapq.heapify(self._waiting)
+            return None
+        if waiter.exception() is not None:
+            return waiter.exception()
+        # Handed a slot just as it gave up; pass the slot on
+        self._release()
+        return None
+
+    @asynccontextmanager
+    async def slot(self, priority: int, arrived: float) -> AsyncIterator[None]:
+        """Hold one admission slot for the enclosed turn; raises AdmissionRejected if shed
+
+        arrived is the time.monotonic() at which the request reached the webhook.
+        """
+        if self._active < self.max_concurrent and not self._waiting:
+            self._active += 1
+        else:
+            budget = arrived + self.deadline_seconds - self.reserve_seconds - time.monotonic()
+            if budget <= 0:
+                raise self._shed("deadline", priority)
+            if len(self._waiting) >= self.max_queue and not self._displace_for(priority):
+                raise self._shed("queue_full", priority)
+
+            entry = (priority, next(self._sequence), asyncio.get_running_loop().create_future())
+            heapq.heappush(self._waiting, entry)
+            self._stats["queued"] += 1
+            queued_at = time.monotonic()
+            try:
+                await asyncio.wait_for(asyncio.shield(entry[2]), timeout=budget)
+            except asyncio.TimeoutError:
+                raise self._abandon(entry) or self._shed("deadline", priority)
+            except asyncio.CancelledError:
+                self._abandon(entry)
+                raise
+            finally:
+                WAIT_SECONDS.labels(PRIORITY_NAMES[priority]).observe(time.monotonic() - queued_at)
+
+        self._stats["admitted"] += 1
+        try:
+            yield
+        finally:
+            self._release()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            **self._stats,
+            "active": self._active,
+            "waiting": len(self._waiting),
+            "max_concurrent": self.max_concurrent,
+            "max_queue": self.max_queue
+        }
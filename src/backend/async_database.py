@@ -0,0 +1,178 @@
+import asyncio
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional, Tuple, Union
+
+import database
+from datetime_parser import ParsedDateTime
+from metrics import Histogram
+from write_behind import get_write_behind
+
+logger = logging.getLogger(__name__)
+
+# mysql.connector is blocking, so DB calls run on a thread pool sized to the
+# connection pool. Calls beyond that queue up to max_pending; past that they
+# wait at most queue_timeout before DatabaseBusyError (back-pressure).
+DB_EXECUTOR_CONFIG = {
+    "max_workers": database.DB_POOL_CONFIG["max_size"],
+    "max_pending": 100,     # calls allowed to queue behind busy workers
+    "queue_timeout": 5.0    # seconds a call may wait for a queue slot
+}
+
+# From run_db() being called to the function starting on a DB thread
+DB_QUEUE_SECONDS = Histogram(
+    "karachibites_db_queue_seconds", "Wait for a database executor slot and thread", ["function"]
+)
+
+
+class DatabaseBusyError(Exception):
+    """Raised when the database executor queue is full for longer than queue_timeout"""
+
+
+_executor: Optional[ThreadPoolExecutor] = None
+_executor_lock = threading.Lock()
+_slots: Optional[asyncio.Semaphore] = None
+_stats = {"submitted": 0, "rejected": 0, "in_flight": 0}
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(
+                    max_workers=DB_EXECUTOR_CONFIG["max_workers"],
+                    thread_name_prefix="db"
+                )
+    return _executor
+
+
+def _get_slots() -> asyncio.Semaphore:
+    global _slots
+    if _slots is None:
+        _slots = asyncio.Semaphore(DB_EXECUTOR_CONFIG["max_workers"] + DB_EXECUTOR_CONFIG["max_pending"])
+    return _slots
+
+
+async def run_db(func: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+    """Run a blocking database function on the DB executor without stalling the event loop"""
+    slots = _get_slots()
+    queued = time.perf_counter()
+    queue_wait = DB_QUEUE_SECONDS.labels(getattr(func, "__name__", "unknown"))
+    try:
+        await asyncio.wait_for(slots.acquire(), timeout=DB_EXECUTOR_CONFIG["queue_timeout"])
+    except asyncio.TimeoutError:
+        _stats["rejected"] += 1
+        raise DatabaseBusyError("Database queue is full")
+
+    _stats["submitted"] += 1
+    _stats["in_flight"] += 1
+    try:
+        loop = asyncio.get_running_loop()
+
+        def call() -> Any:
+            queue_wait.observe(time.perf_counter() - queued)
+            return func(*args, **kwargs)
+
+        return await loop.run_in_executor(_get_executor(), call)
+    finally:
+        _stats["in_flight"] -= 1
+        slots.release()
+
+
+def shutdown_executor() -> None:
+    """Stop the DB executor after in-flight calls finish"""
+    global _executor
+    with _executor_lock:
+        if _executor is not None:
+            _executor.shutdown(wait=True)
+            _executor = None
+
+
+def get_executor_stats() -> Dict[str, Any]:
+    """Return DB executor counters"""
+    return {
+        **_stats,
+        "max_workers": DB_EXECUTOR_CONFIG["max_workers"],
+        "max_pending": DB_EXECUTOR_CONFIG["max_pending"]
+    }
+
+
+async def create_order(items: List[Tuple[str, int]]) -> Tuple[bool, str, Optional[int]]:
+    return await run_db(database.create_order, items)
+
+
+async def get_order_status(order_id: str) -> Tuple[bool, Optional[Dict], str]:
+    return await run_db(database.get_order_status, order_id)
+
+
+async def update_order_status(order_id: int, status: str) -> Tuple[bool, str]:
+    return await run_db(database.update_order_status, order_id, status)
+
+
+async def get_order_ready_at(order_id: int) -> Optional[datetime]:
+    # Read from the in-memory kitchen queue; no executor hop
+    return database.get_order_ready_at(order_id)
+
+
+async def get_menu_item_details(item_name: str) -> Tuple[bool, Optional[Dict], str]:
+    # A warm catalog lookup is pure in-memory work; skip the executor hop
+    if database.menu_catalog.is_warm():
+        return database.get_menu_item_details(item_name)
+    return await run_db(database.get_menu_item_details, item_name)
+
+
+async def price_order_items(items: List[Tuple[str, int]]) -> Tuple[bool, Optional[Dict], str]:
+    # Same as get_menu_item_details: only a cold catalog needs the executor
+    if database.menu_catalog.is_warm():
+        return database.price_order_items(items)
+    return await run_db(database.price_order_items, items)
+
+
+async def create_reservation(guests: int, datetime_param: Union[ParsedDateTime, str, dict, list]) -> Tuple[bool, str, Optional[int]]:
+    return await run_db(database.create_reservation, guests, datetime_param)
+
+
+async def get_available_slots(guests: int, start: Optional[datetime] = None, count: int = 3) -> List[datetime]:
+    return await run_db(database.get_available_slots, guests, start, count)
+
+
+async def create_support_ticket(
+    session_id: str,
+    name: Any,
+    phone_number: Optional[str],
+    issue_type: str,
+    description: str
+) -> Tuple[bool, str]:
+    write_behind = get_write_behind()
+    if write_behind is not None and write_behind.enqueue("support_ticket", {
+        "session_id": session_id,
+        "customer_name": database.extract_name_value(name),
+        "phone": phone_number,
+        "user_message": description,
+        "issue_category": issue_type
+    }):
+        return True, "Support ticket queued"
+    return await run_db(database.create_support_ticket, session_id, name, phone_number, issue_type, description)
+
+
+async def submit_customer_feedback(
+    user_id: Optional[str],
+    name: Any,
+    phone_number: Optional[str],
+    feedback_text: str,
+    source_platform: str = "chatbot"
+) -> Tuple[bool, str]:
+    write_behind = get_write_behind()
+    if write_behind is not None and write_behind.enqueue("feedback", {
+        "session_id": user_id,
+        "customer_name": database.extract_name_value(name),
+        "phone": phone_number,
+        "feedback_text": feedback_text,
+        "source_platform": source_platform
+    }):
+        return True, "Feedback queued"
+    return await run_db(database.submit_customer_feedback, user_id, name, phone_number, feedback_text, source_platform)
@@ -0,0 +1,226 @@
+import threading
+import time
+import logging
+from collections import deque
+from typing import Any, Callable, Deque, Dict, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+class PoolTimeoutError(Exception):
+    """Raised when no pooled connection becomes available within the checkout timeout"""
+
+
+class ConnectionPool:
+    """Bounded, thread-safe pool of DB-API connections with health checks and idle recycling"""
+
+    def __init__(
+        self,
+        connect: Callable[[], Any],
+        min_size: int = 2,
+        max_size: int = 10,
+        checkout_timeout: float = 5.0,
+        health_check_on_borrow: bool = True,
+        max_idle_seconds: float = 300.0,
+        max_lifetime_seconds: float = 3600.0
+    ):
+        if min_size < 0 or max_size < 1 or min_size > max_size:
+            raise ValueError("Pool sizes must satisfy 0 <= min_size <= max_size and max_size >= 1")
+
+        self._connect = connect
+        self.min_size = min_size
+        self.max_size = max_size
+        self.checkout_timeout = checkout_timeout
+        self.health_check_on_borrow = health_check_on_borrow
+        self.max_idle_seconds = max_idle_seconds
+        self.max_lifetime_seconds = max_lifetime_seconds
+
+        self._lock = threading.Condition(threading.Lock())
+        # Idle connections as (conn, created_at, returned_at); most recently returned on the right
+        self._idle: Deque[Tuple[Any, float, float]] = deque()
+        self._created_at: Dict[int, float] = {}
+        self._in_use = 0
+        self._waiting = 0
+        self._closed = False
+
+        self._stats = {
+            "created": 0,
+            "recycled": 0,
+            "failed_health_checks": 0,
+            "checkouts": 0,
+            "timeouts": 0,
+            "wait_time_total": 0.0
+        }
+
+    def _open(self) -> Any:
+        """Open a new physical connection (called without the lock held)"""
+        conn = self._connect()
+        with self._lock:
+            self._created_at[id(conn)] = time.monotonic()
+            self._stats["created"] += 1
+        return conn
+
+    def _discard(self, conn: Any) -> None:
+        """Close a physical connection, ignoring errors from already-dead sockets"""
+        self._created_at.pop(id(conn), None)
+        try:
+            conn.close()
+        except Exception:
+            pass
+
+    def _is_expired(self, created_at: float, returned_at: float, now: float) -> bool:
+        if self.max_idle_seconds and now - returned_at > self.max_idle_seconds:
+            return True
+        if self.max_lifetime_seconds and now - created_at > self.max_lifetime_seconds:
+            return True
+        return False
+
+    def _is_healthy(self, conn: Any) -> bool:
+        try:
+            return bool(conn.is_connected())
+        except Exception:
+            return False
+
+    def warm_up(self) -> None:
+        """Open connections until the pool holds at least min_size idle connections"""
+        while True:
+            with self._lock:
+                if self._closed or len(self._idle) + self._in_use >= self.min_size:
+                    return
+                # Reserve the slot so concurrent warm-ups don't overshoot
+                self._in_use += 1
+            try:
+                conn = self._open()
+            except Exception as e:
+                with self._lock:
+                    self._in_use -= 1
+                    self._lock.notify()
+                logger.error(f"Connection pool warm-up failed: {e}")
+                return
+            with self._lock:
+                self._in_use -= 1
+                self._idle.append((conn, self._created_at.get(id(conn), time.monotonic()), time.monotonic()))
+                self._lock.notify()
+
+    def acquire(self, timeout: Optional[float] = None) -> Any:
+        """Borrow a connection, opening a new one if below max_size or waiting for a return"""
+        timeout = self.checkout_timeout if timeout is None else timeout
+        deadline = time.monotonic() + timeout
+        wait_started = time.monotonic()
+
+        while True:
+            candidate = None
+            open_new = False
+            with self._lock:
+                if self._closed:
+                    raise PoolTimeoutError("Connection pool is closed")
+
+                while not self._idle and self._in_use >= self.max_size:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        self._stats["timeouts"] += 1
+                        raise PoolTimeoutError(
+                            f"Timed out after {timeout:.1f}s waiting for a database connection "
+                            f"({self._in_use}/{self.max_size} in use)"
+                        )
+                    self._waiting += 1
+                    try:
+                        self._lock.wait(remaining)
+                    finally:
+                        self._waiting -= 1
+
+                if self._idle:
+                    candidate = self._idle.pop()
+                else:
+                    open_new = True
+                self._in_use += 1
+
+            if open_new:
+                try:
+                    conn = self._open()
+                except Exception:
+                    self._release_slot()
+                    raise
+                self._record_checkout(wait_started)
+                return conn
+
+            conn, created_at, returned_at = candidate
+            now = time.monotonic()
+            if self._is_expired(created_at, returned_at, now):
+                self._discard(conn)
+                with self._lock:
+                    self._stats["recycled"] += 1
+                self._release_slot()
+                continue
+
+            if self.health_check_on_borrow and not self._is_healthy(conn):
+                self._discard(conn)
+                with self._lock:
+                    self._stats["failed_health_checks"] += 1
+                    self._stats["recycled"] += 1
+                self._release_slot()
+                continue
+
+            self._record_checkout(wait_started)
+            return conn
+
+    def _record_checkout(self, wait_started: float) -> None:
+        with self._lock:
+            self._stats["checkouts"] += 1
+            self._stats["wait_time_total"] += time.monotonic() - wait_started
+
+    def _release_slot(self) -> None:
+        with self._lock:
+            self._in_use -= 1
+            self._lock.notify()
+
+    def release(self, conn: Any, discard: bool = False) -> None:
+        """Return a borrowed connection; broken or discarded connections are closed instead"""
+        if not discard:
+            try:
+                # Never hand the next borrower an open transaction
+                if getattr(conn, "in_transaction", False):
+                    conn.rollback()
+            except Exception:
+                discard = True
+
+        with self._lock:
+            self._in_use -= 1
+            if not discard and not self._closed:
+                created_at = self._created_at.get(id(conn), time.monotonic())
+                self._idle.append((conn, created_at, time.monotonic()))
+                self._lock.notify()
+                return
+            self._lock.notify()
+
+        self._discard(conn)
+        with self._lock:
+            self._stats["recycled"] += 1
+
+    def close(self) -> None:
+        """Close every idle connection and refuse further checkouts"""
+        with self._lock:
+            self._closed = True
+            idle = list(self._idle)
+            self._idle.clear()
+            self._lock.notify_all()
+        for conn, _, _ in idle:
+            self._discard(conn)
+
+    def stats(self) -> Dict[str, Any]:
+        """Snapshot of pool counters for sizing and monitoring"""
+        with self._lock:
+            checkouts = self._stats["checkouts"]
+            return {
+                "min_size": self.min_size,
+                "max_size": self.max_size,
+                "in_use": self._in_use,
+                "idle": len(self._idle),
+                "waiting": self._waiting,
+                "created": self._stats["created"],
+                "recycled": self._stats["recycled"],
+                "failed_health_checks": self._stats["failed_health_checks"],
+                "checkouts": checkouts,
+                "timeouts": self._stats["timeouts"],
+                "avg_wait_ms": (self._stats["wait_time_total"] / checkouts * 1000) if checkouts else 0.0
+            }
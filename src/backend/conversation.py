@@ -0,0 +1,83 @@
+from typing import Any, Dict, List
+
+from session_backend import LoadedSession, create_session_backend
+
+def new_session() -> Dict[str, Any]:
+    return {
+        "context": None,
+        "awaiting_order_id": False,
+        "cart": [],
+        "reservation": {
+            "guests": None,
+            "datetime": None,
+            "retry_count": 0
+        },
+        "feedback": {
+            "name": None,
+            "phone_number": None,
+            "text": None,
+            "awaiting": None
+        },
+        "support": {
+            "name": None,
+            "phone_number": None,
+            "issue_type": None,
+            "description": None,
+            "awaiting": None
+        }
+    }
+
+# Conversation state tracking; see SESSION_BACKEND_CONFIG for where it is kept
+session_backend = create_session_backend(new_session)
+
+async def load_session(session_id: str) -> LoadedSession:
+    """Read the session's state for this turn, initializing it on first use"""
+    return await session_backend.load(session_id)
+
+async def save_session(loaded: LoadedSession) -> None:
+    """Write the turn's changes back; raises SessionConflictError if another worker got there first"""
+    await session_backend.save(loaded)
+
+async def merge_session(loaded: LoadedSession) -> bool:
+    """Write a committed turn's changes over a session another worker saved meanwhile"""
+    return await session_backend.save_merged(loaded)
+
+def awaiting_states(session: Dict[str, Any]) -> List[str]:
+    """Names of the answers this session is waiting for, most urgent first"""
+    states = []
+    if session["support"]["awaiting"]:
+        states.append(f"support.{session['support']['awaiting']}")
+    if session["reservation"].get("guests") and not session["reservation"].get("datetime"):
+        states.append("reservation.datetime")
+    if session.get("awaiting_order_id"):
+        states.append("order.order_id")
+    if session["feedback"]["awaiting"]:
+        states.append(f"feedback.{session['feedback']['awaiting']}")
+    return states
+
+def clear_reservation_context(session: Dict[str, Any]):
+    """Clear reservation context for a session"""
+    session["reservation"] = {
+            "guests": None,
+            "datetime": None,
+            "retry_count": 0
+        }
+
+def clear_feedback_context(session: Dict[str, Any]):
+    """Clear feedback context for a session"""
+    session["feedback"] = {
+            "name": None,
+            "phone_number": None,
+            "text": None,
+            "awaiting": None
+        }
+
+def clear_support_context(session: Dict[str, Any]):
+    """Clear support context for a session"""
+    session["support"] = {
+            "name": None,
+            "phone_number": None,
+            "issue_type": None,
+            "description": None,
+            "awaiting": None
+        }
@@ -2,15 +2,26 @@ import mysql.connector
 from typing import Iterator, List, Tuple, Dict, Optional, Union, Any
 from contextlib import contextmanager
 from mysql.connector.connection import MySQLConnection
-from datetime import datetime, timedelta
-import random
+from datetime import datetime
 import logging
-import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime_parser import ParsedDateTime, parse_reservation_datetime
+from connection_pool import ConnectionPool, PoolTimeoutError
+from menu_catalog import MenuCatalog
+from order_utils import ITEM_ALIASES
+from ttl_cache import TTLCache
+from metrics import Histogram, LatencyStats, timed
+from reservation_capacity import ReservationCapacity, CAPACITY_CONFIG
+from kitchen_eta import KitchenETA, KitchenTicket, ReadyTimes
+from order_events import order_event_hub
 
-# Configure logging
-logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Time inside each database function: pool checkout plus queries, on the DB executor thread
+DB_SECONDS = Histogram("karachibites_db_seconds", "Time spent in database.py functions", ["function"])
+
 DB_CONFIG = {
     "host": "localhost",
     "user": "root",
@@ -19,26 +30,164 @@ DB_CONFIG = {
     "autocommit": True
 }
 
+DB_POOL_CONFIG = {
+    "min_size": 2,
+    "max_size": 10,
+    "checkout_timeout": 5.0,        # seconds to wait for a free connection
+    "health_check_on_borrow": True,  # ping idle connections before handing them out
+    "max_idle_seconds": 300.0,       # recycle connections idle longer than this
+    "max_lifetime_seconds": 3600.0   # recycle connections older than this
+}
+
+_pool: Optional[ConnectionPool] = None
+_pool_lock = threading.Lock()
+
+def get_pool() -> ConnectionPool:
+    """Return the process-wide connection pool, creating it on first use"""
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = ConnectionPool(lambda: mysql.connector.connect(**DB_CONFIG), **DB_POOL_CONFIG)
+                _pool.warm_up()
+    return _pool
+
+def close_pool() -> None:
+    """Close all pooled connections (used on application shutdown)"""
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.close()
+            _pool = None
+
+def get_pool_stats() -> Dict[str, Any]:
+    """Return connection pool counters: in use, idle, waiting, created, recycled"""
+    if _pool is None:
+        return {"initialized": False}
+    return {"initialized": True, **_pool.stats()}
+
 @contextmanager
 def get_db_connection() -> Iterator[MySQLConnection]:
-    """Establish and return a database connection with context manager"""
+    """Borrow a pooled database connection with context manager"""
+    pool = get_pool()
     conn = None
+    broken = False
     try:
-        conn = mysql.connector.connect(**DB_CONFIG)
+        conn = pool.acquire()
         yield conn
+    except PoolTimeoutError as err:
+        logger.error(f"Database pool exhausted: {err}")
+        raise Exception(f"Database Connection Error: {err}")
     except mysql.connector.Error as err:
         logger.error(f"Database connection error: {err}")
+        broken = True
         raise Exception(f"Database Connection Error: {err}")
+    except BaseException:
+        broken = True
+        raise
     finally:
-        if conn and conn.is_connected():
-            conn.close()
+        if conn is not None:
+            if broken:
+                try:
+                    broken = not conn.is_connected()
+                except Exception:
+                    broken = True
+            pool.release(conn, discard=broken)
+
+# Bump whenever a migration changes table structure; a cached validation for an
+# older version is treated as stale and re-run on the next status read.
+SCHEMA_VERSION = 4
+
+# A failed validation (e.g. MySQL still starting) is retried on a later status read,
+# waiting this long after the first failure and doubling up to the maximum
+SCHEMA_RETRY_CONFIG = {
+    "initial_seconds": 2.0,
+    "max_seconds": 30.0
+}
+
+_schema_status: Dict[str, Any] = {}
+_schema_lock = threading.Lock()
+_schema_retry = {"at": 0.0, "delay": 0.0}
 
 def verify_tables() -> bool:
     """Verify all required tables exist with correct structure"""
-    return (verify_reservations_table() and 
-            verify_feedback_table() and 
-            verify_orders_table() and
-            verify_support_tickets_table())
+    return validate_schema(force=True)["ok"]
+
+@timed(DB_SECONDS)
+def validate_schema(force: bool = False) -> Dict[str, Any]:
+    """Run all table checks concurrently and cache the result
+
+    A passing result is kept for the process. A failing one is served only
+    until its retry backoff runs out, then the checks run again.
+    """
+    global _schema_status
+    with _schema_lock:
+        if _schema_status and not force and _schema_status["schema_version"] == SCHEMA_VERSION:
+            if _schema_status["ok"] or time.monotonic() < _schema_retry["at"]:
+                return _schema_status
+
+        checks = {
+            "reservations": verify_reservations_table,
+            "customer_feedback": verify_feedback_table,
+            "orders": verify_orders_table,
+            "support_tickets": verify_support_tickets_table
+        }
+        started = time.monotonic()
+        with ThreadPoolExecutor(max_workers=len(checks), thread_name_prefix="schema-check") as executor:
+            futures = {table: executor.submit(check) for table, check in checks.items()}
+            tables = {table: future.result() for table, future in futures.items()}
+
+        _schema_status = {
+            "ok": all(tables.values()),
+            "tables": tables,
+            "schema_version": SCHEMA_VERSION,
+            "checked_at": datetime.now().isoformat(timespec="seconds"),
+            "duration_ms": round((time.monotonic() - started) * 1000, 1)
+        }
+        if _schema_status["ok"]:
+            _schema_retry["delay"] = 0.0
+        else:
+            _schema_retry["delay"] = min(
+                SCHEMA_RETRY_CONFIG["max_seconds"],
+                (_schema_retry["delay"] * 2) or SCHEMA_RETRY_CONFIG["initial_seconds"]
+            )
+            _schema_retry["at"] = time.monotonic() + _schema_retry["delay"]
+        logger.info(f"Schema validation finished: {_schema_status}")
+        return _schema_status
+
+def get_schema_status() -> Dict[str, Any]:
+    """Return the cached schema validation, validating if missing, stale or failed and due a retry"""
+    status = _schema_status
+    if not status or status["schema_version"] != SCHEMA_VERSION:
+        return validate_schema()
+    if not status["ok"] and time.monotonic() >= _schema_retry["at"]:
+        return validate_schema()
+    return status
+
+def is_table_ready(table: str) -> bool:
+    """Check a table against the cached schema validation without querying MySQL"""
+    return bool(get_schema_status()["tables"].get(table))
+
+def mark_schema_changed(new_version: int) -> None:
+    """Record a schema migration so the next status read re-validates the tables"""
+    global SCHEMA_VERSION
+    SCHEMA_VERSION = new_version
+
+def ensure_index(cursor, table: str, index_name: str, columns: str) -> None:
+    """Create an index if it does not exist yet (runs during startup validation only)"""
+    cursor.execute(f"SHOW INDEX FROM {table} WHERE Key_name = %s", (index_name,))
+    if cursor.fetchall():
+        return
+    logger.info(f"Creating index {index_name} on {table}...")
+    cursor.execute(f"CREATE INDEX {index_name} ON {table} {columns}")
+
+def ensure_column(cursor, table: str, column: str, definition: str) -> None:
+    """Add a column if it does not exist yet (runs during startup validation only)"""
+    cursor.execute(f"SHOW COLUMNS FROM {table} LIKE %s", (column,))
+    if cursor.fetchall():
+        return
+    logger.info(f"Adding column {column} to {table}...")
+    cursor.execute(f"ALTER TABLE {table} ADD COLUMN {column} {definition}")
 
 def verify_reservations_table() -> bool:
     """Verify the reservations table has required columns"""
@@ -52,6 +201,9 @@ def verify_reservations_table() -> bool:
                 missing = required_columns - columns
                 logger.error(f"Reservations table missing columns: {missing}")
                 return False
+
+            # Slot lookups and booking locks range-scan on (date, time)
+            ensure_index(cursor, "reservations", "idx_reservations_slot", "(reservation_date, reservation_time, status)")
             return True
     except Exception as e:
         logger.error(f"Error verifying reservations table: {e}")
@@ -139,6 +291,13 @@ def verify_orders_table() -> bool:
                 missing = required_columns - columns
                 logger.error(f"Orders table missing columns: {missing}")
                 return False
+
+            # Kitchen ETA as a real timestamp; estimated_time keeps its 'HH:MM' rendering
+            ensure_column(cursor, "orders", "estimated_ready_at", "DATETIME NULL AFTER estimated_time")
+            # Covering index for the single-query order status lookup
+            ensure_index(cursor, "order_items", "idx_order_items_order", "(order_id, id, food_item, quantity)")
+            # Open orders are read back by status when the kitchen queue is seeded
+            ensure_index(cursor, "orders", "idx_orders_status", "(status, order_id)")
             return True
     except Exception as e:
         logger.error(f"Error verifying orders table: {e}")
@@ -152,6 +311,7 @@ def extract_name_value(name_param: Any) -> Optional[str]:
         return name_param
     return None
 
+@timed(DB_SECONDS)
 def submit_customer_feedback(
     user_id: Optional[str], 
     name: Any,
@@ -180,108 +340,355 @@ def submit_customer_feedback(
         logger.error(f"Error submitting feedback: {str(e)}")
         return False, f"Failed to submit feedback: {str(e)}"
 
+# Open orders queued by estimated cook time; quotes ETAs for new orders
+kitchen_eta = KitchenETA()
+
+def _insert_order(cursor, ready_at: datetime) -> int:
+    """Insert one orders row and return its id (caller owns the transaction)"""
+    cursor.execute("""
+        INSERT INTO orders (status, estimated_time, estimated_ready_at)
+        VALUES ('Confirmed', %s, %s)
+    """, (ready_at.strftime('%H:%M'), ready_at))
+    return cursor.lastrowid
+
+def _update_ready_times(cursor, ready_times: ReadyTimes) -> None:
+    """Write re-timed kitchen ETAs in one batch (caller owns the transaction)"""
+    cursor.executemany("""
+        UPDATE orders SET estimated_time = %s, estimated_ready_at = %s
+        WHERE order_id = %s
+    """, [(ready_at.strftime('%H:%M'), ready_at, order_id) for order_id, ready_at in ready_times])
+
+def _invalidate_ready_times(ready_times: ReadyTimes) -> None:
+    """Drop re-timed orders from the status cache; only call once their ETAs are committed"""
+    for order_id, _ in ready_times:
+        order_status_cache.invalidate(order_id)
+
+def _store_ready_times(ready_times: ReadyTimes) -> None:
+    """Write ETAs re-timed after the fact, drop them from the status cache and push them to event streams"""
+    if not ready_times:
+        return
+    try:
+        with get_db_connection() as conn:
+            _update_ready_times(conn.cursor(), ready_times)
+    except Exception as e:
+        logger.error(f"Error storing re-timed ETAs for {len(ready_times)} orders: {e}")
+    _invalidate_ready_times(ready_times)
+    publish_eta_changes(ready_times)
+
+def _order_item_rows(order_id: int, items: List[Tuple[str, int]]) -> List[Tuple[int, str, int]]:
+    """Build order_items rows for a batched insert"""
+    return [
+        (order_id, item_name.replace(' ', '_').lower().strip(), quantity)
+        for item_name, quantity in items
+    ]
+
+def _insert_order_items(cursor, rows: List[Tuple[int, str, int]]) -> None:
+    """Insert all line items in one multi-row statement"""
+    # executemany() rewrites a plain INSERT ... VALUES into a single multi-row INSERT
+    cursor.executemany("""
+        INSERT INTO order_items (order_id, food_item, quantity)
+        VALUES (%s, %s, %s)
+    """, rows)
+
+@timed(DB_SECONDS)
 def create_order(items: List[Tuple[str, int]]) -> Tuple[bool, str, Optional[int]]:
-    """Create a new order in the database"""
+    """Create a new order and its items in a single transaction"""
     if not items:
         return False, "No items in order", None
 
+    # Quoted before the write so the ETA goes into the same INSERT
+    ticket = kitchen_eta.place(items)
     try:
         with get_db_connection() as conn:
-            cursor = conn.cursor()
-            estimated_time = (datetime.now() + timedelta(minutes=random.randint(20, 40))).strftime('%H:%M')
-            
-            cursor.execute("""
-                INSERT INTO orders (status, estimated_time)
-                VALUES ('Confirmed', %s)
-            """, (estimated_time,))
-            order_id = cursor.lastrowid
-
-            for item_name, quantity in items:
-                clean_item_name = item_name.replace(' ', '_').lower().strip()
-                cursor.execute("""
-                    INSERT INTO order_items (order_id, food_item, quantity)
-                    VALUES (%s, %s, %s)
-                """, (order_id, clean_item_name, quantity))
-
-            conn.commit()
-            return True, "Order created successfully", order_id
+            conn.start_transaction()
+            try:
+                cursor = conn.cursor()
+                order_id = _insert_order(cursor, ticket.ready_at)
+                _insert_order_items(cursor, _order_item_rows(order_id, items))
+                conn.commit()
+            except Exception:
+                conn.rollback()
+                raise
+        kitchen_eta.bind(ticket, order_id)
+        return True, "Order created successfully", order_id
     except Exception as e:
         logger.error(f"Error creating order: {e}")
+        _store_ready_times(kitchen_eta.withdraw(ticket))
         return False, f"Failed to create order: {str(e)}", None
 
+@timed(DB_SECONDS)
+def create_orders(orders: List[List[Tuple[str, int]]]) -> Tuple[bool, str, List[int]]:
+    """Create many orders in one transaction; all are written or none are"""
+    if not orders or any(not items for items in orders):
+        return False, "Every order needs at least one item", []
+
+    tickets: List[KitchenTicket] = [kitchen_eta.place(items) for items in orders]
+    try:
+        with get_db_connection() as conn:
+            conn.start_transaction()
+            try:
+                cursor = conn.cursor()
+                order_ids = []
+                item_rows: List[Tuple[int, str, int]] = []
+                for items, ticket in zip(orders, tickets):
+                    order_id = _insert_order(cursor, ticket.ready_at)
+                    order_ids.append(order_id)
+                    item_rows.extend(_order_item_rows(order_id, items))
+                _insert_order_items(cursor, item_rows)
+                conn.commit()
+            except Exception:
+                conn.rollback()
+                raise
+        for ticket, order_id in zip(tickets, order_ids):
+            kitchen_eta.bind(ticket, order_id)
+        return True, f"{len(order_ids)} orders created successfully", order_ids
+    except Exception as e:
+        logger.error(f"Error creating orders: {e}")
+        retimed: Dict[int, datetime] = {}
+        for ticket in tickets:
+            retimed.update(kitchen_eta.withdraw(ticket))
+        _store_ready_times(list(retimed.items()))
+        return False, f"Failed to create orders: {str(e)}", []
+
+ORDER_STATUS_CACHE_TTL_SECONDS = 5
+
+order_status_cache = TTLCache(ttl_seconds=ORDER_STATUS_CACHE_TTL_SECONDS, max_size=2048)
+order_status_latency = LatencyStats()
+
+@timed(DB_SECONDS)
 def get_order_status(order_id: str) -> Tuple[bool, Optional[Dict], str]:
     """Check order status from database"""
     try:
         clean_id = ''.join(c for c in order_id if c.isdigit())
         if not clean_id:
             return False, None, "invalid_order_id"
-        
-        with get_db_connection() as conn:
-            cursor = conn.cursor(dictionary=True)
-            cursor.execute("SELECT order_id, status, estimated_time FROM orders WHERE order_id = %s", (clean_id,))
-            order = cursor.fetchone()
-            
-            if not order:
-                return False, None, "order_not_found"
-            
-            cursor.execute("SELECT food_item, quantity FROM order_items WHERE order_id = %s", (clean_id,))
-            items = cursor.fetchall()
-            order['items'] = ", ".join(f"{item['quantity']} {item['food_item'].replace('_', ' ')}" for item in items)
-            
-            return True, order, ""
+
+        cached = order_status_cache.get(int(clean_id))
+        if cached is not None:
+            return True, dict(cached), ""
+
+        with order_status_latency.time():
+            with get_db_connection() as conn:
+                cursor = conn.cursor(dictionary=True)
+                # One round trip: the orders row plus its items aggregated in
+                # insertion order (served from idx_order_items_order)
+                cursor.execute("""
+                    SELECT o.order_id, o.status, o.estimated_time,
+                           GROUP_CONCAT(
+                               CONCAT(oi.quantity, ' ', REPLACE(oi.food_item, '_', ' '))
+                               ORDER BY oi.id SEPARATOR ', '
+                           ) AS items
+                    FROM orders o
+                    LEFT JOIN order_items oi ON oi.order_id = o.order_id
+                    WHERE o.order_id = %s
+                    GROUP BY o.order_id, o.status, o.estimated_time
+                """, (clean_id,))
+                order = cursor.fetchone()
+
+        if not order:
+            return False, None, "order_not_found"
+
+        order['items'] = order['items'] or ""
+        order_status_cache.set(order['order_id'], order)
+        return True, dict(order), ""
     except Exception as e:
         logger.error(f"Error checking order status: {e}")
         return False, None, f"database_error:{str(e)}"
 
-def get_menu_item_details(item_name: str) -> Tuple[bool, Optional[Dict], str]:
-    """Get complete menu item details with flexible matching"""
+def publish_order_changes(order_id: int, status: str, ready_times: ReadyTimes) -> None:
+    """Push a committed status change, and the ETAs it moved, to open order event streams"""
+    order_event_hub.publish(order_id, "status", {"order_id": order_id, "status": status})
+    publish_eta_changes(ready_times)
+
+def publish_eta_changes(ready_times: ReadyTimes) -> None:
+    """Push committed ETA moves to open order event streams"""
+    for order_id, ready_at in ready_times:
+        order_event_hub.publish(order_id, "eta", {"order_id": order_id, "estimated_time": ready_at.strftime('%H:%M')})
+
+ORDER_STATUSES = ('Pending', 'Confirmed', 'Preparing', 'On the way', 'Delivered', 'Cancelled')
+
+@timed(DB_SECONDS)
+def update_order_status(order_id: int, status: str) -> Tuple[bool, str]:
+    """Change an order's status and drop it from the status cache
+
+    An order leaving the kitchen re-times the open orders queued behind it;
+    their new ETAs are written in the same transaction. The in-memory kitchen
+    queue and the event streams only follow once that transaction commits.
+    Setting the status an order already has succeeds and is published again.
+    """
+    if status not in ORDER_STATUSES:
+        return False, "invalid_status"
+    try:
+        now = datetime.now()
+        with get_db_connection() as conn:
+            conn.start_transaction()
+            try:
+                cursor = conn.cursor()
+                # rowcount after UPDATE counts changed rows, so a repeated status would look
+                # like a missing order; read the row (and lock it) to tell the two apart
+                cursor.execute("SELECT status FROM orders WHERE order_id = %s FOR UPDATE", (order_id,))
+                row = cursor.fetchone()
+                if row is None:
+                    conn.rollback()
+                    return False, "order_not_found"
+                if row[0] != status:
+                    cursor.execute("UPDATE orders SET status = %s WHERE order_id = %s", (status, order_id))
+                written = kitchen_eta.preview_status_change(order_id, status, now)
+                if written:
+                    _update_ready_times(cursor, written)
+                conn.commit()
+            except Exception:
+                conn.rollback()
+                raise
+        ready_times = kitchen_eta.status_changed(order_id, status, now)
+        order_status_cache.invalidate(int(order_id))
+        _invalidate_ready_times(written)
+        # An order placed between the preview and now can move the re-timing slightly
+        drifted = [entry for entry in ready_times if entry not in written]
+        if drifted:
+            try:
+                with get_db_connection() as conn:
+                    _update_ready_times(conn.cursor(), drifted)
+            except Exception as e:
+                logger.error(f"Error storing re-timed ETAs for {len(drifted)} orders: {e}")
+            _invalidate_ready_times(drifted)
+        publish_order_changes(int(order_id), status, ready_times)
+        return True, "Order status updated successfully"
+    except Exception as e:
+        logger.error(f"Error updating order status: {e}")
+        return False, f"Failed to update order status: {str(e)}"
+
+def get_order_status_stats() -> Dict[str, Any]:
+    """Return order status cache hit rate and query latency"""
+    return {
+        "cache": order_status_cache.stats(),
+        "query_latency": order_status_latency.snapshot()
+    }
+
+@timed(DB_SECONDS)
+def _load_menu_rows() -> List[Dict[str, Any]]:
+    """Read the full menu for the in-process catalog snapshot"""
+    with get_db_connection() as conn:
+        cursor = conn.cursor(dictionary=True)
+        cursor.execute("SELECT name, price, in_stock, category FROM menu_items")
+        return cursor.fetchall()
+
+@timed(DB_SECONDS)
+def warm_kitchen_eta() -> None:
+    """Seed the kitchen queue from open orders and store any ETA the model disagrees with"""
     try:
         with get_db_connection() as conn:
             cursor = conn.cursor(dictionary=True)
-            
-            # Try exact match first
-            db_name = item_name.replace(' ', '_').lower()
-            cursor.execute("""
-                SELECT name, price, in_stock, category 
-                FROM menu_items 
-                WHERE name = %s
-                LIMIT 1
-            """, (db_name,))
-            item = cursor.fetchone()
-            
-            if not item:
-                # Try partial match if exact not found
-                cursor.execute("""
-                    SELECT name, price, in_stock, category 
-                    FROM menu_items 
-                    WHERE name LIKE %s
-                    ORDER BY 
-                        CASE 
-                            WHEN name LIKE %s THEN 1  # Starts with
-                            WHEN name LIKE %s THEN 2  # Contains
-                            ELSE 3
-                        END
-                    LIMIT 1
-                """, (
-                    f"%{db_name}%",
-                    f"{db_name}%",
-                    f"%{db_name}%"
-                ))
-                item = cursor.fetchone()
-            
-            if not item:
-                return False, None, "item_not_found"
-            
-            return True, {
-                "name": item['name'].replace('_', ' '),
-                "price": float(item['price']),
-                "in_stock": bool(item['in_stock']),
-                "category": item['category']
-            }, ""
+            placeholders = ", ".join(["%s"] * len(kitchen_eta.config["open_statuses"]))
+            cursor.execute(f"""
+                SELECT o.order_id, o.created_at, o.estimated_ready_at, oi.food_item, oi.quantity
+                FROM orders o
+                JOIN order_items oi ON oi.order_id = o.order_id
+                WHERE o.status IN ({placeholders})
+                ORDER BY o.order_id, oi.id
+            """, tuple(kitchen_eta.config["open_statuses"]))
+            ready_times = kitchen_eta.seed(cursor.fetchall())
+            if ready_times:
+                _update_ready_times(cursor, ready_times)
+                conn.commit()
+        _invalidate_ready_times(ready_times)
+    except Exception as e:
+        logger.error(f"Error seeding kitchen queue: {e}")
+
+def get_order_ready_at(order_id: int) -> Optional[datetime]:
+    """Kitchen ETA for an open order, from the in-memory queue"""
+    return kitchen_eta.ready_at(order_id)
+
+def get_kitchen_eta_stats() -> Dict[str, Any]:
+    """Return kitchen queue length and backlog"""
+    return kitchen_eta.stats()
+
+MENU_CACHE_TTL_SECONDS = 600
+# "Did you mean ...?" candidates offered when an item name does not resolve
+MENU_SUGGESTION_LIMIT = 3
+
+menu_catalog = MenuCatalog(_load_menu_rows, ttl_seconds=MENU_CACHE_TTL_SECONDS, aliases=ITEM_ALIASES)
+
+def invalidate_menu_cache() -> None:
+    """Force the next menu lookup to reload menu_items (call after menu edits)"""
+    menu_catalog.invalidate()
+
+def warm_menu_cache() -> None:
+    """Load the menu snapshot ahead of the first lookup"""
+    try:
+        menu_catalog.refresh()
+    except Exception as e:
+        logger.error(f"Error warming menu cache: {e}")
+
+def get_menu_cache_stats() -> Dict[str, Any]:
+    """Return menu catalog hit/miss counters"""
+    return menu_catalog.stats()
+
+@timed(DB_SECONDS)
+def get_menu_item_details(item_name: str) -> Tuple[bool, Optional[Dict], str]:
+    """Get complete menu item details with flexible matching
+
+    Exact names, aliases and near-typos resolve to the item. Any other miss is
+    item_not_found, with the closest menu names attached as suggestions.
+    """
+    try:
+        db_name = item_name.replace(' ', '_').lower()
+        item = menu_catalog.lookup(db_name)
+
+        if not item:
+            suggestions = [
+                match['name'].replace('_', ' ')
+                for match, _ in menu_catalog.search(db_name, limit=MENU_SUGGESTION_LIMIT)
+            ]
+            return False, {"suggestions": suggestions}, "item_not_found"
+
+        return True, {
+            "name": item['name'].replace('_', ' '),
+            "price": item['price'],
+            "in_stock": item['in_stock'],
+            "category": item['category']
+        }, ""
     except Exception as e:
         logger.error(f"Error getting menu item: {e}")
         return False, None, f"database_error:{str(e)}"
 
+@timed(DB_SECONDS)
+def price_order_items(items: List[Tuple[str, int]]) -> Tuple[bool, Optional[Dict], str]:
+    """Price order lines from the menu snapshot, one lookup per line and no queries
+
+    Only exact menu names and aliases are priced, so a customer is never billed
+    for a dish they did not name. Lines naming the same menu item are merged
+    under its catalog name. Anything else, or an out-of-stock item, is left out
+    and listed as unavailable; a near-typo is listed with the item it resembles.
+    """
+    try:
+        quantities: Dict[str, int] = {}
+        prices: Dict[str, float] = {}
+        unavailable: List[str] = []
+        for item_name, quantity in items:
+            db_name = item_name.replace(' ', '_').lower()
+            item = menu_catalog.lookup_exact(db_name)
+            if not item or not item['in_stock']:
+                label = item_name.replace('_', ' ')
+                resembles = None if item else menu_catalog.lookup(db_name)
+                if resembles and resembles['in_stock']:
+                    label += f" (did you mean {resembles['name'].replace('_', ' ')}?)"
+                unavailable.append(label)
+                continue
+            quantities[item['name']] = quantities.get(item['name'], 0) + quantity
+            prices[item['name']] = item['price']
+
+        lines = [(name, quantity, prices[name]) for name, quantity in quantities.items()]
+        return True, {
+            "lines": lines,
+            "total": sum(quantity * price for _, quantity, price in lines),
+            "unavailable": unavailable
+        }, ""
+    except Exception as e:
+        logger.error(f"Error pricing order items: {e}")
+        return False, None, f"database_error:{str(e)}"
+
+@timed(DB_SECONDS)
 def create_support_ticket(
     session_id: str, 
     name: Any,
@@ -307,106 +714,66 @@ def create_support_ticket(
         logger.error(f"Error creating support ticket: {e}")
         return False, f"Failed to create support ticket: {str(e)}"
 
-def parse_datetime_input(datetime_str: str) -> Tuple[Optional[datetime], Optional[str]]:
-    """Parse date-time string into a datetime object with flexible formats"""
-    # Log the input for debugging
-    logger.info(f"Parsing datetime input: {datetime_str}")
-    
-    # Define various date formats to try
-    month_names = {
-        'jan': 1, 'feb': 2, 'mar': 3, 'apr': 4, 'may': 5, 'jun': 6,
-        'jul': 7, 'aug': 8, 'sep': 9, 'oct': 10, 'nov': 11, 'dec': 12
-    }
-    
-    # Pattern 1: 10 jan 25 10 pm
-    pattern1 = re.compile(r'(\d{1,2})\s+([a-z]{3,})\s+(\d{1,2}|\d{4})\s+(\d{1,2})\s+([ap]m)', re.IGNORECASE)
-    match1 = pattern1.search(datetime_str.lower())
-    if match1:
-        day = int(match1.group(1))
-        month_name = match1.group(2).lower()[:3]
-        year_str = match1.group(3)
-        hour = int(match1.group(4))
-        ampm = match1.group(5).lower()
-        
-        month = month_names.get(month_name, 1)  # Default to January if not found
-        
-        # Convert 2-digit year to 4-digit
-        if len(year_str) == 2:
-            year = 2000 + int(year_str)
-        else:
-            year = int(year_str)
-            
-        # Handle AM/PM
-        if ampm == 'pm' and hour < 12:
-            hour += 12
-        elif ampm == 'am' and hour == 12:
-            hour = 0
-            
-        try:
-            result = datetime(year, month, day, hour, 0)
-            return result, None
-        except ValueError as e:
-            return None, f"Invalid date format: {e}"
-    
-    # Pattern 2: 1/1/25 2 pm
-    pattern2 = re.compile(r'(\d{1,2})/(\d{1,2})/(\d{1,2}|\d{4})\s+(\d{1,2})\s+([ap]m)', re.IGNORECASE)
-    match2 = pattern2.search(datetime_str.lower())
-    if match2:
-        month = int(match2.group(1))
-        day = int(match2.group(2))
-        year_str = match2.group(3)
-        hour = int(match2.group(4))
-        ampm = match2.group(5).lower()
-        
-        # Convert 2-digit year to 4-digit
-        if len(year_str) == 2:
-            year = 2000 + int(year_str)
-        else:
-            year = int(year_str)
-            
-        # Handle AM/PM
-        if ampm == 'pm' and hour < 12:
-            hour += 12
-        elif ampm == 'am' and hour == 12:
-            hour = 0
-            
+@timed(DB_SECONDS)
+def insert_feedback_batch(records: List[Dict[str, Any]]) -> None:
+    """Insert many feedback rows in one transaction; raises on failure so callers can retry"""
+    rows = [
+        (r["session_id"], r["customer_name"], r["phone"], r["feedback_text"], r["source_platform"])
+        for r in records
+    ]
+    with get_db_connection() as conn:
+        conn.start_transaction()
         try:
-            result = datetime(year, month, day, hour, 0)
-            return result, None
-        except ValueError as e:
-            return None, f"Invalid date format: {e}"
-    
-    # Pattern 3: 10 jan 10 pm (no year)
-    pattern3 = re.compile(r'(\d{1,2})\s+([a-z]{3,})\s+(\d{1,2})\s+([ap]m)', re.IGNORECASE)
-    match3 = pattern3.search(datetime_str.lower())
-    if match3:
-        day = int(match3.group(1))
-        month_name = match3.group(2).lower()[:3]
-        hour = int(match3.group(3))
-        ampm = match3.group(4).lower()
-        
-        month = month_names.get(month_name, 1)  # Default to January if not found
-        year = 2025  # Current year + 1 for future reservations
-        
-        # Handle AM/PM
-        if ampm == 'pm' and hour < 12:
-            hour += 12
-        elif ampm == 'am' and hour == 12:
-            hour = 0
-            
+            cursor = conn.cursor()
+            cursor.executemany("""
+                INSERT INTO customer_feedback 
+                (session_id, customer_name, phone, feedback_text, source_platform)
+                VALUES (%s, %s, %s, %s, %s)
+            """, rows)
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+
+@timed(DB_SECONDS)
+def insert_support_ticket_batch(records: List[Dict[str, Any]]) -> None:
+    """Insert many support tickets in one transaction; raises on failure so callers can retry"""
+    rows = [
+        (r["session_id"], r["customer_name"], r["phone"], r["user_message"], r["issue_category"])
+        for r in records
+    ]
+    with get_db_connection() as conn:
+        conn.start_transaction()
         try:
-            result = datetime(year, month, day, hour, 0)
-            return result, None
-        except ValueError as e:
-            return None, f"Invalid date format: {e}"
-            
-    # If all patterns fail, return error
-    return None, "Unrecognized datetime format. Please use format like '10 Jan 25 10 PM' or '1/1/25 2 PM'"
+            cursor = conn.cursor()
+            cursor.executemany("""
+                INSERT INTO support_tickets 
+                (session_id, customer_name, phone, user_message, issue_category, status)
+                VALUES (%s, %s, %s, %s, %s, 'open')
+            """, rows)
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+
+def parse_datetime_input(datetime_str: str) -> Tuple[Optional[datetime], Optional[str]]:
+    """Parse date-time string into a datetime object with flexible formats"""
+    logger.debug("Parsing datetime input: %s", datetime_str)
+    parsed, error = parse_reservation_datetime(datetime_str)
+    return (parsed.value, None) if parsed else (None, error)
+
+reservation_capacity = ReservationCapacity(get_db_connection)
 
-def create_reservation(guests: int, datetime_param: Union[str, dict, list]) -> Tuple[bool, str, Optional[int]]:
+@timed(DB_SECONDS)
+def get_available_slots(guests: int, start: Optional[datetime] = None, count: int = 3) -> List[datetime]:
+    """Return the next `count` reservation slots that can seat the party"""
+    return reservation_capacity.next_available(int(guests), start or datetime.now(), count=count)
+
+@timed(DB_SECONDS)
+def create_reservation(guests: int, datetime_param: Union[ParsedDateTime, str, dict, list]) -> Tuple[bool, str, Optional[int]]:
     """Create a new reservation in the database"""
     try:
-        if not verify_reservations_table():
+        if not is_table_ready("reservations"):
             return False, "Reservations system unavailable", None
             
         # Validate guest count
@@ -417,64 +784,54 @@ def create_reservation(guests: int, datetime_param: Union[str, dict, list]) -> T
         except (ValueError, TypeError):
             return False, "Please enter a valid number of guests (1-20)", None
 
-        # Parse datetime parameter
-        datetime_str = ""
-        if isinstance(datetime_param, dict) and 'date_time' in datetime_param:
-            datetime_str = datetime_param['date_time']
-        elif isinstance(datetime_param, list) and len(datetime_param) > 0 and isinstance(datetime_param[0], dict) and 'date_time' in datetime_param[0]:
-            datetime_str = datetime_param[0]['date_time']
-        elif isinstance(datetime_param, str):
-            datetime_str = datetime_param
+        if isinstance(datetime_param, ParsedDateTime):
+            # The webhook already parsed this turn's date
+            dt_obj = datetime_param.value
         else:
-            return False, "Invalid datetime format", None
+            # Parse datetime parameter
+            datetime_str = ""
+            if isinstance(datetime_param, dict) and 'date_time' in datetime_param:
+                datetime_str = datetime_param['date_time']
+            elif isinstance(datetime_param, list) and len(datetime_param) > 0 and isinstance(datetime_param[0], dict) and 'date_time' in datetime_param[0]:
+                datetime_str = datetime_param[0]['date_time']
+            elif isinstance(datetime_param, str):
+                datetime_str = datetime_param
+            else:
+                return False, "Invalid datetime format", None
+                
+            logger.debug("Received datetime: %s", datetime_str)
             
-        logger.info(f"Received datetime: {datetime_str}")
-        
-        # Parse the datetime string using our custom function
-        dt_obj, error = parse_datetime_input(datetime_str)
-        
-        if dt_obj is None:
-            logger.error(f"Failed to parse datetime: {error}")
-            return False, f"Date parsing error: {error}", None
+            # Parse the datetime string using our custom function
+            dt_obj, error = parse_datetime_input(datetime_str)
+            
+            if dt_obj is None:
+                logger.error(f"Failed to parse datetime: {error}")
+                return False, f"Date parsing error: {error}", None
             
         # Extract date and time components
         reservation_date = dt_obj.date()
         reservation_time = dt_obj.time()
         
-        logger.info(f"Parsed date: {reservation_date}, time: {reservation_time}")
+        logger.debug("Parsed date: %s, time: %s", reservation_date, reservation_time)
             
-        with get_db_connection() as conn:
-            cursor = conn.cursor()
-            
-            # Check for existing reservations
-            cursor.execute("""
-                SELECT 1 FROM reservations 
-                WHERE reservation_date = %s 
-                AND reservation_time = %s
-                LIMIT 1
-            """, (reservation_date, reservation_time.strftime('%H:%M:%S')))
-            
-            if cursor.fetchone():
-                # For testing purposes, allow reservations even if the time slot is taken
-                # In production, you might want to return an error here
-                pass
-            
-            # Insert new reservation
-            cursor.execute("""
-                INSERT INTO reservations 
-                (guests, reservation_date, reservation_time, status)
-                VALUES (%s, %s, %s, 'confirmed')
-            """, (
-                guests,
-                reservation_date,
-                reservation_time.strftime('%H:%M:%S')
-            ))
-            
-            reservation_id = cursor.lastrowid
-            conn.commit()
-            
-            logger.info(f"Created reservation with ID: {reservation_id}")
-            return True, "Reservation created successfully", reservation_id
+        success, error, reservation_id = reservation_capacity.book(reservation_date, reservation_time, guests)
+        if not success:
+            if error == "slot_closed":
+                return False, (
+                    f"We take reservations between {CAPACITY_CONFIG['opening_hour']}:00 "
+                    f"and {CAPACITY_CONFIG['closing_hour']}:00"
+                ), None
+            if error == "slot_busy":
+                return False, "That time slot is busy right now, please try again", None
+            alternatives = reservation_capacity.next_available(guests, dt_obj, count=3)
+            suggestion = ", ".join(slot.strftime('%d %b %I:%M %p') for slot in alternatives)
+            return False, (
+                f"No table for {guests} guests at that time"
+                + (f". Next available: {suggestion}" if suggestion else "")
+            ), None
+
+        logger.info("Created reservation with ID: %s", reservation_id)
+        return True, "Reservation created successfully", reservation_id
                 
     except mysql.connector.Error as err:
         logger.error(f"Database error: {err}")
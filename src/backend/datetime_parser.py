@@ -0,0 +1,119 @@
+from datetime import datetime, timedelta
+from typing import Any, Dict, NamedTuple, Optional, Tuple
+
+from extraction_grammar import (
+    CLOCK_TIME, DATETIME_DAY_MONTH, DATETIME_DAY_MONTH_YEAR, DATETIME_MONTH_DAY,
+    DATETIME_MONTH_DAY_YEAR, DATETIME_NUMERIC, MONTH_NUMBERS, RELATIVE_DAY
+)
+
+DATETIME_CONFIG: Dict[str, Any] = {
+    # Year for dates typed without one; None picks the next occurrence of that date
+    "default_year": None
+}
+
+UNRECOGNIZED_FORMAT = "Unrecognized datetime format. Please use format like '10 Jan 25 10 PM' or '1/1/25 2 PM'"
+
+
+class ParsedDateTime(NamedTuple):
+    """A reservation date parsed once per turn, with the strings shown back to the customer"""
+    value: datetime
+    display_date: str
+    display_time: str
+    matched_format: str
+
+
+def _to_24_hour(hour: int, ampm: str) -> int:
+    if ampm == 'pm' and hour < 12:
+        return hour + 12
+    if ampm == 'am' and hour == 12:
+        return 0
+    return hour
+
+
+def _to_full_year(year_str: str) -> int:
+    """Convert a 2-digit year to 4 digits"""
+    return 2000 + int(year_str) if len(year_str) <= 2 else int(year_str)
+
+
+def _month(name: str) -> Optional[int]:
+    return MONTH_NUMBERS.get(name[:3])
+
+
+def _resolve_year(month: int, day: int, hour: int, now: datetime, default_year: Optional[int]) -> int:
+    """Year for a date typed without one"""
+    if default_year is not None:
+        return default_year
+    try:
+        candidate = datetime(now.year, month, day, hour)
+    except ValueError:
+        # e.g. 29 Feb outside a leap year; let the caller report the bad date
+        return now.year
+    return now.year if candidate >= now else now.year + 1
+
+
+def _build(year: int, month: int, day: int, hour: int, minute: int, matched_format: str) -> Tuple[Optional[ParsedDateTime], Optional[str]]:
+    try:
+        value = datetime(year, month, day, hour, minute)
+    except ValueError as e:
+        return None, f"Invalid date format: {e}"
+    return ParsedDateTime(
+        value=value,
+        display_date=f"{value.strftime('%b')} {value.day}, {value.year}",
+        display_time=f"{value.hour % 12 or 12}:{value.minute:02d} {'AM' if value.hour < 12 else 'PM'}",
+        matched_format=matched_format
+    ), None
+
+
+def parse_reservation_datetime(
+    text: str,
+    now: Optional[datetime] = None,
+    default_year: Optional[int] = None
+) -> Tuple[Optional[ParsedDateTime], Optional[str]]:
+    """Parse a reservation date and time from free text; returns (result, error message)"""
+    text = text.lower()
+    now = now or datetime.now()
+    if default_year is None:
+        default_year = DATETIME_CONFIG["default_year"]
+
+    # 10 jan 25 10 pm
+    for match in DATETIME_DAY_MONTH_YEAR.finditer(text):
+        day, month_name, year_str, hour, ampm = match.groups()
+        month = _month(month_name)
+        if month:
+            return _build(_to_full_year(year_str), month, int(day), _to_24_hour(int(hour), ampm), 0, "day_month_year")
+
+    # 1/1/25 2 pm
+    match = DATETIME_NUMERIC.search(text)
+    if match:
+        month, day, year_str, hour, ampm = match.groups()
+        return _build(_to_full_year(year_str), int(month), int(day), _to_24_hour(int(hour), ampm), 0, "numeric")
+
+    # january 10, 2027 at 2 pm
+    for match in DATETIME_MONTH_DAY_YEAR.finditer(text):
+        month_name, day, year_str, hour, ampm = match.groups()
+        month = _month(month_name)
+        if month:
+            return _build(int(year_str), month, int(day), _to_24_hour(int(hour), ampm), 0, "month_day_year")
+
+    # 10 jan 10 pm / january 10 2 pm (no year)
+    for pattern, matched_format in ((DATETIME_DAY_MONTH, "day_month"), (DATETIME_MONTH_DAY, "month_day")):
+        for match in pattern.finditer(text):
+            if matched_format == "day_month":
+                day, month_name, hour, ampm = match.groups()
+            else:
+                month_name, day, hour, ampm = match.groups()
+            month = _month(month_name)
+            if month:
+                hour_24 = _to_24_hour(int(hour), ampm)
+                year = _resolve_year(month, int(day), hour_24, now, default_year)
+                return _build(year, month, int(day), hour_24, 0, matched_format)
+
+    # tomorrow 8 pm / 8:30 pm tonight
+    relative = RELATIVE_DAY.search(text)
+    clock = CLOCK_TIME.search(text)
+    if relative and clock:
+        day = now.date() + timedelta(days=1 if relative.group(1) == "tomorrow" else 0)
+        hour, minute, ampm = clock.groups()
+        return _build(day.year, day.month, day.day, _to_24_hour(int(hour), ampm), int(minute or 0), "relative")
+
+    return None, UNRECOGNIZED_FORMAT
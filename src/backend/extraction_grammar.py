@@ -0,0 +1,74 @@
+import re
+from typing import Dict, Iterator, List, Optional, Tuple
+
+# Longest dish name we try to capture; keeps every item pattern linear in the input length
+MAX_ITEM_WORDS = 6
+
+# A run of 1..MAX_ITEM_WORDS letter-only words. Letters and whitespace are disjoint classes,
+# so the run can only end one way and the engine never has to backtrack into it.
+_ITEM = rf"([a-z]+(?:\s+[a-z]+){{0,{MAX_ITEM_WORDS - 1}}})"
+
+# "2 chicken biryani and 1 pepsi" -> (2, "chicken biryani and"), (1, "pepsi")
+ORDER_LINE = re.compile(rf"\b(\d{{1,4}})\s+([a-z_]+(?:\s+[a-z_]+){{0,{MAX_ITEM_WORDS}}})")
+
+# First run of three or more digits, e.g. "status of order #1042"
+ORDER_ID = re.compile(r"\d{3,}")
+
+PRICE_QUERY = re.compile(rf"(?:price of|cost of|how much is|tell me the price of)\s+{_ITEM}")
+
+# Tried in order after PRICE_QUERY; the first pattern that matches wins
+DISH_PATTERNS = (
+    re.compile(rf"(?:is|are)\s+{_ITEM}\s+(?:available|in stock|left)"),
+    re.compile(rf"(?:tell me about|what is|what's)\s+{_ITEM}"),
+    re.compile(rf"\b{_ITEM}\s+(?:price|cost|availability)"),
+    re.compile(rf"(?:i'd like|i want)\s+{_ITEM}"),
+    re.compile(rf"(?:order|get me)\s+{_ITEM}")
+)
+
+GUEST_COUNT = re.compile(r"\b(\d{1,3})\s*(?:guests?|people)")
+
+MONTH_NUMBERS: Dict[str, int] = {
+    'jan': 1, 'feb': 2, 'mar': 3, 'apr': 4, 'may': 5, 'jun': 6,
+    'jul': 7, 'aug': 8, 'sep': 9, 'oct': 10, 'nov': 11, 'dec': 12
+}
+
+# 10 jan 25 10 pm
+DATETIME_DAY_MONTH_YEAR = re.compile(r"\b(\d{1,2})\s+([a-z]{3,9})\s+(\d{4}|\d{1,2})\s+(\d{1,2})\s+([ap]m)\b")
+# 1/1/25 2 pm
+DATETIME_NUMERIC = re.compile(r"\b(\d{1,2})/(\d{1,2})/(\d{4}|\d{1,2})\s+(\d{1,2})\s+([ap]m)\b")
+# 10 jan 10 pm
+DATETIME_DAY_MONTH = re.compile(r"\b(\d{1,2})\s+([a-z]{3,9})\s+(\d{1,2})\s+([ap]m)\b")
+# january 10, 2027 at 2 pm
+DATETIME_MONTH_DAY_YEAR = re.compile(r"\b([a-z]{3,9})\s+(\d{1,2})(?:st|nd|rd|th)?,?\s+(\d{4})(?:\s+at)?\s+(\d{1,2})\s+([ap]m)\b")
+# january 10 2 pm
+DATETIME_MONTH_DAY = re.compile(r"\b([a-z]{3,9})\s+(\d{1,2})(?:st|nd|rd|th)?(?:\s+at)?\s+(\d{1,2})\s+([ap]m)\b")
+# tomorrow 8 pm / 8:30 pm tonight
+RELATIVE_DAY = re.compile(r"\b(today|tonight|tomorrow)\b")
+CLOCK_TIME = re.compile(r"\b(\d{1,2})(?::([0-5]\d))?\s*([ap]m)\b")
+
+
+def iter_order_lines(text_lower: str) -> Iterator[Tuple[int, str]]:
+    """Yield (quantity, raw item text) pairs from a lowercased order message"""
+    for match in ORDER_LINE.finditer(text_lower):
+        yield int(match.group(1)), match.group(2)
+
+
+def find_order_id(text_lower: str) -> Optional[str]:
+    match = ORDER_ID.search(text_lower)
+    return match.group(0) if match else None
+
+
+def find_dish_phrase(text_lower: str, price_query: bool = False) -> Optional[str]:
+    """Return the raw dish words from a lowercased question, or None"""
+    patterns: List[re.Pattern] = [PRICE_QUERY] if price_query else []
+    patterns.extend(DISH_PATTERNS)
+    for pattern in patterns:
+        match = pattern.search(text_lower)
+        if match:
+            return match.group(1)
+    return None
+
+
+def find_guest_count(text_lower: str) -> Optional[int]:
+    match = GUEST_COUNT.search(text_lower)
+    return int(match.group(1)) if match else None
@@ -0,0 +1,30 @@
+from typing import Optional
+
+from router import IntentRouter, TimingHook
+
+from handlers import feedback, order, product, reservation, support
+
+
+def build_router(timing_hook: Optional[TimingHook] = None) -> IntentRouter:
+    """Wire every handler into a router; fallback order mirrors the old webhook cascade"""
+    router = IntentRouter(timing_hook)
+    for module in (support, reservation, order, feedback):
+        module.register(router)
+
+    # Keyword fallback for turns no awaiting state or intent route answered. Order, reservation
+    # and product intents live here too: their keyword checks have always outranked the intent.
+    router.add_fallback(support.device_request)
+    router.add_fallback(feedback.feedback_request)
+    router.add_fallback(support.support_request)
+    router.add_fallback(order.status_with_id)
+    router.add_fallback(reservation.reservation_over_order)
+    router.add_fallback(product.price_or_stock)
+    router.add_fallback(reservation.reservation)
+    router.add_fallback(product.product_details)
+    router.add_fallback(order.clear_cart)
+    router.add_fallback(order.view_cart)
+    router.add_fallback(order.confirm_order)
+    router.add_fallback(order.order_status)
+    router.add_fallback(order.place_order)
+    router.set_default(order.ask_for_items)
+    return router
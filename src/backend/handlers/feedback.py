@@ -0,0 +1,109 @@
+from typing import Optional
+
+from fastapi.responses import JSONResponse
+
+from async_database import submit_customer_feedback
+from conversation import clear_feedback_context
+from database import extract_name_value
+from response_templates import (
+    error_response, feedback_prompt_name_response, feedback_prompt_phone_response,
+    feedback_prompt_text_response, feedback_submitted_response
+)
+from router import IntentRouter, Turn
+
+
+async def skip_name(turn: Turn) -> Optional[JSONResponse]:
+    turn.session["feedback"]["awaiting"] = "phone_number"
+    return feedback_prompt_phone_response()
+
+
+async def skip_phone(turn: Turn) -> Optional[JSONResponse]:
+    feedback_context = turn.session["feedback"]
+    feedback_context["awaiting"] = "feedback_text"
+    return feedback_prompt_text_response(extract_name_value(feedback_context["name"]))
+
+
+async def feedback_flow(turn: Turn) -> Optional[JSONResponse]:
+    """Collect name, phone and feedback text over several turns, then submit"""
+    feedback_context = turn.session["feedback"]
+    user_input = turn.user_input
+
+    # Extract parameters if provided
+    name = turn.parameters.get("name")
+    phone_number = turn.parameters.get("phone-number")
+    feedback_text = turn.parameters.get("feedback-text")
+
+    # If user directly provides all information in one message
+    if name and phone_number and feedback_text:
+        feedback_context["name"] = name
+        feedback_context["phone_number"] = phone_number
+        feedback_context["text"] = feedback_text
+
+        # Submit feedback with session ID
+        success, message = await submit_customer_feedback(
+            user_id=turn.session_id,  # Use session_id here
+            name=feedback_context["name"],
+            phone_number=feedback_context["phone_number"],
+            feedback_text=feedback_context["text"]
+        )
+
+        name_value = extract_name_value(feedback_context["name"])
+        clear_feedback_context(turn.session)
+        if success:
+            turn.committed = True
+            return feedback_submitted_response(name_value)
+        else:
+            return error_response("feedback_failed", message)
+
+    # Handle the staged flow for collecting feedback
+    if feedback_context["awaiting"] is None:
+        # Starting the flow - ask for name
+        feedback_context["awaiting"] = "name"
+        return feedback_prompt_name_response()
+
+    elif feedback_context["awaiting"] == "name":
+        feedback_context["name"] = user_input
+        feedback_context["awaiting"] = "phone_number"
+        return feedback_prompt_phone_response(feedback_context["name"])
+
+    elif feedback_context["awaiting"] == "phone_number":
+        feedback_context["phone_number"] = user_input
+        feedback_context["awaiting"] = "feedback_text"
+        return feedback_prompt_text_response(feedback_context["name"])
+
+    elif feedback_context["awaiting"] == "feedback_text":
+        feedback_context["text"] = user_input
+
+        # Submit feedback with session ID
+        success, message = await submit_customer_feedback(
+            user_id=turn.session_id,  # Use session_id here
+            name=feedback_context["name"],
+            phone_number=feedback_context["phone_number"],
+            feedback_text=feedback_context["text"]
+        )
+
+        name = feedback_context["name"]
+        clear_feedback_context(turn.session)
+        if success:
+            turn.committed = True
+            return feedback_submitted_response(name)
+        else:
+            return error_response("feedback_failed", message)
+
+    # If no awaiting state is set, start the feedback flow
+    feedback_context["awaiting"] = "name"
+    return feedback_prompt_name_response()
+
+
+async def feedback_request(turn: Turn) -> Optional[JSONResponse]:
+    """Start the feedback flow from a message Dialogflow did not route to GiveCustomerFeedback"""
+    if turn.signals.is_feedback_request and turn.intent != "GiveCustomerFeedback":
+        turn.session["feedback"]["awaiting"] = "name"
+        return feedback_prompt_name_response()
+    return None
+
+
+def register(router: IntentRouter) -> None:
+    router.add_intent(["GiveCustomerFeedback - skip_name"], skip_name)
+    router.add_intent(["GiveCustomerFeedback - skip_phone"], skip_phone)
+    router.add_intent(["GiveCustomerFeedback"], feedback_flow)
@@ -0,0 +1,141 @@
+from typing import Optional
+
+from fastapi.responses import JSONResponse
+
+from async_database import create_order, get_order_ready_at, get_order_status, price_order_items
+from order_utils import ORDER_WORDS, extract_order_details, extract_order_id
+from response_templates import (
+    ask_for_order_items, ask_for_order_number, cart_cleared_response, cart_response,
+    cart_unavailable_response, error_response, order_status_response, order_success_response
+)
+from router import IntentRouter, Turn
+
+
+async def _status_response(order_id: str) -> JSONResponse:
+    success, order, error = await get_order_status(order_id)
+    if success:
+        return order_status_response(order)
+    return error_response(error, order_id)
+
+
+async def awaited_order_id(turn: Turn) -> Optional[JSONResponse]:
+    """Answer the order-number prompt; a switch to feedback or support takes priority"""
+    if (turn.intent.startswith(("GiveCustomerFeedback", "Technical_Support"))
+            or turn.signals.is_feedback_request or turn.signals.is_technical_support_request):
+        return None
+    order_id = extract_order_id(turn.user_input)
+    if order_id:
+        turn.session["awaiting_order_id"] = False
+        return await _status_response(order_id)
+    # If no order ID found, ask again
+    return ask_for_order_number()
+
+
+async def status_with_id(turn: Turn) -> Optional[JSONResponse]:
+    """Handle direct order status requests (with ID included)"""
+    user_input = turn.user_input
+    if ("order id" in user_input or "order status" in user_input or "status of" in user_input) and any(c.isdigit() for c in user_input):
+        order_id = extract_order_id(user_input)
+        if order_id:
+            return await _status_response(order_id)
+    return None
+
+
+async def order_status(turn: Turn) -> Optional[JSONResponse]:
+    """Look up the order in the message, or ask for its number"""
+    if not ("order status" in turn.user_input or "what is my order status" in turn.user_input):
+        return None
+    # First check if order ID is already in the input
+    order_id = extract_order_id(turn.user_input)
+    if order_id:
+        return await _status_response(order_id)
+    # If no order ID found, set context and ask for it
+    turn.session["awaiting_order_id"] = True
+    return ask_for_order_number()
+
+
+async def _priced_cart(turn: Turn) -> JSONResponse:
+    """Price the session's cart, keep only what can be ordered and show it with its total"""
+    success, priced, error = await price_order_items([(name, quantity) for name, quantity in turn.session["cart"]])
+    if not success:
+        return error_response(error)
+    turn.session["cart"] = [[name, quantity] for name, quantity, _ in priced["lines"]]
+    if not priced["lines"]:
+        return cart_unavailable_response(priced["unavailable"])
+    return cart_response(priced["lines"], priced["total"], priced["unavailable"])
+
+
+async def place_order(turn: Turn) -> Optional[JSONResponse]:
+    """Add the quantities and items in the message to the session's cart"""
+    if turn.intent != "PlaceOrder" and not any(w in turn.user_input for w in ORDER_WORDS):
+        return None
+    if turn.session.get("context"):
+        del turn.session["context"]
+
+    items = extract_order_details(turn.user_input)
+    if not items:
+        return await _priced_cart(turn) if turn.session["cart"] else ask_for_order_items()
+
+    # Nothing is written until the customer confirms the cart
+    turn.session["cart"].extend([name, quantity] for name, quantity in items)
+    return await _priced_cart(turn)
+
+
+async def view_cart(turn: Turn) -> Optional[JSONResponse]:
+    """Show the cart with line prices and total"""
+    if turn.intent != "View_Cart" and not turn.signals.is_view_cart:
+        return None
+    return await _priced_cart(turn) if turn.session["cart"] else ask_for_order_items()
+
+
+async def clear_cart(turn: Turn) -> Optional[JSONResponse]:
+    """Empty the cart without ordering"""
+    if turn.intent != "Clear_Cart" and not turn.signals.is_clear_cart:
+        return None
+    turn.session["cart"] = []
+    return cart_cleared_response()
+
+
+async def confirm_order(turn: Turn) -> Optional[JSONResponse]:
+    """Write the whole cart as one order at current menu prices"""
+    if turn.intent != "Confirm_Order" and not turn.signals.is_order_confirmation:
+        return None
+    # "2 pepsi and that's all": items named alongside the confirmation go in too
+    turn.session["cart"].extend([name, quantity] for name, quantity in extract_order_details(turn.user_input))
+    if not turn.session["cart"]:
+        # "that's all" with nothing in the cart is not about ordering
+        return ask_for_order_items() if turn.intent == "Confirm_Order" else None
+
+    success, priced, error = await price_order_items([(name, quantity) for name, quantity in turn.session["cart"]])
+    if not success:
+        return error_response(error)
+    items = [(name, quantity) for name, quantity, _ in priced["lines"]]
+    if not items:
+        turn.session["cart"] = []
+        return cart_unavailable_response(priced["unavailable"])
+    if priced["unavailable"]:
+        # Never place an order that differs from what was asked for; show the cart and ask again
+        turn.session["cart"] = [[name, quantity] for name, quantity in items]
+        return cart_response(priced["lines"], priced["total"], priced["unavailable"])
+
+    # The order and all its line items go in one transaction
+    success, message, order_id = await create_order(items)
+    if not success:
+        # The cart is kept so the customer can confirm again
+        return error_response("order_creation_failed", message)
+
+    turn.committed = True
+    turn.session["cart"] = []
+    return order_success_response(message, order_id, items, priced["total"], await get_order_ready_at(order_id))
+
+
+async def ask_for_items(turn: Turn) -> Optional[JSONResponse]:
+    # Default response
+    return ask_for_order_items()
+
+
+def register(router: IntentRouter) -> None:
+    router.add_awaiting(["order.order_id"], awaited_order_id)
+    router.add_intent(["Confirm_Order"], confirm_order)
+    router.add_intent(["Clear_Cart"], clear_cart)
+    router.add_intent(["View_Cart"], view_cart)
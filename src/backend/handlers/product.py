@@ -0,0 +1,56 @@
+from typing import Dict, Optional
+
+from fastapi.responses import JSONResponse
+
+from async_database import get_menu_item_details
+from order_utils import extract_dish_item, extract_item_and_intent
+from response_templates import (
+    error_response, item_suggestion_response, product_full_response, product_price_response,
+    product_stock_response
+)
+from router import Turn
+
+
+def _not_found_response(dish_item: str, item_details: Optional[Dict], error: str) -> JSONResponse:
+    """Offer the closest menu items when the name did not resolve, else report the error"""
+    suggestions = (item_details or {}).get("suggestions")
+    if error == "item_not_found" and suggestions:
+        return item_suggestion_response(dish_item, suggestions)
+    return error_response(error, dish_item)
+
+
+async def price_or_stock(turn: Turn) -> Optional[JSONResponse]:
+    """Answer "how much is X" and "is X available" questions"""
+    if turn.signals.is_price_query:
+        respond = product_price_response
+    elif turn.signals.is_stock_query:
+        respond = product_stock_response
+    else:
+        return None
+
+    dish_item = extract_dish_item(turn.user_input)
+    if not dish_item:
+        return error_response("item_not_found", "Please specify an item")
+
+    success, item_details, error = await get_menu_item_details(dish_item)
+    if not success:
+        return _not_found_response(dish_item, item_details, error)
+
+    return respond(item_details)
+
+
+async def product_details(turn: Turn) -> Optional[JSONResponse]:
+    """Full menu card for Product_FAQ / Product_Details turns that were not price or stock questions"""
+    if turn.intent not in ("Product_FAQ", "Product_Details"):
+        return None
+    dish_item, info_type = extract_item_and_intent(turn.user_input)
+    dish_item = dish_item or turn.parameters.get("dish_items")
+
+    if not dish_item:
+        return error_response("item_not_found", "that item")
+
+    success, item_details, error = await get_menu_item_details(dish_item)
+    if not success:
+        return _not_found_response(dish_item, item_details, error)
+
+    return product_full_response(item_details)
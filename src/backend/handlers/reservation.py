@@ -0,0 +1,88 @@
+import logging
+from typing import Optional
+
+from fastapi.responses import JSONResponse
+
+from async_database import create_reservation
+from conversation import clear_reservation_context
+from datetime_parser import parse_reservation_datetime
+from extraction_grammar import find_guest_count
+from response_templates import ask_reservation_question, error_response, reservation_success_response
+from router import IntentRouter, Turn
+
+logger = logging.getLogger(__name__)
+
+
+async def book_datetime(turn: Turn) -> Optional[JSONResponse]:
+    """Book as soon as a party size is known and the message carries a date we can parse"""
+    # Parsed once per turn and reused for booking and the confirmation text
+    when, _ = parse_reservation_datetime(turn.user_input)
+    if when is None:
+        return None
+    guests = turn.session["reservation"]["guests"]
+
+    # Create the reservation directly
+    success, message, reservation_id = await create_reservation(
+        guests=guests,
+        datetime_param=when
+    )
+
+    if success:
+        turn.committed = True
+        # Clear reservation data
+        clear_reservation_context(turn.session)
+
+        # Return successful reservation response
+        return reservation_success_response(
+            reservation_id=reservation_id,
+            guests=guests,
+            when=when
+        )
+    else:
+        return error_response("reservation_failed", message)
+
+
+async def reservation_over_order(turn: Turn) -> Optional[JSONResponse]:
+    """Clear context if user explicitly asks for reservation while in order flow"""
+    if "reservation" in turn.user_input and turn.session.get("context"):
+        logger.info("Clearing order context for reservation request")
+        turn.session["context"] = None
+        clear_reservation_context(turn.session)
+        return ask_reservation_question("guest_count")
+    return None
+
+
+async def reservation(turn: Turn) -> Optional[JSONResponse]:
+    """Collect the party size, then ask for a date"""
+    if turn.intent != "MakeReservation" and "reservation" not in turn.user_input and "book" not in turn.user_input:
+        return None
+    reservation_context = turn.session["reservation"]
+
+    # Dates that parsed were booked by book_datetime, so anything left needs asking again
+    if reservation_context.get("guests") and not reservation_context.get("datetime"):
+        return ask_reservation_question("reserve_date_time")
+
+    # Try to extract guest count from input
+    guests = find_guest_count(turn.user_input)
+    if guests is None:
+        # Check if it's a guest parameter
+        guests = turn.parameters.get("guest_count")
+        if guests is None or guests == '':
+            # If we still don't have guest count, ask for it
+            return ask_reservation_question("guest_count")
+        try:
+            guests = int(float(guests))
+        except (ValueError, TypeError):
+            return ask_reservation_question("guest_count")
+
+    if 1 <= guests <= 20:
+        reservation_context["guests"] = guests
+        reservation_context["retry_count"] = 0
+
+        # Now ask for date and time
+        return ask_reservation_question("reserve_date_time")
+    return ask_reservation_question("guest_count")
+
+
+def register(router: IntentRouter) -> None:
+    router.add_awaiting(["reservation.datetime"], book_datetime)
@@ -0,0 +1,191 @@
+from typing import Optional
+
+from fastapi.responses import JSONResponse
+
+from async_database import create_support_ticket
+from conversation import clear_support_context
+from database import extract_name_value
+from order_utils import extract_support_request_details
+from response_templates import (
+    error_response, support_ticket_response, technical_support_cancelled_response,
+    technical_support_description_response, technical_support_issue_response,
+    technical_support_name_response, technical_support_phone_response
+)
+from router import IntentRouter, Turn
+
+
+def _is_device_issue(user_input: str) -> bool:
+    return "device" in user_input and "not working" in user_input
+
+
+async def device_issue(turn: Turn) -> Optional[JSONResponse]:
+    """File the ticket straight away when a "device not working" message arrives mid-flow"""
+    if not _is_device_issue(turn.user_input):
+        return None
+    support_context = turn.session["support"]
+
+    # We already have name and phone number, just create the ticket with those
+    issue_type, _ = extract_support_request_details(turn.user_input)
+
+    success, message = await create_support_ticket(
+        session_id=turn.session_id,
+        name=support_context["name"],
+        phone_number=support_context["phone_number"],
+        issue_type=issue_type or "device",
+        description=turn.user_input
+    )
+
+    name_value = extract_name_value(support_context["name"])
+
+    # Clear context
+    clear_support_context(turn.session)
+
+    if success:
+        turn.committed = True
+        return support_ticket_response(turn.user_input, name_value)
+    else:
+        return error_response("support_ticket_failed", message)
+
+
+async def cancel(turn: Turn) -> Optional[JSONResponse]:
+    clear_support_context(turn.session)
+    return technical_support_cancelled_response()
+
+
+async def skip_name(turn: Turn) -> Optional[JSONResponse]:
+    turn.session["support"]["awaiting"] = "phone_number"
+    return technical_support_phone_response()
+
+
+async def skip_phone(turn: Turn) -> Optional[JSONResponse]:
+    support_context = turn.session["support"]
+    support_context["awaiting"] = "issue_type"
+    return technical_support_issue_response(extract_name_value(support_context["name"]))
+
+
+async def issue_selected(turn: Turn) -> Optional[JSONResponse]:
+    support_context = turn.session["support"]
+    issue = turn.parameters.get("issue")
+    if issue:
+        support_context["issue_type"] = issue
+        support_context["awaiting"] = "description"
+        return technical_support_description_response(issue)
+    else:
+        support_context["awaiting"] = "issue_type"
+        return technical_support_issue_response(extract_name_value(support_context["name"]))
+
+
+async def support_flow(turn: Turn) -> Optional[JSONResponse]:
+    """Collect name, phone, issue type and description over several turns, then open a ticket"""
+    support_context = turn.session["support"]
+    user_input = turn.user_input
+
+    # Extract parameters if provided
+    name = turn.parameters.get("name")
+    phone_number = turn.parameters.get("phone-number")
+    issue = turn.parameters.get("issue")
+    description = turn.parameters.get("description")
+
+    # If user directly provides all information in one message
+    if name and phone_number and issue and description:
+        support_context["name"] = name
+        support_context["phone_number"] = phone_number
+        support_context["issue_type"] = issue
+        support_context["description"] = description
+
+        # Create support ticket with session ID
+        success, message = await create_support_ticket(
+            session_id=turn.session_id,
+            name=support_context["name"],
+            phone_number=support_context["phone_number"],
+            issue_type=support_context["issue_type"],
+            description=support_context["description"]
+        )
+
+        name_value = extract_name_value(support_context["name"])
+        description = support_context["description"]
+
+        # Make sure to clear the context BEFORE returning the response
+        clear_support_context(turn.session)
+
+        if success:
+            turn.committed = True
+            return support_ticket_response(description, name_value)
+        else:
+            return error_response("support_ticket_failed", message)
+
+    # Handle the staged flow for collecting support info
+    if support_context["awaiting"] is None:
+        # Starting the flow - ask for name
+        support_context["awaiting"] = "name"
+        return technical_support_name_response()
+
+    elif support_context["awaiting"] == "name":
+        support_context["name"] = user_input
+        support_context["awaiting"] = "phone_number"
+        return technical_support_phone_response(support_context["name"])
+
+    elif support_context["awaiting"] == "phone_number":
+        support_context["phone_number"] = user_input
+        support_context["awaiting"] = "issue_type"
+        return technical_support_issue_response(support_context["name"])
+
+    elif support_context["awaiting"] == "issue_type":
+        # Try to identify issue type from user input
+        issue_type, _ = extract_support_request_details(user_input)
+        support_context["issue_type"] = issue_type
+        support_context["awaiting"] = "description"
+        return technical_support_description_response(issue_type)
+
+    elif support_context["awaiting"] == "description":
+        support_context["description"] = user_input
+
+        # Create support ticket with session ID
+        success, message = await create_support_ticket(
+            session_id=turn.session_id,
+            name=support_context["name"],
+            phone_number=support_context["phone_number"],
+            issue_type=support_context["issue_type"],
+            description=support_context["description"]
+        )
+
+        name = support_context["name"]
+        description = support_context["description"]
+
+        # Make sure to clear the context BEFORE returning the response
+        clear_support_context(turn.session)
+
+        if success:
+            turn.committed = True
+            return support_ticket_response(description, name)
+        else:
+            return error_response("support_ticket_failed", message)
+
+    # If no awaiting state is set, start the technical support flow
+    support_context["awaiting"] = "name"
+    return technical_support_name_response()
+
+
+async def device_request(turn: Turn) -> Optional[JSONResponse]:
+    """Start the support flow (to collect name and phone) for a "device not working" message"""
+    if turn.signals.is_technical_support_request and _is_device_issue(turn.user_input):
+        turn.session["support"]["awaiting"] = "name"
+        return technical_support_name_response()
+    return None
+
+
+async def support_request(turn: Turn) -> Optional[JSONResponse]:
+    """Start the support flow from a message Dialogflow did not route to Technical_Support"""
+    if turn.signals.is_technical_support_request and turn.intent != "Technical_Support":
+        turn.session["support"]["awaiting"] = "name"
+        return technical_support_name_response()
+    return None
+
+
+def register(router: IntentRouter) -> None:
+    router.add_awaiting(["support.description", "support.issue_type"], device_issue)
+    router.add_intent(["Technical_Support - cancel"], cancel)
+    router.add_intent(["Technical_Support - skip_name"], skip_name)
+    router.add_intent(["Technical_Support - skip_phone"], skip_phone)
+    router.add_intent(["Technical_Support - issue"], issue_selected)
+    router.add_intent(["Technical_Support"], support_flow)
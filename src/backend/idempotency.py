@@ -0,0 +1,107 @@
+import asyncio
+import time
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+from fastapi.responses import Response
+
+from response_templates import PrerenderedJSONResponse
+from session_store import SessionStore
+
+IDEMPOTENCY_CONFIG = {
+    "ttl_seconds": 300,            # how long an answer keyed on Dialogflow's responseId is replayed
+    "max_entries": 5000            # oldest answers go first past this
+}
+
+# (expires_at, status_code, body) of an answered webhook call
+CachedResponse = Tuple[float, int, bytes]
+
+
+def idempotency_key(req: Dict[str, Any]) -> Tuple[Optional[str], float]:
+    """Key and TTL for a webhook request, keyed on its responseId
+
+    A request without a responseId gets no key: the same text sent twice in a
+    session ("add 1 naan", "add 1 naan") is two turns, not a retry.
+    """
+    response_id = req.get("responseId")
+    if response_id:
+        return f"rid:{response_id}", IDEMPOTENCY_CONFIG["ttl_seconds"]
+    return None, 0.0
+
+
+class IdempotencyCache:
+    """Replay the answer to a webhook call Dialogflow delivers more than once
+
+    A finished call's response is kept for its TTL, so a retry gets the same
+    bytes back without touching the database. A duplicate that arrives while
+    the first delivery is still running waits for that result instead of
+    running the turn again. Only successful (2xx) answers are kept; a failed
+    attempt leaves the retry free to try again.
+
+    The cache is per process, so with several workers a retry is only
+    absorbed when it reaches the worker that took the first delivery.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = IDEMPOTENCY_CONFIG["max_entries"],
+        ttl_seconds: float = IDEMPOTENCY_CONFIG["ttl_seconds"]
+    ):
+        # Expiry is checked per entry; the store's TTL only bounds how long anything is kept
+        self._done = SessionStore(lambda: None, idle_ttl_seconds=ttl_seconds, max_sessions=max_entries)
+        self._in_flight: Dict[str, "asyncio.Future[Optional[CachedResponse]]"] = {}
+        self._stats = {"hits": 0, "waits": 0, "misses": 0, "stored": 0, "unkeyed": 0}
+
+    @staticmethod
+    def _replay(entry: CachedResponse) -> Response:
+        return PrerenderedJSONResponse(entry[2], status_code=entry[1])
+
+    def _cached(self, key: str) -> Optional[CachedResponse]:
+        entry = self._done.peek(key)
+        if entry is None or entry[0] < time.monotonic():
+            return None
+        return entry
+
+    async def run(self, key: Optional[str], ttl_seconds: float, answer: Callable[[], Awaitable[Response]]) -> Response:
+        """Return the cached or in-flight answer for key, or compute it with answer(); no key, no caching"""
+        if key is None:
+            self._stats["unkeyed"] += 1
+            return await answer()
+        while True:
+            entry = self._cached(key)
+            if entry is not None:
+                self._stats["hits"] += 1
+                return self._replay(entry)
+
+            pending = self._in_flight.get(key)
+            if pending is None:
+                break
+            self._stats["waits"] += 1
+            entry = await asyncio.shield(pending)
+            if entry is not None:
+                return self._replay(entry)
+            # The first delivery failed; go round again so only one duplicate retries it
+
+        self._stats["misses"] += 1
+        pending = asyncio.get_running_loop().create_future()
+        self._in_flight[key] = pending
+        entry = None
+        try:
+            response = await answer()
+            if 200 <= response.status_code < 300:
+                entry = (time.monotonic() + ttl_seconds, response.status_code, bytes(response.body))
+                self._done.set(key, entry)
+                self._stats["stored"] += 1
+            return response
+        finally:
+            del self._in_flight[key]
+            pending.set_result(entry)
+
+    def stats(self) -> Dict[str, Any]:
+        store = self._done.stats()
+        return {
+            **self._stats,
+            "in_flight": len(self._in_flight),
+            "cached": store["live"],
+            "bytes": store["bytes"],
+            "evicted": store["evicted"]
+        }
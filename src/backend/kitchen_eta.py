@@ -0,0 +1,206 @@
+import threading
+import logging
+from datetime import datetime, timedelta
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+KITCHEN_CONFIG = {
+    "cooks": 3,                    # stations working the queue in parallel
+    "default_prep_minutes": 10,    # items missing from prep_minutes
+    # Hands-on minutes per unit, keyed like order_items.food_item
+    "prep_minutes": {
+        "pepsi": 1, "rooh_afza": 2, "lassi": 3,
+        "kheer": 3, "rasmalai": 3, "jalebi": 8, "chocolate_lava": 12,
+        "samosa": 8, "pakora": 8, "fruit_chat": 5,
+        "garlic_naan": 5, "haleem": 10, "nihari": 10, "paya": 10,
+        "beef_burger": 10, "zinger_burger": 10, "shami_kebab": 10, "chapli_kebab": 12,
+        "chicken_biryani": 15, "seekh_kebab": 15, "fish_fry": 15, "malai_boti": 15,
+        "mutton_karahi": 25
+    },
+    # Orders in these states are still waiting on the kitchen
+    "open_statuses": ("Pending", "Confirmed", "Preparing")
+}
+
+# (order_id, estimated ready time) for orders whose ETA moved
+ReadyTimes = List[Tuple[int, datetime]]
+
+
+def _ceil_minute(moment: datetime) -> datetime:
+    """Round up to the whole minute so a replay that moves an ETA by seconds does not rewrite it"""
+    rounded = moment.replace(second=0, microsecond=0)
+    return rounded if rounded == moment else rounded + timedelta(minutes=1)
+
+
+class KitchenTicket:
+    """One order's place in the kitchen queue"""
+    __slots__ = ("order_id", "placed_at", "work", "shortest", "ready_at")
+
+    def __init__(self, placed_at: datetime, work: timedelta, shortest: timedelta):
+        self.order_id: Optional[int] = None
+        self.placed_at = placed_at
+        self.work = work            # cooking time once spread across the cooks
+        self.shortest = shortest    # the slowest single dish; no order is ready sooner
+        self.ready_at = placed_at
+
+
+class KitchenETA:
+    """First-in-first-out model of the kitchen backlog that turns open orders into ready-by times
+
+    The model keeps the moment the kitchen will have cooked everything queued,
+    so a new order is quoted in O(1): its work is added after that point. When
+    an order leaves the kitchen (on the way, delivered or cancelled) or a ticket
+    is withdrawn, it is pruned from the queue, the rest is replayed from the
+    placement times and the orders whose ETA moved are returned for one bulk update.
+    """
+
+    def __init__(self, config: Optional[Dict[str, Any]] = None):
+        self.config = dict(KITCHEN_CONFIG, **(config or {}))
+        self._lock = threading.Lock()
+        # Insertion-ordered, so FIFO order is kept while removal stays O(1)
+        self._queue: Dict[KitchenTicket, None] = {}
+        self._by_order: Dict[int, KitchenTicket] = {}
+        self._clear_at: Optional[datetime] = None
+        self._stats = {"placed": 0, "finished": 0, "withdrawn": 0, "replays": 0, "seeded": 0}
+
+    def is_open(self, status: str) -> bool:
+        return status in self.config["open_statuses"]
+
+    def _ticket(self, items: Iterable[Tuple[str, int]], placed_at: datetime) -> KitchenTicket:
+        prep = self.config["prep_minutes"]
+        default = self.config["default_prep_minutes"]
+        minutes = [(prep.get(name.replace(' ', '_').lower(), default), quantity) for name, quantity in items]
+        work = sum(each * quantity for each, quantity in minutes) / self.config["cooks"]
+        shortest = max((each for each, _ in minutes), default=0)
+        return KitchenTicket(placed_at, timedelta(minutes=work), timedelta(minutes=shortest))
+
+    @staticmethod
+    def _timing(ticket: KitchenTicket, clear_at: Optional[datetime], now: datetime) -> Tuple[datetime, datetime]:
+        """(time the kitchen is clear after this ticket, its ready time) when queued behind clear_at"""
+        start = ticket.placed_at if clear_at is None else max(ticket.placed_at, clear_at)
+        clear_at = start + ticket.work
+        # A kitchen running late cannot have an order ready in the past
+        return clear_at, _ceil_minute(max(clear_at, ticket.placed_at + ticket.shortest, now))
+
+    def _schedule(self, ticket: KitchenTicket, now: datetime) -> None:
+        """Queue the ticket's work behind everything before it (caller holds the lock)"""
+        self._clear_at, ticket.ready_at = self._timing(ticket, self._clear_at, now)
+
+    def _replay(self, now: datetime) -> ReadyTimes:
+        """Re-time the whole queue; returns the orders whose ETA changed (caller holds the lock)"""
+        self._stats["replays"] += 1
+        self._clear_at = None
+        changed: ReadyTimes = []
+        for ticket in self._queue:
+            before = ticket.ready_at
+            self._schedule(ticket, now)
+            if ticket.order_id is not None and ticket.ready_at != before:
+                changed.append((ticket.order_id, ticket.ready_at))
+        return changed
+
+    def place(self, items: Iterable[Tuple[str, int]], now: Optional[datetime] = None) -> KitchenTicket:
+        """Queue a new order's items and return its ticket; ticket.ready_at is the quote"""
+        now = now or datetime.now()
+        ticket = self._ticket(items, now)
+        with self._lock:
+            self._schedule(ticket, now)
+            self._queue[ticket] = None
+            self._stats["placed"] += 1
+        return ticket
+
+    def bind(self, ticket: KitchenTicket, order_id: int) -> None:
+        """Attach the order id once the order is committed"""
+        with self._lock:
+            ticket.order_id = order_id
+            self._by_order[order_id] = ticket
+
+    def withdraw(self, ticket: KitchenTicket, now: Optional[datetime] = None) -> ReadyTimes:
+        """Drop a ticket whose order was never written; returns the re-timed orders"""
+        with self._lock:
+            if not self._prune(ticket):
+                return []
+            self._stats["withdrawn"] += 1
+            return self._replay(now or datetime.now())
+
+    def _prune(self, ticket: KitchenTicket) -> bool:
+        """Take a ticket out of the queue and the order index (caller holds the lock)"""
+        if ticket.order_id is not None:
+            self._by_order.pop(ticket.order_id, None)
+        if ticket not in self._queue:
+            return False
+        del self._queue[ticket]
+        return True
+
+    def preview_status_change(self, order_id: int, status: str, now: datetime) -> ReadyTimes:
+        """The orders status_changed would re-time, without touching the model
+
+        Lets the caller write the new ETAs in the status change's transaction
+        and apply status_changed only once that transaction has committed.
+        """
+        if self.is_open(status):
+            return []
+        with self._lock:
+            leaving = self._by_order.get(int(order_id))
+            if leaving is None:
+                return []
+            clear_at: Optional[datetime] = None
+            changed: ReadyTimes = []
+            for ticket in self._queue:
+                if ticket is leaving:
+                    continue
+                clear_at, ready_at = self._timing(ticket, clear_at, now)
+                if ticket.order_id is not None and ready_at != ticket.ready_at:
+                    changed.append((ticket.order_id, ready_at))
+            return changed
+
+    def status_changed(self, order_id: int, status: str, now: Optional[datetime] = None) -> ReadyTimes:
+        """Take an order that left the kitchen out of the queue; returns the re-timed orders"""
+        if self.is_open(status):
+            return []
+        with self._lock:
+            ticket = self._by_order.get(int(order_id))
+            if ticket is None or not self._prune(ticket):
+                return []
+            self._stats["finished"] += 1
+            return self._replay(now or datetime.now())
+
+    def seed(self, rows: Iterable[Dict[str, Any]], now: Optional[datetime] = None) -> ReadyTimes:
+        """Rebuild the queue from open order_items rows (order_id, created_at, estimated_ready_at, food_item, quantity)
+
+        Rows must be ordered by order_id. Returns the orders whose stored ETA
+        differs from the model's.
+        """
+        orders: Dict[int, Tuple[datetime, Optional[datetime], List[Tuple[str, int]]]] = {}
+        for row in rows:
+            entry = orders.setdefault(row["order_id"], (row["created_at"], row["estimated_ready_at"], []))
+            entry[2].append((row["food_item"], int(row["quantity"])))
+
+        queue: Dict[KitchenTicket, None] = {}
+        for order_id, (placed_at, stored, items) in orders.items():
+            ticket = self._ticket(items, placed_at)
+            ticket.order_id = order_id
+            ticket.ready_at = stored
+            queue[ticket] = None
+
+        with self._lock:
+            self._queue = queue
+            self._by_order = {ticket.order_id: ticket for ticket in queue}
+            self._stats["seeded"] = len(queue)
+            changed = self._replay(now or datetime.now())
+        logger.info("Kitchen queue seeded with %d open orders", len(queue))
+        return changed
+
+    def ready_at(self, order_id: int) -> Optional[datetime]:
+        with self._lock:
+            ticket = self._by_order.get(int(order_id))
+            return ticket.ready_at if ticket else None
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            backlog = (self._clear_at - datetime.now()).total_seconds() / 60 if self._clear_at else 0.0
+            return {
+                **self._stats,
+                "open_orders": len(self._queue),
+                "backlog_minutes": round(max(backlog, 0.0), 1),
+                "cooks": self.config["cooks"]
+            }
@@ -0,0 +1,223 @@
+import json
+import logging
+import logging.handlers
+import queue
+import random
+import sys
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional
+
+# Where and how much the app logs. Records are queued by the request thread
+# and formatted and written by a background listener, so a slow disk or
+# terminal never stalls a webhook call.
+LOGGING_CONFIG = {
+    "level": "INFO",
+    "json": True,                    # one JSON object per line; False for plain text
+    "console": True,                 # also write to stderr
+    "file_path": None,               # e.g. "karachibites.log"; rotated by size when set
+    "max_bytes": 10 * 1024 * 1024,   # rotate the file past this size
+    "backup_count": 5,               # rotated files kept
+    "queue_size": 10000,             # records buffered before new ones are dropped
+    "flush_interval": 0.05,          # seconds the writer lets records collect before writing a batch
+    # Fraction of records kept per level; WARNING and above are always kept
+    "sample_rates": {"DEBUG": 1.0, "INFO": 1.0}
+}
+
+# Attributes every LogRecord has; anything else came in through `extra=` and is emitted as a field
+_RECORD_ATTRIBUTES = set(vars(logging.LogRecord("", 0, "", 0, "", (), None))) | {"message", "asctime"}
+
+_listener: Optional["BatchingQueueListener"] = None
+_queue_handler: Optional["DroppingQueueHandler"] = None
+_lock = threading.Lock()
+
+
+class JsonFormatter(logging.Formatter):
+    """Structured log lines: timestamp, level, logger, message, extra fields and any traceback"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry: Dict[str, Any] = {
+            "ts": datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "msg": record.getMessage()
+        }
+        for key, value in record.__dict__.items():
+            if key not in _RECORD_ATTRIBUTES:
+                entry[key] = value
+        if record.exc_info:
+            entry["exc"] = self.formatException(record.exc_info)
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+class TextFormatter(logging.Formatter):
+    """Plain log lines with any extra fields appended as key=value"""
+
+    def __init__(self):
+        super().__init__("%(asctime)s %(levelname)s %(name)s: %(message)s")
+
+    def format(self, record: logging.LogRecord) -> str:
+        line = super().format(record)
+        extras = " ".join(
+            f"{key}={value!r}" for key, value in record.__dict__.items() if key not in _RECORD_ATTRIBUTES
+        )
+        return f"{line} {extras}" if extras else line
+
+
+class SamplingFilter(logging.Filter):
+    """Keep a configured fraction of records per level; WARNING and above always pass"""
+
+    def __init__(self, sample_rates: Dict[str, float]):
+        super().__init__()
+        self.rates = {logging.getLevelName(level): rate for level, rate in sample_rates.items()}
+        self.dropped = 0
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno >= logging.WARNING:
+            return True
+        rate = self.rates.get(record.levelno, 1.0)
+        if rate >= 1.0 or random.random() < rate:
+            return True
+        self.dropped += 1
+        return False
+
+
+class DroppingQueueHandler(logging.handlers.QueueHandler):
+    """QueueHandler that never blocks: records are queued unformatted and dropped when the queue is full
+
+    The stdlib handler formats the message on the calling thread; here
+    getMessage() runs on the listener thread instead, so a record that is
+    sampled out or dropped never pays for formatting.
+    """
+
+    def __init__(self, log_queue: "queue.Queue[logging.LogRecord]"):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+class BatchingQueueListener:
+    """Background thread that writes queued records to the handlers in batches
+
+    It waits for a record, lets more collect for flush_interval, then writes
+    everything queued. Waking once per batch rather than once per record
+    keeps the writer from contending with request threads for the GIL.
+    """
+
+    _STOP = None
+
+    def __init__(self, log_queue: "queue.Queue[Optional[logging.LogRecord]]",
+                 handlers: List[logging.Handler], flush_interval: float):
+        self.queue = log_queue
+        self.handlers = handlers
+        self.flush_interval = flush_interval
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        self._thread = threading.Thread(target=self._run, name="log-writer", daemon=True)
+        self._thread.start()
+
+    def _handle(self, record: logging.LogRecord) -> None:
+        for handler in self.handlers:
+            if record.levelno >= handler.level:
+                handler.handle(record)
+
+    def _run(self) -> None:
+        while True:
+            record = self.queue.get()
+            if record is self._STOP:
+                return
+            self._handle(record)
+            time.sleep(self.flush_interval)
+            while True:
+                try:
+                    record = self.queue.get_nowait()
+                except queue.Empty:
+                    break
+                if record is self._STOP:
+                    return
+                self._handle(record)
+
+    def stop(self) -> None:
+        """Write out everything already queued, then end the thread"""
+        if self._thread is None:
+            return
+        # Blocking put: the stop marker must get in even if the queue is full
+        self.queue.put(self._STOP)
+        self._thread.join()
+        self._thread = None
+
+
+def _build_handlers(config: Dict[str, Any]) -> List[logging.Handler]:
+    formatter = JsonFormatter() if config["json"] else TextFormatter()
+    handlers: List[logging.Handler] = []
+    if config["console"]:
+        handlers.append(logging.StreamHandler(sys.stderr))
+    if config["file_path"]:
+        handlers.append(logging.handlers.RotatingFileHandler(
+            config["file_path"], maxBytes=config["max_bytes"],
+            backupCount=config["backup_count"], encoding="utf-8"
+        ))
+    for handler in handlers:
+        handler.setFormatter(formatter)
+    return handlers
+
+
+def configure_logging(config: Optional[Dict[str, Any]] = None) -> None:
+    """Route the root logger through the background queue; replaces any earlier setup"""
+    global _listener, _queue_handler
+    config = {**LOGGING_CONFIG, **(config or {})}
+    with _lock:
+        _stop_listener()
+        root = logging.getLogger()
+        for handler in list(root.handlers):
+            root.removeHandler(handler)
+        root.setLevel(config["level"])
+
+        log_queue: "queue.Queue[logging.LogRecord]" = queue.Queue(maxsize=config["queue_size"])
+        _queue_handler = DroppingQueueHandler(log_queue)
+        _queue_handler.addFilter(SamplingFilter(config["sample_rates"]))
+        root.addHandler(_queue_handler)
+
+        _listener = BatchingQueueListener(log_queue, _build_handlers(config), config["flush_interval"])
+        _listener.start()
+
+
+def _stop_listener() -> None:
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        for handler in _listener.handlers:
+            handler.close()
+        _listener = None
+
+
+def shutdown_logging() -> None:
+    """Flush queued records, stop the listener thread and detach the queue from the root logger"""
+    with _lock:
+        _stop_listener()
+        if _queue_handler is not None:
+            logging.getLogger().removeHandler(_queue_handler)
+
+
+def get_logging_stats() -> Dict[str, Any]:
+    """Records dropped by sampling or because the queue was full, and the current backlog"""
+    handler = _queue_handler
+    if handler is None:
+        return {"configured": False}
+    sampled_out = sum(f.dropped for f in handler.filters if isinstance(f, SamplingFilter))
+    return {
+        "configured": True,
+        "queued": handler.queue.qsize(),
+        "dropped_queue_full": handler.dropped,
+        "dropped_sampled": sampled_out
+    }
@@ -1,746 +1,302 @@
 from fastapi import FastAPI, Request
-import re
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, PlainTextResponse, Response, StreamingResponse
+from fastapi.staticfiles import StaticFiles
+import hmac
+import json
 import logging
+import os
+import time
+from pathlib import Path
+from typing import Any, Dict
 import uvicorn
-from typing import Dict, Any, List, Optional, Union
-from datetime import datetime
 from database import (
-    create_order, get_order_status, get_menu_item_details, 
-    create_support_ticket, create_reservation, submit_customer_feedback,
-    extract_name_value
+    get_pool_stats, close_pool, validate_schema, get_schema_status,
+    get_menu_cache_stats, warm_menu_cache, get_order_status_stats,
+    warm_kitchen_eta, get_kitchen_eta_stats
 )
-from order_utils import (
-    extract_order_details, extract_order_id, extract_dish_item,
-    is_price_query, is_stock_query, extract_item_and_intent, 
-    normalize_item_name, extract_support_request_details,
-    is_technical_support_request, is_feedback_request
-)
-from response_templates import (
-    error_response, order_success_response, ask_for_order_items,
-    ask_for_order_number, order_status_response, product_price_response,
-    product_stock_response, product_full_response, support_ticket_response,
-    reservation_success_response, ask_reservation_question,
-    feedback_prompt_name_response, feedback_prompt_phone_response,
-    feedback_prompt_text_response, feedback_submitted_response,
-    feedback_cancelled_response, technical_support_name_response,
-    technical_support_phone_response, technical_support_issue_response,
-    technical_support_description_response, technical_support_cancelled_response
+from async_database import (
+    DatabaseBusyError, shutdown_executor, get_executor_stats, get_order_status, update_order_status
 )
+from write_behind import get_write_behind
+from order_utils import classify_utterance
+from response_templates import error_response
+from conversation import load_session, save_session, merge_session, awaiting_states, session_backend
+from router import Turn
+from session_backend import SessionConflictError
+from idempotency import IdempotencyCache, idempotency_key
+from admission import AdmissionController, AdmissionRejected, request_priority
+from order_events import SubscriberLimitError, event_stream, order_event_hub
+from log_pipeline import configure_logging, get_logging_stats, shutdown_logging
+from metrics import REGISTRY, Gauge, Histogram, numeric_fields
+from handlers import build_router
 
 app = FastAPI()
-logging.basicConfig(level=logging.INFO)
+# Logs are queued and written by a background thread (see LOGGING_CONFIG)
+configure_logging()
 logger = logging.getLogger(__name__)
 
-# Conversation state tracking
-conversation_state: Dict[str, Dict[str, Any]] = {}
-
-def clear_reservation_context(session_id: str):
-    """Clear reservation context for a session"""
-    if session_id in conversation_state:
-        conversation_state[session_id]["reservation"] = {
-            "guests": None,
-            "datetime": None,
-            "retry_count": 0
-        }
-
-def clear_feedback_context(session_id: str):
-    """Clear feedback context for a session"""
-    if session_id in conversation_state:
-        conversation_state[session_id]["feedback"] = {
-            "name": None,
-            "phone_number": None,
-            "text": None,
-            "awaiting": None
-        }
-
-def clear_support_context(session_id: str):
-    """Clear support context for a session"""
-    if session_id in conversation_state:
-        conversation_state[session_id]["support"] = {
-            "name": None,
-            "phone_number": None,
-            "issue_type": None,
-            "description": None,
-            "awaiting": None
-        }
-
-def extract_datetime_info(text: str) -> Optional[Dict[str, Any]]:
-    """Extract date and time information from text"""
-    # Try various regex patterns to capture different date formats
-    patterns = [
-        # 10 jan 25 10 pm
-        r'(\d+)\s+([a-z]{3,})\s+(\d{2,4})\s+(\d{1,2})\s+([ap]m)',
-        # 1/1/25 2 pm
-        r'(\d{1,2})/(\d{1,2})/(\d{2,4})\s+(\d{1,2})\s+([ap]m)',
-        # January 10, 2025 at 2 PM
-        r'([a-z]{3,})\s+(\d{1,2})(?:,|\s+)?\s+(\d{2,4})(?:\s+at)?\s+(\d{1,2})\s+([ap]m)',
-        # 10 jan 10 pm
-        r'(\d+)\s+([a-z]{3,})\s+(\d{1,2})\s+([ap]m)',
-    ]
-    
-    text = text.lower()
-    
-    for pattern in patterns:
-        match = re.search(pattern, text)
-        if match:
-            return {
-                'match': match,
-                'pattern': pattern
-            }
+WEBHOOK_SECONDS = Histogram(
+    "karachibites_webhook_seconds", "Webhook turn time from parsed request to response, by Dialogflow intent", ["intent"]
+)
+STAGE_SECONDS = Histogram(
+    "karachibites_webhook_stage_seconds", "Webhook time per stage: parse, session_load, dispatch, session_save", ["stage"]
+)
+ROUTE_SECONDS = Histogram(
+    "karachibites_route_seconds", "Handler time per router route, split by whether it answered the turn", ["route", "handled"]
+)
+
+# Series looked up once; these are hit on every turn
+PARSE_SECONDS = STAGE_SECONDS.labels("parse")
+SESSION_LOAD_SECONDS = STAGE_SECONDS.labels("session_load")
+DISPATCH_SECONDS = STAGE_SECONDS.labels("dispatch")
+SESSION_SAVE_SECONDS = STAGE_SECONDS.labels("session_save")
+
+def observe_route(route: str, seconds: float, handled: bool) -> None:
+    ROUTE_SECONDS.labels(route, "true" if handled else "false").observe(seconds)
+
+# Handlers for every intent and awaiting state, built once at import
+router = build_router(timing_hook=observe_route)
+
+# Answers already given, so a webhook call Dialogflow retries is not run twice
+idempotency_cache = IdempotencyCache()
+
+# Caps turns in progress; overflow waits by priority or is shed before Dialogflow gives up
+admission = AdmissionController()
+
+# Who may move orders along and which pages may follow them
+API_ACCESS_CONFIG = {
+    # Sent by the kitchen display as X-Kitchen-Token; status updates are refused while unset
+    "kitchen_token": os.environ.get("KARACHIBITES_KITCHEN_TOKEN", ""),
+    # The site in src/frontend is served by this app, so its Track Order page is same-origin.
+    # Hosting it elsewhere? List that origin in KARACHIBITES_FRONTEND_ORIGINS, comma-separated,
+    # e.g. "https://karachibites.pk,http://localhost:5500"; unset means same-origin only
+    "frontend_origins": tuple(
+        origin.strip() for origin in os.environ.get("KARACHIBITES_FRONTEND_ORIGINS", "").split(",") if origin.strip()
+    )
+}
+
+FRONTEND_DIR = Path(__file__).resolve().parents[1] / "frontend"
+
+def is_kitchen_request(request: Request) -> bool:
+    """True when the request carries the configured kitchen token"""
+    expected = API_ACCESS_CONFIG["kitchen_token"]
+    supplied = request.headers.get("x-kitchen-token", "")
+    return bool(expected) and hmac.compare_digest(supplied.encode(), expected.encode())
+
+def cors_headers(request: Request) -> Dict[str, str]:
+    """Allow-Origin for pages on a configured frontend origin; nothing for anyone else"""
+    origin = request.headers.get("origin")
+    if origin in API_ACCESS_CONFIG["frontend_origins"]:
+        return {"Access-Control-Allow-Origin": origin, "Vary": "Origin"}
+    return {}
+
+# Gauges read from the components' own stats() when /metrics is scraped
+Gauge("karachibites_db_pool", "Database connection pool state", ["field"], callback=lambda: numeric_fields(get_pool_stats()))
+Gauge("karachibites_db_executor", "Database executor state", ["field"], callback=lambda: numeric_fields(get_executor_stats()))
+Gauge("karachibites_sessions", "Session backend state", ["field"], callback=lambda: numeric_fields(session_backend.stats()))
+Gauge("karachibites_idempotency", "Idempotency cache state", ["field"], callback=lambda: numeric_fields(idempotency_cache.stats()))
+Gauge("karachibites_admission", "Webhook admission state", ["field"], callback=lambda: numeric_fields(admission.stats()))
+Gauge("karachibites_kitchen", "Kitchen queue state", ["field"], callback=lambda: numeric_fields(get_kitchen_eta_stats()))
+Gauge("karachibites_order_events", "Order event stream state", ["field"], callback=lambda: numeric_fields(order_event_hub.stats()))
+
+@app.on_event("startup")
+def startup_event():
+    """Validate the database schema, load the menu and seed the kitchen queue before serving traffic"""
+    validate_schema()
+    warm_menu_cache()
+    warm_kitchen_eta()
+    write_behind = get_write_behind()
+    if write_behind is not None:
+        write_behind.start()
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Flush queued writes and logs, drain the DB executor and release pooled connections on shutdown"""
+    write_behind = get_write_behind()
+    if write_behind is not None:
+        write_behind.stop()
+    shutdown_executor()
+    close_pool()
+    await session_backend.close()
+    shutdown_logging()
+
+@app.get("/stats")
+def stats():
+    """Expose runtime counters used for capacity planning"""
+    write_behind = get_write_behind()
+    return {
+        "db_pool": get_pool_stats(),
+        "db_executor": get_executor_stats(),
+        "menu_cache": get_menu_cache_stats(),
+        "order_status": get_order_status_stats(),
+        "write_behind": write_behind.stats() if write_behind is not None else {"enabled": False},
+        "routes": router.stats(),
+        "sessions": session_backend.stats(),
+        "idempotency": idempotency_cache.stats(),
+        "logging": get_logging_stats(),
+        "admission": admission.stats(),
+        "kitchen": get_kitchen_eta_stats(),
+        "order_events": order_event_hub.stats()
+    }
+
+@app.get("/metrics")
+def metrics():
+    """Latency histograms and pool/session gauges in the Prometheus text format"""
+    return PlainTextResponse(REGISTRY.render(), media_type="text/plain; version=0.0.4; charset=utf-8")
+
+@app.get("/ready")
+def ready(refresh: bool = False):
+    """Readiness probe backed by the cached startup schema validation"""
+    status = validate_schema(force=True) if refresh else get_schema_status()
+    return JSONResponse(content=status, status_code=200 if status["ok"] else 503)
+
+@app.post("/orders/{order_id}/status")
+async def set_order_status(order_id: int, request: Request):
+    """Move an order to a new status; an order leaving the kitchen re-times the ones behind it
+
+    Kitchen staff only: the request must carry the X-Kitchen-Token header.
+    """
+    if not is_kitchen_request(request):
+        return JSONResponse(content={"order_id": order_id, "error": "forbidden"}, status_code=403)
+    body = await request.json()
+    try:
+        success, message = await update_order_status(order_id, body.get("status", ""))
+    except DatabaseBusyError:
+        return JSONResponse(content={"order_id": order_id, "error": "database_busy"}, status_code=503)
+    if success:
+        return {"order_id": order_id, "status": body["status"]}
+    status_code = {"invalid_status": 400, "order_not_found": 404}.get(message, 500)
+    return JSONResponse(content={"order_id": order_id, "error": message}, status_code=status_code)
+
+@app.get("/orders/{order_id}")
+async def order_snapshot(order_id: int, request: Request):
+    """One order's current status and ETA; 404 only when the order does not exist"""
+    headers = cors_headers(request)
+    try:
+        success, order, error = await get_order_status(str(order_id))
+    except DatabaseBusyError:
+        success, order, error = False, None, "database_busy"
+    if not success:
+        return JSONResponse(content={"order_id": order_id, "error": error.split(':')[0]},
+                            status_code=404 if error == "order_not_found" else 503, headers=headers)
+    return Response(json.dumps(order, ensure_ascii=False, default=str), media_type="application/json", headers=headers)
+
+@app.get("/orders/{order_id}/events")
+async def order_events(order_id: int, request: Request):
+    """Server-Sent Events stream of one order's status and ETA, pushed as they change"""
+    try:
+        # Subscribe before reading the order so a change in between is still delivered
+        subscription = order_event_hub.subscribe(order_id)
+    except SubscriberLimitError:
+        return JSONResponse(content={"order_id": order_id, "error": "too_many_streams"}, status_code=503)
+    try:
+        success, order, error = await get_order_status(str(order_id))
+    except DatabaseBusyError:
+        success, order, error = False, None, "database_busy"
+    except BaseException:
+        subscription.close()
+        raise
+    if not success:
+        subscription.close()
+        return JSONResponse(content={"order_id": order_id, "error": error.split(':')[0]},
+                            status_code=404 if error == "order_not_found" else 503)
+    # A page on an allowed origin opens this with a plain EventSource, so no preflight is involved
+    headers = {"Cache-Control": "no-cache", "X-Accel-Buffering": "no", **cors_headers(request)}
+    return StreamingResponse(event_stream(subscription, order), media_type="text/event-stream", headers=headers)
+
+# Times a turn with no committed side effects is re-run after losing a session save race
+SESSION_CONFLICT_RETRIES = 2
+
+async def answer_turn(req: Dict[str, Any]) -> JSONResponse:
+    """Run one Dialogflow turn through the router and save the session it changed
+
+    If another worker saved the session meanwhile, a turn that only changed
+    conversation state is re-run on the newer session. A turn that already
+    wrote an order, reservation or ticket keeps its answer and has its session
+    changes merged instead, so the customer never sees a committed write as a failure.
+    """
+    query_result = req.get("queryResult", {})
+    user_input = query_result.get("queryText", "").strip().lower()
+    session_id = req.get("session", "default").split('/')[-1]
     
-    return None
+    intent = query_result.get("intent", {}).get("displayName", "")
+    started = time.perf_counter()
+
+    # One structured record per turn; the customer's own words (names, phone numbers,
+    # addresses) and the parameters parsed from them stay at DEBUG
+    if logger.isEnabledFor(logging.INFO):
+        logger.info("Webhook turn", extra={"intent": intent, "session_id": session_id, "input_chars": len(user_input)})
+    logger.debug("Webhook input: %s", user_input)
+    logger.debug("Webhook parameters: %s", query_result.get("parameters", {}))
+    signals = classify_utterance(user_input)
+
+    for attempt in range(SESSION_CONFLICT_RETRIES + 1):
+        # Load the session (initialized if new); it is saved back once the turn is answered
+        with SESSION_LOAD_SECONDS.time():
+            loaded = await load_session(session_id)
+        session = loaded.state
+
+        turn = Turn(
+            session_id=session_id,
+            session=session,
+            user_input=user_input,
+            intent=intent,
+            parameters=query_result.get("parameters", {}),
+            # One phrase scan per turn shared by every keyword detector
+            signals=signals,
+            awaiting=awaiting_states(session)
+        )
+        with DISPATCH_SECONDS.time():
+            response = await router.dispatch(turn)
+        try:
+            with SESSION_SAVE_SECONDS.time():
+                await save_session(loaded)
+            break
+        except SessionConflictError as e:
+            if turn.committed:
+                with SESSION_SAVE_SECONDS.time():
+                    merged = await merge_session(loaded)
+                if not merged:
+                    logger.warning("Session conflict after a committed turn, changes not saved: %s", e)
+                break
+            if attempt == SESSION_CONFLICT_RETRIES:
+                raise
+            logger.info("Session conflict, re-running turn: %s", e)
+    WEBHOOK_SECONDS.labels(intent or "none").observe(time.perf_counter() - started)
+    return response
+
+async def admitted_turn(req: Dict[str, Any], arrived: float) -> JSONResponse:
+    """Run the turn once admission control gives it a slot"""
+    async with admission.slot(request_priority(req), arrived):
+        return await answer_turn(req)
 
 @app.post("/webhook")
 async def webhook(request: Request):
+    arrived = time.monotonic()
     try:
-        req = await request.json()
-        query_result = req.get("queryResult", {})
-        user_input = query_result.get("queryText", "").strip().lower()
-        session_id = req.get("session", "default").split('/')[-1]
-        
-        # Initialize session if not exists
-        if session_id not in conversation_state:
-            conversation_state[session_id] = {
-                "context": None,
-                "awaiting_order_id": False,
-                "cart": [],
-                "reservation": {
-                    "guests": None,
-                    "datetime": None,
-                    "retry_count": 0
-                },
-                "feedback": {
-                    "name": None,
-                    "phone_number": None,
-                    "text": None,
-                    "awaiting": None
-                },
-                "support": {
-                    "name": None,
-                    "phone_number": None,
-                    "issue_type": None,
-                    "description": None,
-                    "awaiting": None
-                }
-            }
-
-        session = conversation_state[session_id]
-
-        # Debug logging
-        logger.info(f"Incoming request - Intent: {query_result.get('intent', {}).get('displayName')}")
-        logger.info(f"Parameters: {query_result.get('parameters', {})}")
-        logger.info(f"Session ID: {session_id}")
-        logger.info(f"User input: {user_input}")
-        
-        # Extract intent and parameters for cleaner code
-        intent = query_result.get("intent", {}).get("displayName", "")
-        parameters = query_result.get("parameters", {})
-
-        # Check if we're in the middle of the support flow and they say "my device is not working"
-        support_context = session["support"]
-        if support_context["awaiting"] == "description" and "device" in user_input and "not working" in user_input:
-            # We already have name and phone number, just create the ticket with those
-            issue_type, _ = extract_support_request_details(user_input)
-            
-            success, message = create_support_ticket(
-                session_id=session_id,
-                name=support_context["name"],
-                phone_number=support_context["phone_number"],
-                issue_type=issue_type or "device",
-                description=user_input
-            )
-            
-            name_value = extract_name_value(support_context["name"])
-            
-            # Clear context
-            clear_support_context(session_id)
-            
-            if success:
-                return support_ticket_response(user_input, name_value)
-            else:
-                return error_response("support_ticket_failed", message)
-                
-        # Handle technical support requests immediate only when we have collected name and phone
-        if support_context["awaiting"] == "issue_type" and "device" in user_input and "not working" in user_input:
-            issue_type, _ = extract_support_request_details(user_input)
-            
-            success, message = create_support_ticket(
-                session_id=session_id,
-                name=support_context["name"],
-                phone_number=support_context["phone_number"],
-                issue_type=issue_type or "device",
-                description=user_input
-            )
-            
-            name_value = extract_name_value(support_context["name"])
-            
-            # Clear context
-            clear_support_context(session_id)
-            
-            if success:
-                return support_ticket_response(user_input, name_value)
-            else:
-                return error_response("support_ticket_failed", message)
-
-        # Special case: If we're waiting for a reservation date and time, and the user provides it
-        # This is a direct handling of the date time case
-        reservation_context = session.get("reservation", {})
-        if reservation_context.get("guests") and "jan" in user_input and "pm" in user_input:
-            # We have direct date entry in the input
-            guests = reservation_context.get("guests")
-            datetime_param = user_input
-            
-            # Parse date time info for display
-            datetime_info = extract_datetime_info(user_input)
-            
-            # Create the reservation directly
-            success, message, reservation_id = create_reservation(
-                guests=guests,
-                datetime_param=datetime_param
-            )
-            
-            if success:
-                # Get display date and time from input
-                display_date = "Jan 01, 2025"  # Default 
-                display_time = "2:00 PM"      # Default
-                
-                if datetime_info:
-                    match = datetime_info['match']
-                    pattern = datetime_info['pattern']
-                    
-                    # Handle different patterns
-                    if pattern == r'(\d+)\s+([a-z]{3,})\s+(\d{2,4})\s+(\d{1,2})\s+([ap]m)':
-                        # 10 jan 25 10 pm
-                        day = match.group(1)
-                        month = match.group(2).capitalize()
-                        year = match.group(3)
-                        hour = match.group(4) 
-                        ampm = match.group(5).upper()
-                        
-                        # Format 2-digit year to 4 digits
-                        if len(year) == 2:
-                            year = "20" + year
-                            
-                        display_date = f"{month} {day}, {year}"
-                        display_time = f"{hour}:00 {ampm}"
-                        
-                    elif pattern == r'(\d{1,2})/(\d{1,2})/(\d{2,4})\s+(\d{1,2})\s+([ap]m)':
-                        # 1/1/25 2 pm
-                        month_num = int(match.group(1))
-                        day = match.group(2)
-                        year = match.group(3)
-                        hour = match.group(4)
-                        ampm = match.group(5).upper()
-                        
-                        # Convert month number to name
-                        months = ["Jan", "Feb", "Mar", "Apr", "May", "Jun", 
-                                 "Jul", "Aug", "Sep", "Oct", "Nov", "Dec"]
-                        month = months[month_num - 1]
-                        
-                        # Format 2-digit year to 4 digits
-                        if len(year) == 2:
-                            year = "20" + year
-                            
-                        display_date = f"{month} {day}, {year}"
-                        display_time = f"{hour}:00 {ampm}"
-                        
-                    elif pattern == r'([a-z]{3,})\s+(\d{1,2})(?:,|\s+)?\s+(\d{2,4})(?:\s+at)?\s+(\d{1,2})\s+([ap]m)':
-                        # January 10, 2025 at 2 PM
-                        month = match.group(1).capitalize()
-                        day = match.group(2)
-                        year = match.group(3)
-                        hour = match.group(4)
-                        ampm = match.group(5).upper()
-                        
-                        display_date = f"{month} {day}, {year}"
-                        display_time = f"{hour}:00 {ampm}"
-                        
-                    else:
-                        # 10 jan 10 pm - no year
-                        day = match.group(1)
-                        month = match.group(2).capitalize()
-                        hour = match.group(3)
-                        ampm = match.group(4).upper()
-                        
-                        display_date = f"{month} {day}, 2025"
-                        display_time = f"{hour}:00 {ampm}"
-                
-                # Clear reservation data
-                clear_reservation_context(session_id)
-                
-                # Return successful reservation response
-                return reservation_success_response(
-                    reservation_id=reservation_id,
-                    guests=guests,
-                    date=display_date,
-                    time=display_time
-                )
-            else:
-                return error_response("reservation_failed", message)
-
-        # Handle GiveCustomerFeedback intent and its flow
-        if intent.startswith("GiveCustomerFeedback"):
-            feedback_context = session["feedback"]
-            
-            # Handle skip name action
-            if intent == "GiveCustomerFeedback - skip_name":
-                feedback_context["awaiting"] = "phone_number"
-                return feedback_prompt_phone_response()
-                
-            # Handle skip phone action
-            elif intent == "GiveCustomerFeedback - skip_phone":
-                feedback_context["awaiting"] = "feedback_text"
-                return feedback_prompt_text_response(extract_name_value(feedback_context["name"]))
-                
-            # Main intent
-            elif intent == "GiveCustomerFeedback":
-                # Extract parameters if provided
-                name = parameters.get("name")
-                phone_number = parameters.get("phone-number")
-                feedback_text = parameters.get("feedback-text")
-                
-                # If user directly provides all information in one message
-                if name and phone_number and feedback_text:
-                    feedback_context["name"] = name
-                    feedback_context["phone_number"] = phone_number
-                    feedback_context["text"] = feedback_text
-                    
-                    # Submit feedback with session ID
-                    success, message = submit_customer_feedback(
-                        user_id=session_id,  # Use session_id here
-                        name=feedback_context["name"],
-                        phone_number=feedback_context["phone_number"],
-                        feedback_text=feedback_context["text"]
-                    )
-                    
-                    name_value = extract_name_value(feedback_context["name"])
-                    clear_feedback_context(session_id)
-                    if success:
-                        return feedback_submitted_response(name_value)
-                    else:
-                        return error_response("feedback_failed", message)
-                
-                # Handle the staged flow for collecting feedback
-                if feedback_context["awaiting"] is None:
-                    # Starting the flow - ask for name
-                    feedback_context["awaiting"] = "name"
-                    return feedback_prompt_name_response()
-                    
-                elif feedback_context["awaiting"] == "name":
-                    feedback_context["name"] = user_input
-                    feedback_context["awaiting"] = "phone_number"
-                    return feedback_prompt_phone_response(feedback_context["name"])
-                    
-                elif feedback_context["awaiting"] == "phone_number":
-                    feedback_context["phone_number"] = user_input
-                    feedback_context["awaiting"] = "feedback_text"
-                    return feedback_prompt_text_response(feedback_context["name"])
-                    
-                elif feedback_context["awaiting"] == "feedback_text":
-                    feedback_context["text"] = user_input
-                    
-                    # Submit feedback with session ID
-                    success, message = submit_customer_feedback(
-                        user_id=session_id,  # Use session_id here
-                        name=feedback_context["name"],
-                        phone_number=feedback_context["phone_number"],
-                        feedback_text=feedback_context["text"]
-                    )
-                    
-                    name = feedback_context["name"]
-                    clear_feedback_context(session_id)
-                    if success:
-                        return feedback_submitted_response(name)
-                    else:
-                        return error_response("feedback_failed", message)
-                
-                # If no awaiting state is set, start the feedback flow
-                feedback_context["awaiting"] = "name"
-                return feedback_prompt_name_response()
-            
-        # Handle Technical_Support intent and its flow
-        elif intent.startswith("Technical_Support"):
-            support_context = session["support"]
-            
-            # Handle cancel action
-            if intent == "Technical_Support - cancel":
-                clear_support_context(session_id)
-                return technical_support_cancelled_response()
-                
-            # Handle skip name action
-            elif intent == "Technical_Support - skip_name":
-                support_context["awaiting"] = "phone_number"
-                return technical_support_phone_response()
-                
-            # Handle skip phone action
-            elif intent == "Technical_Support - skip_phone":
-                support_context["awaiting"] = "issue_type"
-                return technical_support_issue_response(extract_name_value(support_context["name"]))
-                
-            # Handle issue type selection
-            elif intent == "Technical_Support - issue":
-                issue = parameters.get("issue")
-                if issue:
-                    support_context["issue_type"] = issue
-                    support_context["awaiting"] = "description"
-                    return technical_support_description_response(issue)
-                else:
-                    support_context["awaiting"] = "issue_type"
-                    return technical_support_issue_response(extract_name_value(support_context["name"]))
-                
-            # Main intent
-            elif intent == "Technical_Support":
-                # Extract parameters if provided
-                name = parameters.get("name")
-                phone_number = parameters.get("phone-number")
-                issue = parameters.get("issue")
-                description = parameters.get("description")
-                
-                # If user directly provides all information in one message
-                if name and phone_number and issue and description:
-                    support_context["name"] = name
-                    support_context["phone_number"] = phone_number
-                    support_context["issue_type"] = issue
-                    support_context["description"] = description
-                    
-                    # Create support ticket with session ID
-                    success, message = create_support_ticket(
-                        session_id=session_id,
-                        name=support_context["name"],
-                        phone_number=support_context["phone_number"],
-                        issue_type=support_context["issue_type"],
-                        description=support_context["description"]
-                    )
-                    
-                    name_value = extract_name_value(support_context["name"])
-                    description = support_context["description"]
-                    
-                    # Make sure to clear the context BEFORE returning the response
-                    clear_support_context(session_id)
-                    
-                    if success:
-                        return support_ticket_response(description, name_value)
-                    else:
-                        return error_response("support_ticket_failed", message)
-                
-                # Handle the staged flow for collecting support info
-                if support_context["awaiting"] is None:
-                    # Starting the flow - ask for name
-                    support_context["awaiting"] = "name"
-                    return technical_support_name_response()
-                    
-                elif support_context["awaiting"] == "name":
-                    support_context["name"] = user_input
-                    support_context["awaiting"] = "phone_number"
-                    return technical_support_phone_response(support_context["name"])
-                    
-                elif support_context["awaiting"] == "phone_number":
-                    support_context["phone_number"] = user_input
-                    support_context["awaiting"] = "issue_type"
-                    return technical_support_issue_response(support_context["name"])
-                    
-                elif support_context["awaiting"] == "issue_type":
-                    # Try to identify issue type from user input
-                    issue_type, _ = extract_support_request_details(user_input)
-                    support_context["issue_type"] = issue_type
-                    support_context["awaiting"] = "description"
-                    return technical_support_description_response(issue_type)
-                    
-                elif support_context["awaiting"] == "description":
-                    support_context["description"] = user_input
-                    
-                    # Create support ticket with session ID
-                    success, message = create_support_ticket(
-                        session_id=session_id,
-                        name=support_context["name"],
-                        phone_number=support_context["phone_number"],
-                        issue_type=support_context["issue_type"],
-                        description=support_context["description"]
-                    )
-                    
-                    name = support_context["name"]
-                    description = support_context["description"]
-                    
-                    # Make sure to clear the context BEFORE returning the response
-                    clear_support_context(session_id)
-                    
-                    if success:
-                        return support_ticket_response(description, name)
-                    else:
-                        return error_response("support_ticket_failed", message)
-                
-                # If no awaiting state is set, start the technical support flow
-                support_context["awaiting"] = "name"
-                return technical_support_name_response()
-
-        # Handle initial technical support requests (start flow)
-        if is_technical_support_request(user_input) and "device" in user_input and "not working" in user_input:
-            # Start the support flow instead of directly creating a ticket
-            # This ensures we collect name and phone number
-            support_context["awaiting"] = "name"
-            return technical_support_name_response()
-
-        # Handle feedback requests outside of direct intent
-        if is_feedback_request(user_input) and intent != "GiveCustomerFeedback":
-            # Start the GiveCustomerFeedback flow
-            feedback_context = session["feedback"]
-            feedback_context["awaiting"] = "name"
-            return feedback_prompt_name_response()
-
-        # Handle technical support requests outside of direct intent
-        if is_technical_support_request(user_input) and intent != "Technical_Support":
-            # Start the Technical_Support flow
-            support_context = session["support"]
-            support_context["awaiting"] = "name"
-            return technical_support_name_response()
-
-        # Check if we're awaiting an order ID
-        if session.get("awaiting_order_id"):
-            order_id = extract_order_id(user_input)
-            if order_id:
-                session["awaiting_order_id"] = False
-                success, order, error = get_order_status(order_id)
-                if success:
-                    return order_status_response(order)
-                return error_response(error, order_id)
-            else:
-                # If no order ID found, ask again
-                return ask_for_order_number()
-
-        # Handle direct order status requests (with ID included)
-        if ("order id" in user_input or "order status" in user_input or "status of" in user_input) and any(c.isdigit() for c in user_input):
-            order_id = extract_order_id(user_input)
-            if order_id:
-                success, order, error = get_order_status(order_id)
-                if success:
-                    return order_status_response(order)
-                return error_response(error, order_id)
-
-        # Clear context if user explicitly asks for reservation while in order flow
-        if "reservation" in user_input and session.get("context"):
-            logger.info("Clearing order context for reservation request")
-            session["context"] = None
-            clear_reservation_context(session_id)
-            return ask_reservation_question("guest_count")
-
-        # Handle price queries
-        if is_price_query(user_input):
-            dish_item = extract_dish_item(user_input)
-            if not dish_item:
-                return error_response("item_not_found", "Please specify an item")
-            
-            success, item_details, error = get_menu_item_details(dish_item)
-            if not success:
-                return error_response(error, dish_item)
-            
-            return product_price_response(item_details)
-
-        # Handle stock queries
-        elif is_stock_query(user_input):
-            dish_item = extract_dish_item(user_input)
-            if not dish_item:
-                return error_response("item_not_found", "Please specify an item")
-            
-            success, item_details, error = get_menu_item_details(dish_item)
-            if not success:
-                return error_response(error, dish_item)
-            
-            return product_stock_response(item_details)
-
-        # Handle reservation intent - simplified approach
-        if intent == "MakeReservation" or "reservation" in user_input or "book" in user_input:
-            # First, check if we're awaiting a datetime (already have guests)
-            if session["reservation"].get("guests") and not session["reservation"].get("datetime"):
-                if any(month in user_input for month in ["jan", "feb", "mar", "apr", "may", "jun", "jul", "aug", "sep", "oct", "nov", "dec"]):
-                    # Extract date information for display
-                    datetime_info = extract_datetime_info(user_input)
-                    
-                    if datetime_info:
-                        # Save the datetime string
-                        session["reservation"]["datetime"] = user_input
-                        
-                        # Create the reservation
-                        success, message, reservation_id = create_reservation(
-                            guests=session["reservation"]["guests"],
-                            datetime_param=user_input
-                        )
-                        
-                        if success:
-                            # Extract display date and time from input
-                            display_date = "January 1, 2025"  # Default 
-                            display_time = "2:00 PM"          # Default
-                            
-                            match = datetime_info['match']
-                            pattern = datetime_info['pattern']
-                            
-                            # Extract month and convert to text if needed
-                            month_names = ["January", "February", "March", "April", "May", "June", 
-                                          "July", "August", "September", "October", "November", "December"]
-                            month_abbr = ["Jan", "Feb", "Mar", "Apr", "May", "Jun", 
-                                         "Jul", "Aug", "Sep", "Oct", "Nov", "Dec"]
-                            
-                            # Try to extract parts based on the pattern
-                            try:
-                                if pattern.startswith(r'(\d+)\s+([a-z]{3,})'):
-                                    # Format: 10 jan 25 10 pm or 10 jan 10 pm
-                                    day = match.group(1)
-                                    month_text = match.group(2).lower()
-                                    
-                                    # Find month index
-                                    month_idx = -1
-                                    for i, abbr in enumerate(month_abbr):
-                                        if month_text.startswith(abbr.lower()):
-                                            month_idx = i
-                                            break
-                                    
-                                    month = month_abbr[month_idx] if month_idx >= 0 else "Jan"
-                                    
-                                    # Get year if available
-                                    year = "2025"  # Default
-                                    if len(match.groups()) >= 3:
-                                        year_text = match.group(3)
-                                        if len(year_text) == 2:
-                                            year = "20" + year_text
-                                        else:
-                                            year = year_text
-                                    
-                                    # Get time
-                                    if len(match.groups()) >= 5:
-                                        hour = match.group(4)
-                                        ampm = match.group(5).upper()
-                                        display_time = f"{hour}:00 {ampm}"
-                                    elif len(match.groups()) >= 4:
-                                        hour = match.group(3)
-                                        ampm = match.group(4).upper()
-                                        display_time = f"{hour}:00 {ampm}"
-                                    
-                                    display_date = f"{month} {day}, {year}"
-                                    
-                                elif pattern.startswith(r'(\d{1,2})/(\d{1,2})/'):
-                                    # Format: 1/1/25 2 pm
-                                    month_num = int(match.group(1))
-                                    day = match.group(2)
-                                    year_text = match.group(3)
-                                    hour = match.group(4)
-                                    ampm = match.group(5).upper()
-                                    
-                                    month = month_abbr[month_num-1]
-                                    
-                                    if len(year_text) == 2:
-                                        year = "20" + year_text
-                                    else:
-                                        year = year_text
-                                    
-                                    display_date = f"{month} {day}, {year}"
-                                    display_time = f"{hour}:00 {ampm}"
-                            except Exception as e:
-                                logger.error(f"Error parsing date for display: {e}")
-                                # Use defaults if parsing fails
-                                
-                            # Clear context
-                            guests = session["reservation"]["guests"]
-                            clear_reservation_context(session_id)
-                            
-                            # Return success response
-                            return reservation_success_response(
-                                reservation_id=reservation_id,
-                                guests=guests,
-                                date=display_date,
-                                time=display_time
-                            )
-                        else:
-                            return error_response("reservation_failed", message)
-                else:
-                    # Not a date format we recognize, ask again
-                    return ask_reservation_question("reserve_date_time")
-            
-            # Handle guest count if not provided yet
-            if not session["reservation"].get("guests"):
-                # Try to extract guest count from input
-                guest_match = re.search(r'(\d+)\s*(?:guests?|people)', user_input.lower())
-                if guest_match:
-                    try:
-                        guests = int(guest_match.group(1))
-                        if 1 <= guests <= 20:
-                            session["reservation"]["guests"] = guests
-                            session["reservation"]["retry_count"] = 0
-                            
-                            # Now ask for date and time
-                            return ask_reservation_question("reserve_date_time")
-                        else:
-                            return ask_reservation_question("guest_count")
-                    except (ValueError, TypeError):
-                        return ask_reservation_question("guest_count")
-                else:
-                    # Check if it's a guest parameter
-                    guests = parameters.get("guest_count")
-                    if guests is not None and guests != '':
-                        try:
-                            guests = int(float(guests))
-                            if 1 <= guests <= 20:
-                                session["reservation"]["guests"] = guests
-                                session["reservation"]["retry_count"] = 0
-                                
-                                # Now ask for date and time
-                                return ask_reservation_question("reserve_date_time")
-                            else:
-                                return ask_reservation_question("guest_count")
-                        except (ValueError, TypeError):
-                            return ask_reservation_question("guest_count")
-                    else:
-                        # If we still don't have guest count, ask for it
-                        return ask_reservation_question("guest_count")
-
-        # Handle product details requests
-        if intent in ["Product_FAQ", "Product_Details"]:
-            dish_item, info_type = extract_item_and_intent(user_input)
-            dish_item = dish_item or parameters.get("dish_items")
-            
-            if not dish_item:
-                return error_response("item_not_found", "that item")
-            
-            success, item_details, error = get_menu_item_details(dish_item)
-            if not success:
-                return error_response(error, dish_item)
-            
-            return product_full_response(item_details)
-
-        # Handle order status check requests
-        if "order status" in user_input or "what is my order status" in user_input:
-            # First check if order ID is already in the input
-            order_id = extract_order_id(user_input)
-            if order_id:
-                success, order, error = get_order_status(order_id)
-                if success:
-                    return order_status_response(order)
-                return error_response(error, order_id)
-            else:
-                # If no order ID found, set context and ask for it
-                session["awaiting_order_id"] = True
-                return ask_for_order_number()
-
-        # Handle new orders
-        elif intent == "PlaceOrder" or any(w in user_input for w in ["order", "want", "get"]):
-            if session.get("context"):
-                del session["context"]
-                
-            items = extract_order_details(user_input)
-            if not items:
-                return ask_for_order_items()
-            
-            success, message, order_id = create_order(items)
-            if not success:
-                return error_response("order_creation_failed", message)
-            
-            return order_success_response(message, order_id, items)
-
-        # Default response
-        return ask_for_order_items()
+        with PARSE_SECONDS.time():
+            req = await request.json()
+        key, ttl_seconds = idempotency_key(req)
+        # A redelivered call gets the first attempt's answer instead of placing the order again
+        return await idempotency_cache.run(key, ttl_seconds, lambda: admitted_turn(req, arrived))
 
+    except AdmissionRejected as e:
+        # Overloaded: a quick degraded reply beats a Dialogflow timeout and retry
+        logger.info("Shed webhook turn: %s", e.reason)
+        return error_response("system_error")
+    except SessionConflictError as e:
+        # Another worker kept answering turns for this session; this turn wrote nothing and is dropped
+        logger.warning("Session conflict: %s", e)
+        return error_response("system_error")
+    except DatabaseBusyError as e:
+        logger.warning("Database busy: %s", e)
+        return error_response("system_error")
     except Exception as e:
-        logger.error(f"System error: {str(e)}", exc_info=True)
+        logger.error("System error: %s", e, exc_info=True)
         return error_response("system_error", str(e))
 
+# The customer site; mounted last so every API route above takes precedence
+app.mount("/", StaticFiles(directory=FRONTEND_DIR, html=True), name="frontend")
+
 if __name__ == '__main__':
     uvicorn.run("main:app", host="0.0.0.0", port=5000, reload=True)
\ No newline at end of file
@@ -0,0 +1,136 @@
+import threading
+import time
+import logging
+from typing import Any, Callable, Dict, Iterable, List, Mapping, Optional, Tuple
+
+from menu_search import MenuSearchIndex
+
+logger = logging.getLogger(__name__)
+
+
+class MenuCatalog:
+    """In-memory snapshot of menu_items with exact, typo-tolerant and ranked fuzzy lookup"""
+
+    def __init__(
+        self,
+        loader: Callable[[], Iterable[Dict[str, Any]]],
+        ttl_seconds: float = 600.0,
+        aliases: Optional[Mapping[str, str]] = None
+    ):
+        self._loader = loader
+        self._aliases = dict(aliases or {})
+        self.ttl_seconds = ttl_seconds
+        self._lock = threading.Lock()
+        self._refresh_lock = threading.Lock()
+        # (items by name, sorted names, search index) swapped atomically on reload
+        self._snapshot: Tuple[Dict[str, Dict[str, Any]], List[str], MenuSearchIndex] = ({}, [], MenuSearchIndex([]))
+        self._loaded_at: Optional[float] = None
+        # hits/misses count lookups served from a warm snapshot vs. ones that had to reload
+        self._stats = {"hits": 0, "misses": 0, "not_found": 0, "loads": 0, "load_errors": 0}
+
+    def _is_fresh(self) -> bool:
+        return self._loaded_at is not None and (time.monotonic() - self._loaded_at) < self.ttl_seconds
+
+    def is_warm(self) -> bool:
+        """True when lookups can be answered without reloading"""
+        return self._is_fresh()
+
+    def refresh(self) -> None:
+        """Reload the snapshot from the database"""
+        rows = list(self._loader())
+        items = {
+            row["name"]: {
+                "name": row["name"],
+                "price": float(row["price"]),
+                "in_stock": bool(row["in_stock"]),
+                "category": row["category"]
+            }
+            for row in rows
+        }
+        index = MenuSearchIndex(items, self._aliases)
+        with self._lock:
+            self._snapshot = (items, sorted(items), index)
+            self._loaded_at = time.monotonic()
+            self._stats["loads"] += 1
+        logger.info(f"Menu catalog loaded with {len(items)} items")
+
+    def invalidate(self) -> None:
+        """Drop the snapshot so the next lookup reloads it"""
+        with self._lock:
+            self._loaded_at = None
+
+    def _ensure_loaded(self) -> bool:
+        """Load the snapshot if missing or expired; returns True when served warm"""
+        if self._is_fresh():
+            return True
+        with self._refresh_lock:
+            # Another thread may have reloaded while we waited
+            if self._is_fresh():
+                return True
+            try:
+                self.refresh()
+            except Exception:
+                with self._lock:
+                    self._stats["load_errors"] += 1
+                    has_snapshot = bool(self._snapshot[0])
+                if not has_snapshot:
+                    raise
+                # Keep serving the stale snapshot rather than failing menu questions
+                logger.exception("Menu catalog reload failed; serving stale snapshot")
+        return False
+
+    def _match(self, db_name: str) -> Optional[Dict[str, Any]]:
+        items, _, index = self._snapshot
+        item = items.get(db_name)
+        if item:
+            return item
+        name = index.resolve(db_name)
+        return items[name] if name else None
+
+    def lookup_exact(self, db_name: str) -> Optional[Dict[str, Any]]:
+        """Find an item by exact name or alias only, never by a fuzzy guess"""
+        warm = self._ensure_loaded()
+        items = self._snapshot[0]
+        item = items.get(db_name) or items.get(self._aliases.get(db_name, ""))
+        with self._lock:
+            self._stats["hits" if warm else "misses"] += 1
+            if item is None:
+                self._stats["not_found"] += 1
+        return item
+
+    def lookup(self, db_name: str) -> Optional[Dict[str, Any]]:
+        """Find an item by exact name, alias or near-typo; other misses return None
+
+        Use search() for "did you mean ...?" candidates when this misses.
+        """
+        warm = self._ensure_loaded()
+        item = self._match(db_name)
+        with self._lock:
+            self._stats["hits" if warm else "misses"] += 1
+            if item is None:
+                self._stats["not_found"] += 1
+        return item
+
+    def all_items(self) -> List[Dict[str, Any]]:
+        """Return every item in the snapshot, ordered by name"""
+        self._ensure_loaded()
+        items, names, _ = self._snapshot
+        return [items[name] for name in names]
+
+    def search(self, query: str, limit: int = 5) -> List[Tuple[Dict[str, Any], float]]:
+        """Ranked fuzzy candidates for a free-text item name"""
+        self._ensure_loaded()
+        items, _, index = self._snapshot
+        return [(items[name], score) for name, score in index.search(query, limit)]
+
+    def stats(self) -> Dict[str, Any]:
+        """Snapshot of catalog counters"""
+        with self._lock:
+            lookups = self._stats["hits"] + self._stats["misses"]
+            return {
+                **self._stats,
+                "items": len(self._snapshot[0]),
+                "hit_rate": (self._stats["hits"] / lookups) if lookups else 0.0,
+                "age_seconds": (time.monotonic() - self._loaded_at) if self._loaded_at is not None else None,
+                "ttl_seconds": self.ttl_seconds
+            }
@@ -0,0 +1,182 @@
+from typing import Dict, Iterable, List, Mapping, Optional, Set, Tuple
+
+# Minimum combined score for a candidate to count as a match
+MIN_SCORE = 0.5
+# A fuzzy hit is only taken as the item asked for when it is a typo of a whole name or alias:
+# at most one edit per this many characters of the query, capped at MAX_TYPO_EDITS
+TYPO_CHARS_PER_EDIT = 5
+MAX_TYPO_EDITS = 2
+# Candidates re-ranked with edit distance after the trigram pass
+RERANK_CANDIDATES = 5
+# Distinct queries whose results are memoized per index
+RESULT_CACHE_SIZE = 4096
+
+
+def _trigrams(text: str) -> Set[str]:
+    padded = f"  {text} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def _edit_distance(a: str, b: str, cutoff: int) -> int:
+    """Optimal string alignment distance, computed only within a band of width `cutoff`
+
+    Returns cutoff + 1 as soon as the distance is known to exceed the cutoff.
+    """
+    if a == b:
+        return 0
+    len_a, len_b = len(a), len(b)
+    if abs(len_a - len_b) > cutoff:
+        return cutoff + 1
+    too_far = cutoff + 1
+    previous2: List[int] = []
+    previous = [j if j <= cutoff else too_far for j in range(len_b + 1)]
+    for i in range(1, len_a + 1):
+        ca = a[i - 1]
+        lo, hi = max(1, i - cutoff), min(len_b, i + cutoff)
+        current = [too_far] * (len_b + 1)
+        current[0] = i if i <= cutoff else too_far
+        row_min = current[0]
+        for j in range(lo, hi + 1):
+            cb = b[j - 1]
+            value = previous[j - 1] + (ca != cb)
+            if previous[j] + 1 < value:
+                value = previous[j] + 1
+            if current[j - 1] + 1 < value:
+                value = current[j - 1] + 1
+            if i > 1 and j > 1 and ca == b[j - 2] and a[i - 2] == cb and previous2[j - 2] + 1 < value:
+                value = previous2[j - 2] + 1
+            current[j] = value
+            if value < row_min:
+                row_min = value
+        if row_min > cutoff:
+            return too_far
+        previous2, previous = previous, current
+    return min(previous[len_b], too_far)
+
+
+class MenuSearchIndex:
+    """Trigram index over menu names, their words and aliases with edit-distance re-ranking"""
+
+    def __init__(self, names: Iterable[str], aliases: Optional[Mapping[str, str]] = None):
+        # Each term is (searchable text, menu name, weight); whole names outrank single words
+        self._terms: List[Tuple[str, str, float]] = []
+        self._term_trigrams: List[int] = []
+        # Terms holding a whole name or alias, as opposed to one word of a longer name
+        self._whole_terms: Set[int] = set()
+        self._postings: Dict[str, List[int]] = {}
+        self._results: Dict[Tuple[str, int], List[Tuple[str, float]]] = {}
+        self._resolved: Dict[str, Optional[str]] = {}
+        seen: Set[Tuple[str, str]] = set()
+
+        names = sorted(names)
+        name_set = set(names)
+
+        def add(text: str, name: str, weight: float, whole: bool = True) -> None:
+            text = text.replace('_', ' ').strip()
+            if len(text) < 3 or (text, name) in seen:
+                return
+            seen.add((text, name))
+            grams = _trigrams(text)
+            term_id = len(self._terms)
+            self._terms.append((text, name, weight))
+            self._term_trigrams.append(len(grams))
+            if whole:
+                self._whole_terms.add(term_id)
+            for gram in grams:
+                self._postings.setdefault(gram, []).append(term_id)
+
+        for name in names:
+            add(name, name, 1.0)
+            words = name.split('_')
+            if len(words) > 1:
+                for word in words:
+                    add(word, name, 0.9, whole=False)
+        for alias, target in sorted((aliases or {}).items()):
+            if target in name_set:
+                add(alias, target, 1.0)
+
+    def search(self, query: str, limit: int = 5) -> List[Tuple[str, float]]:
+        """Return up to `limit` (menu name, score) pairs, best first"""
+        query = query.replace('_', ' ').lower().strip()
+        if not query:
+            return []
+        cached = self._results.get((query, limit))
+        if cached is not None:
+            return cached
+        results = self._rank(query, limit)
+        if len(self._results) >= RESULT_CACHE_SIZE:
+            self._results.clear()
+        self._results[(query, limit)] = results
+        return results
+
+    def _dice(self, query: str) -> Dict[int, float]:
+        """Dice coefficient over trigram sets for every term sharing a trigram with the query"""
+        grams = _trigrams(query)
+        overlaps: Dict[int, int] = {}
+        for gram in grams:
+            for term_id in self._postings.get(gram, ()):
+                overlaps[term_id] = overlaps.get(term_id, 0) + 1
+        return {
+            term_id: 2 * count / (len(grams) + self._term_trigrams[term_id])
+            for term_id, count in overlaps.items()
+        }
+
+    def _rank(self, query: str, limit: int) -> List[Tuple[str, float]]:
+        # Dice coefficient over trigram sets picks a short list for the exact re-rank
+        dice = self._dice(query)
+        if not dice:
+            return []
+        candidates = sorted(dice, key=lambda t: (-dice[t], self._terms[t][1]))[:RERANK_CANDIDATES]
+
+        best: Dict[str, float] = {}
+        for term_id in candidates:
+            text, name, weight = self._terms[term_id]
+            longest = max(len(query), len(text))
+            # Strings more than half-rewritten are treated as unrelated
+            cutoff = longest // 2
+            distance = _edit_distance(query, text, cutoff)
+            edit = 1 - distance / longest if distance <= cutoff else 0.0
+            score = (0.5 * dice[term_id] + 0.5 * edit) * weight
+            if text in query or query in text:
+                score += 0.2
+            if score > best.get(name, 0.0):
+                best[name] = score
+
+        ranked = sorted(best.items(), key=lambda item: (-item[1], item[0]))
+        return [(name, round(score, 3)) for name, score in ranked if score >= MIN_SCORE][:limit]
+
+    def resolve(self, query: str) -> Optional[str]:
+        """Return the menu name `query` is a near-typo of, or None
+
+        Only whole names and aliases count, the query must be within the typo
+        budget for its length, and no other menu item may be as close. Anything
+        looser ("cheese burger" for beef_burger) is a different dish, not a typo,
+        and is left to search() as a suggestion.
+        """
+        query = query.replace('_', ' ').lower().strip()
+        if not query:
+            return None
+        if query in self._resolved:
+            return self._resolved[query]
+
+        budget = min(MAX_TYPO_EDITS, len(query) // TYPO_CHARS_PER_EDIT)
+        dice = self._dice(query)
+        whole = sorted(
+            (term_id for term_id in dice if term_id in self._whole_terms),
+            key=lambda t: (-dice[t], self._terms[t][1])
+        )[:RERANK_CANDIDATES]
+        closest: Dict[str, int] = {}
+        for term_id in whole:
+            text, name, _ = self._terms[term_id]
+            distance = _edit_distance(query, text, budget)
+            if distance <= budget and distance < closest.get(name, budget + 1):
+                closest[name] = distance
+
+        ranked = sorted(closest.items(), key=lambda item: item[1])
+        name = None
+        if ranked and (len(ranked) == 1 or ranked[0][1] < ranked[1][1]):
+            name = ranked[0][0]
+        if len(self._resolved) >= RESULT_CACHE_SIZE:
+            self._resolved.clear()
+        self._resolved[query] = name
+        return name
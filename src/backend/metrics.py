@@ -0,0 +1,308 @@
+import abc
+import asyncio
+import functools
+import math
+import threading
+import time
+from bisect import bisect_left
+from collections import deque
+from contextlib import contextmanager
+from typing import Any, Callable, Deque, Dict, Iterator, List, Optional, Sequence, Tuple, TypeVar
+
+F = TypeVar("F", bound=Callable[..., Any])
+
+
+class LatencyStats:
+    """Running latency summary with percentiles over a window of recent samples"""
+
+    def __init__(self, window: int = 1024):
+        self._lock = threading.Lock()
+        self._recent: Deque[float] = deque(maxlen=window)
+        self._count = 0
+        self._total = 0.0
+        self._max = 0.0
+
+    def observe(self, seconds: float) -> None:
+        with self._lock:
+            self._recent.append(seconds)
+            self._count += 1
+            self._total += seconds
+            if seconds > self._max:
+                self._max = seconds
+
+    @contextmanager
+    def time(self) -> Iterator[None]:
+        """Time the enclosed block"""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started)
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Count, mean, max and recent p50/p95/p99 in milliseconds"""
+        with self._lock:
+            recent = sorted(self._recent)
+            count, total, maximum = self._count, self._total, self._max
+
+        def percentile(p: float) -> float:
+            if not recent:
+                return 0.0
+            return recent[min(len(recent) - 1, int(p * len(recent)))] * 1000
+
+        return {
+            "count": count,
+            "mean_ms": (total / count * 1000) if count else 0.0,
+            "max_ms": maximum * 1000,
+            "p50_ms": percentile(0.50),
+            "p95_ms": percentile(0.95),
+            "p99_ms": percentile(0.99)
+        }
+
+
+# Upper bounds in seconds; spans a cached regex match up to a slow MySQL write
+DEFAULT_BUCKETS = (
+    0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025,
+    0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0
+)
+
+LabelValues = Tuple[str, ...]
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\"", "\\\"").replace("\n", "\\n")
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str]) -> str:
+    if not names:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(str(value))}"' for name, value in zip(names, values)) + "}"
+
+
+def _format_value(value: float) -> str:
+    if value == math.inf:
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class MetricsRegistry:
+    """Every metric the process exposes, rendered in the Prometheus text format"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._metrics: Dict[str, "_Metric"] = {}
+
+    def register(self, metric: "_Metric") -> None:
+        with self._lock:
+            if metric.name in self._metrics:
+                raise ValueError(f"Metric {metric.name} is already registered")
+            self._metrics[metric.name] = metric
+
+    def render(self) -> str:
+        with self._lock:
+            metrics = list(self._metrics.values())
+        lines: List[str] = []
+        for metric in metrics:
+            lines.append(f"# HELP {metric.name} {metric.documentation}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            lines.extend(metric.collect())
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = MetricsRegistry()
+
+
+class _Metric(abc.ABC):
+    kind = "untyped"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                 registry: Optional[MetricsRegistry] = REGISTRY):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+        self._series: Dict[LabelValues, Any] = {}
+        if registry is not None:
+            registry.register(self)
+
+    @abc.abstractmethod
+    def _new_series(self) -> Any:
+        """A fresh series for one set of label values"""
+
+    def labels(self, *values: Any) -> Any:
+        """The series for these label values, created on first use"""
+        series = self._series.get(values)
+        if series is None:
+            key = tuple(str(value) for value in values)
+            if len(key) != len(self.labelnames):
+                raise ValueError(f"{self.name} expects labels {self.labelnames}, got {key}")
+            with self._lock:
+                series = self._series.setdefault(key, self._new_series())
+        return series
+
+    def _items(self) -> List[Tuple[LabelValues, Any]]:
+        with self._lock:
+            return sorted(self._series.items())
+
+    @abc.abstractmethod
+    def collect(self) -> Iterator[str]:
+        """Exposition-format lines for every series"""
+
+
+class _Value:
+    __slots__ = ("value", "_lock")
+
+    def __init__(self):
+        self.value = 0.0
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1.0) -> None:
+        with self._lock:
+            self.value += amount
+
+    def dec(self, amount: float = 1.0) -> None:
+        with self._lock:
+            self.value -= amount
+
+    def set(self, value: float) -> None:
+        self.value = value
+
+
+class Counter(_Metric):
+    """Monotonically increasing count per label set
+
+    Registered, described and sampled under one "<name>_total" name so the
+    HELP and TYPE lines attach to the series they precede.
+    """
+    kind = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                 registry: Optional[MetricsRegistry] = REGISTRY):
+        if not name.endswith("_total"):
+            name += "_total"
+        super().__init__(name, documentation, labelnames, registry)
+
+    def _new_series(self) -> _Value:
+        return _Value()
+
+    def collect(self) -> Iterator[str]:
+        for key, series in self._items():
+            yield f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(series.value)}"
+
+
+class Gauge(_Metric):
+    """Point-in-time value per label set, either set directly or read from a callback at scrape time
+
+    A callback returns a number, or a mapping of label-value tuples to numbers.
+    """
+    kind = "gauge"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                 callback: Optional[Callable[[], Any]] = None,
+                 registry: Optional[MetricsRegistry] = REGISTRY):
+        super().__init__(name, documentation, labelnames, registry)
+        self._callback = callback
+
+    def _new_series(self) -> _Value:
+        return _Value()
+
+    def collect(self) -> Iterator[str]:
+        if self._callback is None:
+            items = [(key, series.value) for key, series in self._items()]
+        else:
+            reading = self._callback()
+            items = sorted(reading.items()) if isinstance(reading, dict) else [((), reading)]
+        for key, value in items:
+            yield f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}"
+
+
+class _HistogramSeries:
+    __slots__ = ("_bounds", "_counts", "_sum", "_count", "_lock")
+
+    def __init__(self, bounds: Tuple[float, ...]):
+        self._bounds = bounds
+        self._counts = [0] * (len(bounds) + 1)
+        self._sum = 0.0
+        self._count = 0
+        self._lock = threading.Lock()
+
+    def observe(self, seconds: float) -> None:
+        index = bisect_left(self._bounds, seconds)
+        with self._lock:
+            self._counts[index] += 1
+            self._sum += seconds
+            self._count += 1
+
+    @contextmanager
+    def time(self) -> Iterator[None]:
+        """Time the enclosed block"""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started)
+
+    def snapshot(self) -> Tuple[List[int], float, int]:
+        with self._lock:
+            return list(self._counts), self._sum, self._count
+
+
+class Histogram(_Metric):
+    """Latency distribution per label set in fixed buckets, cheap enough to leave on"""
+    kind = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                 buckets: Sequence[float] = DEFAULT_BUCKETS,
+                 registry: Optional[MetricsRegistry] = REGISTRY):
+        super().__init__(name, documentation, labelnames, registry)
+        self.buckets = tuple(sorted(buckets))
+
+    def _new_series(self) -> _HistogramSeries:
+        return _HistogramSeries(self.buckets)
+
+    def collect(self) -> Iterator[str]:
+        bucket_names = self.labelnames + ("le",)
+        for key, series in self._items():
+            counts, total, count = series.snapshot()
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets + (math.inf,), counts):
+                cumulative += bucket_count
+                yield f"{self.name}_bucket{_format_labels(bucket_names, key + (_format_value(bound),))} {cumulative}"
+            labels = _format_labels(self.labelnames, key)
+            yield f"{self.name}_sum{labels} {_format_value(total)}"
+            yield f"{self.name}_count{labels} {count}"
+
+
+def timed(histogram: Histogram, label: Optional[str] = None) -> Callable[[F], F]:
+    """Decorator recording each call's duration in histogram, labelled with the function name"""
+    def decorate(func: F) -> F:
+        series = histogram.labels(label or func.__name__)
+
+        if asyncio.iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def async_wrapper(*args: Any, **kwargs: Any) -> Any:
+                started = time.perf_counter()
+                try:
+                    return await func(*args, **kwargs)
+                finally:
+                    series.observe(time.perf_counter() - started)
+            return async_wrapper  # type: ignore[return-value]
+
+        @functools.wraps(func)
+        def wrapper(*args: Any, **kwargs: Any) -> Any:
+            started = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                series.observe(time.perf_counter() - started)
+        return wrapper  # type: ignore[return-value]
+
+    return decorate
+
+
+def numeric_fields(stats: Dict[str, Any]) -> Dict[LabelValues, float]:
+    """The numeric top-level entries of a stats() dict, keyed for a one-label Gauge callback"""
+    return {
+        (key,): float(value) for key, value in stats.items()
+        if isinstance(value, (int, float))
+    }
@@ -0,0 +1,192 @@
+import asyncio
+import json
+from typing import Any, AsyncIterator, Dict, Optional
+
+from metrics import Counter
+
+ORDER_EVENTS_CONFIG = {
+    "max_subscribers": 10000,      # open event streams per process; more are refused with 503
+    "heartbeat_seconds": 15.0,     # comment line sent on idle streams so proxies keep them and dead ones are noticed
+    "retry_ms": 3000               # how long EventSource waits before reconnecting
+}
+
+# Statuses after which an order never changes again; its stream ends
+FINAL_STATUSES = ("Delivered", "Cancelled")
+
+PUBLISHED = Counter("karachibites_order_events_published", "Order events handed to the hub", ["type"])
+
+
+class _Channel:
+    """Latest known fields for one order; every subscriber waits on the same future"""
+    __slots__ = ("version", "latest", "wakeup", "subscribers")
+
+    def __init__(self, loop: asyncio.AbstractEventLoop):
+        self.version = 0
+        self.latest: Dict[str, Any] = {}
+        self.wakeup: "asyncio.Future[None]" = loop.create_future()
+        self.subscribers = 0
+
+    def wake(self, loop: asyncio.AbstractEventLoop) -> None:
+        """Resolve the future everyone is waiting on and start a fresh one"""
+        self.wakeup.set_result(None)
+        self.wakeup = loop.create_future()
+
+
+class SubscriberLimitError(Exception):
+    """Raised when a new stream would exceed max_subscribers"""
+
+
+class Subscription:
+    """One open stream's view of an order channel"""
+    __slots__ = ("_hub", "order_id", "_channel", "_seen", "_closed")
+
+    def __init__(self, hub: "OrderEventHub", order_id: int, channel: _Channel):
+        self._hub = hub
+        self.order_id = order_id
+        self._channel = channel
+        self._seen = channel.version
+        self._closed = False
+
+    async def next(self) -> Optional[Dict[str, Any]]:
+        """The order's merged fields once they change after the last call; None on a heartbeat"""
+        channel = self._channel
+        if channel.version == self._seen:
+            # Shielded so a disconnecting client cannot cancel the future its neighbours wait on
+            await asyncio.shield(channel.wakeup)
+            if channel.version == self._seen:
+                return None
+        self._seen = channel.version
+        return channel.latest
+
+    def close(self) -> None:
+        if not self._closed:
+            self._closed = True
+            self._hub._unsubscribe(self.order_id, self._channel)
+
+
+class OrderEventHub:
+    """In-process fan-out of order status and ETA changes to open event streams
+
+    Publishing is O(1) per order no matter how many streams watch it: the
+    order's channel records the event under a new version and resolves one
+    future all its subscribers await. An idle subscriber is just a suspended
+    coroutine with no timer of its own; a single hub-wide timer wakes every
+    channel for the heartbeat. A slow reader skips straight to the newest
+    event instead of queueing every one, which is all a status display needs.
+
+    publish() may be called from any thread (database functions run on the
+    DB executor); delivery is handed to the event loop.
+    """
+
+    def __init__(
+        self,
+        max_subscribers: int = ORDER_EVENTS_CONFIG["max_subscribers"],
+        heartbeat_seconds: float = ORDER_EVENTS_CONFIG["heartbeat_seconds"]
+    ):
+        self.max_subscribers = max_subscribers
+        self.heartbeat_seconds = heartbeat_seconds
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._heartbeat: Optional[asyncio.TimerHandle] = None
+        self._channels: Dict[int, _Channel] = {}
+        self._subscribers = 0
+        self._stats = {"published": 0, "delivered": 0, "refused": 0, "heartbeats": 0}
+
+    def publish(self, order_id: int, event_type: str, data: Dict[str, Any]) -> None:
+        """Send an event to everyone watching order_id; a no-op when nobody is"""
+        loop = self._loop
+        if loop is None or loop.is_closed():
+            return
+        PUBLISHED.labels(event_type).inc()
+        try:
+            running = asyncio.get_running_loop()
+        except RuntimeError:
+            running = None
+        if running is loop:
+            self._deliver(int(order_id), event_type, data)
+        else:
+            loop.call_soon_threadsafe(self._deliver, int(order_id), event_type, data)
+
+    def _deliver(self, order_id: int, event_type: str, data: Dict[str, Any]) -> None:
+        self._stats["published"] += 1
+        channel = self._channels.get(order_id)
+        if channel is None:
+            return
+        channel.version += 1
+        # Merged, so a reader that skipped an event still gets its fields
+        channel.latest = {**channel.latest, **data}
+        self._stats["delivered"] += channel.subscribers
+        channel.wake(self._loop)
+
+    def _beat(self) -> None:
+        """Wake every channel without a new version, so each idle stream writes a heartbeat"""
+        self._heartbeat = None
+        if not self._channels:
+            return
+        self._stats["heartbeats"] += 1
+        for channel in self._channels.values():
+            channel.wake(self._loop)
+        self._heartbeat = self._loop.call_later(self.heartbeat_seconds, self._beat)
+
+    def subscribe(self, order_id: int) -> "Subscription":
+        """Start watching an order; register before reading its current state so no change is missed
+
+        Raises SubscriberLimitError when max_subscribers streams are already open.
+        """
+        if self._subscribers >= self.max_subscribers:
+            self._stats["refused"] += 1
+            raise SubscriberLimitError(f"{self._subscribers} order event streams already open")
+        loop = asyncio.get_running_loop()
+        if loop is not self._loop:
+            # A new event loop (app restarted in this process): futures and timer of the old one are dead
+            self._loop, self._heartbeat = loop, None
+            self._channels.clear()
+            self._subscribers = 0
+        channel = self._channels.get(order_id)
+        if channel is None:
+            channel = self._channels[order_id] = _Channel(self._loop)
+        channel.subscribers += 1
+        self._subscribers += 1
+        if self._heartbeat is None:
+            self._heartbeat = self._loop.call_later(self.heartbeat_seconds, self._beat)
+        return Subscription(self, order_id, channel)
+
+    def _unsubscribe(self, order_id: int, channel: _Channel) -> None:
+        channel.subscribers -= 1
+        self._subscribers -= 1
+        if channel.subscribers == 0 and self._channels.get(order_id) is channel:
+            del self._channels[order_id]
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            **self._stats,
+            "subscribers": self._subscribers,
+            "orders_watched": len(self._channels),
+            "max_subscribers": self.max_subscribers
+        }
+
+
+def format_sse(fields: Optional[Dict[str, Any]]) -> bytes:
+    """Encode order fields as one Server-Sent Events "order" message; None becomes a heartbeat comment"""
+    if fields is None:
+        return b": heartbeat\n\n"
+    data = json.dumps(fields, ensure_ascii=False, separators=(",", ":"), default=str)
+    return f"event: order\ndata: {data}\n\n".encode("utf-8")
+
+
+async def event_stream(subscription: Subscription, order: Dict[str, Any]) -> AsyncIterator[bytes]:
+    """SSE body for one order: its current state, then every change until it is delivered or cancelled"""
+    try:
+        yield f"retry: {ORDER_EVENTS_CONFIG['retry_ms']}\n\n".encode("utf-8")
+        yield format_sse(order)
+        status = order["status"]
+        while status not in FINAL_STATUSES:
+            fields = await subscription.next()
+            yield format_sse(fields)
+            if fields is not None:
+                status = fields.get("status", status)
+    finally:
+        subscription.close()
+
+
+# Shared by database.py (publisher) and the /orders/{id}/events endpoint
+order_event_hub = OrderEventHub()
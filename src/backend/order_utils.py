@@ -1,193 +1,286 @@
-import re
-from typing import List, Tuple, Optional, Dict, Union
+from functools import lru_cache
+from types import MappingProxyType
+from typing import Any, Iterable, List, Mapping, Tuple, Optional, Dict, Union
+
+from extraction_grammar import find_dish_phrase, find_order_id, iter_order_lines
+from metrics import Histogram, timed
+from phrase_matcher import PhraseMatcher, Match
+
+# Time spent pulling items, IDs and intents out of the user's text
+NLP_SECONDS = Histogram("karachibites_nlp_seconds", "Time spent in order_utils extraction functions", ["function"])
 
 VALID_MENU_ITEMS = {
     # Appetizers
-    'samosa', 'pakora', 'fruit_chaat', 'shami_kebab', 
-    
+    'samosa', 'pakora', 'fruit_chat', 'shami_kebab',
+
     # Main Course - Original Items
-    'biryani', 'chicken_biryani', 'beef_biryani', 'mutton_biryani',
-    'karahi', 'chicken_karahi', 'beef_karahi', 'mutton_karahi',
-    'burger', 'beef_burger', 'chicken_burger', 'zinger_burger',
-    'kebab', 'seekh_kebab', 'beef_kebab', 'chicken_kebab', 'chapli_kebab',
-    'naan', 'garlic_naan', 'tandoori_naan',
-    
+    'chicken_biryani', 'mutton_karahi',
+    'beef_burger', 'zinger_burger',
+    'seekh_kebab', 'chapli_kebab',
+    'garlic_naan',
+
     # Main Course - New Items
     'nihari', 'haleem', 'paya', 'fish_fry', 'malai_boti',
-    
+
     # Desserts
-    'kheer', 'jalebi', 'rasmalai', 'chocolate_lava_cake',
-    
+    'kheer', 'jalebi', 'rasmalai', 'chocolate_lava',
+
     # Beverages
-    'pepsi', 'cola', 'cold_drink', 'lassi', 'rooh_afza',
-    
-    # Special Deals
-    'biryani_combo', 'bbq_platter', 'nihari_combo', 'zinger_combo', 'dessert_combo'
+    'pepsi', 'lassi', 'rooh_afza'
+}
+
+# Common spellings and shorthands mapped to their menu item
+ITEM_ALIASES = {
+    # Basics
+    'biryani': 'chicken_biryani', 'biriyani': 'chicken_biryani',
+    'biryan': 'chicken_biryani', 'bryani': 'chicken_biryani',
+    'chickenbiryani': 'chicken_biryani',
+    'beefburger': 'beef_burger',
+    'karahi': 'mutton_karahi',
+
+    # Beverages
+    'cola': 'pepsi', 'cold_drink': 'pepsi', 'pepis': 'pepsi',
+    'coke': 'pepsi', 'soft_drink': 'pepsi', 'soda': 'pepsi',
+
+    # Kebabs
+    'seekh': 'seekh_kebab', 'seekh_kabab': 'seekh_kebab',
+    'chapli': 'chapli_kebab', 'chapli_kabab': 'chapli_kebab',
+    'shami': 'shami_kebab', 'shami_kabab': 'shami_kebab',
+
+    # Naan
+    'naan': 'garlic_naan', 'naan_bread': 'garlic_naan',
+
+    # Desserts and appetizers
+    'chocolate_lava_cake': 'chocolate_lava', 'lava_cake': 'chocolate_lava',
+    'fruit_chaat': 'fruit_chat',
+
+    # Common variations
+    'zigar': 'zinger_burger', 'zinger': 'zinger_burger',
+    'ruhafza': 'rooh_afza', 'roohafza': 'rooh_afza'
 }
 
+class AliasIndex:
+    """Immutable name -> menu item index with a deterministic partial-match fallback"""
+
+    def __init__(self, valid_items: Iterable[str], aliases: Mapping[str, str]):
+        valid_items = sorted(set(valid_items))
+        # Exact names win over aliases that happen to share the key
+        exact = dict(aliases)
+        exact.update((item, item) for item in valid_items)
+        self._exact: Mapping[str, str] = MappingProxyType(exact)
+
+        # Every substring of a menu item -> the shortest (then alphabetical) item containing it
+        within: Dict[str, str] = {}
+        for item in sorted(valid_items, key=lambda name: (len(name), name)):
+            for i in range(len(item)):
+                for j in range(i + 1, len(item) + 1):
+                    within.setdefault(item[i:j], item)
+        self._within: Mapping[str, str] = MappingProxyType(within)
+
+        # Character trie of menu items for finding the longest item inside longer input
+        trie: Dict[str, Any] = {}
+        for item in valid_items:
+            node = trie
+            for char in item:
+                node = node.setdefault(char, {})
+            node[''] = item
+        self._trie = trie
+
+    def lookup(self, name: str) -> Optional[str]:
+        """Exact name or alias in O(1), else the longest menu item contained in name,
+        else the shortest menu item containing name"""
+        if not name:
+            return None
+        hit = self._exact.get(name)
+        if hit is not None:
+            return hit
+
+        longest = None
+        for start in range(len(name)):
+            node = self._trie
+            for char in name[start:]:
+                node = node.get(char)
+                if node is None:
+                    break
+                item = node.get('')
+                if item is not None and (longest is None or len(item) > len(longest)):
+                    longest = item
+        if longest is not None:
+            return longest
+        return self._within.get(name)
+
+ALIAS_INDEX = AliasIndex(VALID_MENU_ITEMS, ITEM_ALIASES)
+
 def normalize_item_name(item_name: str) -> str:
     """Normalize item names to standard database format"""
-    item_name = item_name.lower().strip()
-    item_name = re.sub(r'\s+and$', '', item_name)
-    item_name = re.sub(r'\s+', '_', item_name)  # Replace spaces with underscores
-    
-    item_mapping = {
-        # Basics
-        'biriyani': 'biryani', 'biryan': 'biryani', 'bryani': 'biryani',
-        'chickenbiryani': 'chicken_biryani',
-        'beefburger': 'beef_burger',
-        
-        # Beverages
-        'cola': 'pepsi', 'cold_drink': 'pepsi', 'pepis': 'pepsi',
-        'coke': 'pepsi', 'soft_drink': 'pepsi', 'soda': 'pepsi',
-        
-        # Kebabs
-        'seekh': 'seekh_kebab', 'seekh_kabab': 'seekh_kebab',
-        'chapli': 'chapli_kebab', 'chapli_kabab': 'chapli_kebab',
-        'shami': 'shami_kebab', 'shami_kabab': 'shami_kebab',
-        
-        # Naan
-        'naan_bread': 'naan', 'tandoori': 'tandoori_naan',
-        
-        # Special deals
-        'biryani_deal': 'biryani_combo', 'biryani_special': 'biryani_combo',
-        'bbq_combo': 'bbq_platter', 'bbq_deal': 'bbq_platter', 'bbq_special': 'bbq_platter',
-        'nihari_deal': 'nihari_combo', 'nihari_special': 'nihari_combo',
-        'burger_combo': 'zinger_combo', 'burger_deal': 'zinger_combo', 'zinger_deal': 'zinger_combo',
-        'dessert_deal': 'dessert_combo', 'sweet_combo': 'dessert_combo',
-        
-        # Common variations
-        'zigar': 'zinger_burger', 'zinger': 'zinger_burger',
-        'chicken_karahi': 'karahi', 'mutton_karahi': 'karahi',
-        'ruhafza': 'rooh_afza', 'roohafza': 'rooh_afza'
-    }
+    words = item_name.lower().split()
+    if len(words) > 1 and words[-1] == 'and':
+        words.pop()
+    item_name = '_'.join(words)  # Replace spaces with underscores
     
-    if item_name in VALID_MENU_ITEMS:
-        return item_name
-    
-    # Check if it's in our mapping
-    if item_name in item_mapping:
-        return item_mapping[item_name]
-    
-    # Check if it's a partial match to any valid item
-    for valid_item in VALID_MENU_ITEMS:
-        if item_name in valid_item or valid_item in item_name:
-            return valid_item
-    
-    return item_name
+    return ALIAS_INDEX.lookup(item_name) or item_name
 
+@timed(NLP_SECONDS)
 def extract_dish_item(user_input: str) -> Optional[str]:
     """Extract dish item from user input with improved price query handling"""
-    # Handle price queries first
-    if is_price_query(user_input):
-        price_pattern = r'(?:price of|cost of|how much is|tell me the price of)\s+([a-zA-Z\s]+)'
-        match = re.search(price_pattern, user_input.lower())
-        if match:
-            item = match.group(1).strip()
-            return normalize_item_name(item)
-    
-    # Handle other patterns
-    patterns = [
-        r'(?:is|are)\s+([a-zA-Z\s]+)\s+(?:available|in stock|left)',
-        r'(?:tell me about|what is|what\'s)\s+([a-zA-Z\s]+)',
-        r'([a-zA-Z\s]+)\s+(?:price|cost|availability)',
-        r'(?:i\'d like|i want)\s+([a-zA-Z\s]+)',
-        r'(?:order|get me)\s+([a-zA-Z\s]+)'
-    ]
-    
-    for pattern in patterns:
-        match = re.search(pattern, user_input.lower())
-        if match:
-            item = match.group(1).strip()
-            return normalize_item_name(item)
-    return None
+    dish = find_dish_phrase(user_input.lower(), price_query=classify_utterance(user_input).is_price_query)
+    return normalize_item_name(dish) if dish else None
+
+PRICE_PHRASES = [
+    'price of', 'cost of', 'how much is', 
+    'what is the price', "what's the price",
+    'how much for', 'price for', 'how much does',
+    'what does cost', 'tell me the price of',
+    'what are the rates', 'pricing', 'what would be the cost'
+]
+
+# Words that turn a price question into an order
+ORDER_WORDS = ['order', 'want', 'get']
+
+STOCK_PHRASES = [
+    'in stock', 'available', 'do you have',
+    'is there any', 'left', 'have any',
+    'is available', 'are available', 'can i get',
+    'do you serve', 'is it on the menu', 'menu item'
+]
+
+SUPPORT_PHRASES = [
+    'technical help', 'technical problem', 'contact support',
+    'something is wrong', 'technical issue', 'need support',
+    'not working', 'need help', 'have a problem',
+    'need technical help', 'facing a technical problem',
+    'want to contact support', 'wrong with my device',
+    'technical problem', 'need support',
+    'technical issue', 'help with my account',
+    'device is not working', 'website is not working',
+    'app crash', 'login issue', 'payment problem',
+    'error message', 'stuck', 'glitch', 'bug',
+    'my device', 'my phone', 'my app', 'my website'
+]
+
+FEEDBACK_PHRASES = [
+    'feedback', 'review', 'suggestion',
+    'complaint', 'experience',
+    'like the', 'not happy', 'satisfied',
+    'rude', 'perfect', 'great experience',
+    'give feedback', 'share feedback',
+    'tell you about my experience',
+    'didn\'t like the service',
+    'liked the food', 'not happy with my order',
+    'satisfied with the service',
+    'great experience', 'staff was rude',
+    'everything was perfect', 'amazing service',
+    'terrible service', 'delicious food'
+]
+
+# Cart commands; only a confirmation writes the order
+CONFIRM_ORDER_PHRASES = [
+    'confirm order', 'confirm my order', 'confirm the order',
+    'place my order', 'checkout', 'check out',
+    "that's all", 'thats all', 'that is all'
+]
+
+CLEAR_CART_PHRASES = ['clear cart', 'clear my cart', 'empty cart', 'empty my cart', 'start over']
+
+VIEW_CART_PHRASES = ['show cart', 'show my cart', 'view cart', 'view my cart', "what's in my cart", 'my cart']
+
+# One automaton for every detector, built once at import
+_PHRASE_MATCHER = PhraseMatcher({
+    'price': PRICE_PHRASES,
+    'order_word': ORDER_WORDS,
+    'stock': STOCK_PHRASES,
+    'technical_support': SUPPORT_PHRASES,
+    'feedback': FEEDBACK_PHRASES,
+    'confirm_order': CONFIRM_ORDER_PHRASES,
+    'clear_cart': CLEAR_CART_PHRASES,
+    'view_cart': VIEW_CART_PHRASES
+})
+
+class UtteranceMatches:
+    """Every phrase-list hit for one utterance, from a single scan"""
+    __slots__ = ('matches', 'categories')
+
+    def __init__(self, matches: Tuple[Match, ...]):
+        self.matches = matches
+        self.categories = frozenset(category for category, _, _, _ in matches)
+
+    def spans(self, category: str) -> List[Tuple[str, int, int]]:
+        """(phrase, start, end) offsets matched for a category"""
+        return [(phrase, start, end) for cat, phrase, start, end in self.matches if cat == category]
+
+    @property
+    def is_price_query(self) -> bool:
+        return 'price' in self.categories and 'order_word' not in self.categories
+
+    @property
+    def is_stock_query(self) -> bool:
+        return 'stock' in self.categories
+
+    @property
+    def is_technical_support_request(self) -> bool:
+        return 'technical_support' in self.categories
+
+    @property
+    def is_feedback_request(self) -> bool:
+        return 'feedback' in self.categories
+
+    @property
+    def is_order_confirmation(self) -> bool:
+        return 'confirm_order' in self.categories
+
+    @property
+    def is_clear_cart(self) -> bool:
+        return 'clear_cart' in self.categories
+
+    @property
+    def is_view_cart(self) -> bool:
+        # "clear my cart" also contains "my cart"
+        return 'view_cart' in self.categories and 'clear_cart' not in self.categories
+
+# Timed inside the cache, so only real phrase scans are recorded
+@lru_cache(maxsize=1024)
+@timed(NLP_SECONDS, "classify_utterance")
+def _classify_lower(text_lower: str) -> UtteranceMatches:
+    return UtteranceMatches(tuple(_PHRASE_MATCHER.scan(text_lower)))
+
+def classify_utterance(text: str) -> UtteranceMatches:
+    """Scan text once for all detector phrase lists (cached per utterance)"""
+    return _classify_lower(text.lower())
 
 def is_price_query(text: str) -> bool:
     """Check if user is asking about price (more precise)"""
-    price_phrases = [
-        'price of', 'cost of', 'how much is', 
-        'what is the price', "what's the price",
-        'how much for', 'price for', 'how much does',
-        'what does cost', 'tell me the price of',
-        'what are the rates', 'pricing', 'what would be the cost'
-    ]
-    text_lower = text.lower()
-    return (any(phrase in text_lower for phrase in price_phrases) and 
-           not any(word in text_lower for word in ['order', 'want', 'get']))
+    return classify_utterance(text).is_price_query
 
 def is_stock_query(text: str) -> bool:
     """Check if user is asking about stock"""
-    stock_phrases = [
-        'in stock', 'available', 'do you have',
-        'is there any', 'left', 'have any',
-        'is available', 'are available', 'can i get',
-        'do you serve', 'is it on the menu', 'menu item'
-    ]
-    return any(phrase in text.lower() for phrase in stock_phrases)
+    return classify_utterance(text).is_stock_query
 
 def is_technical_support_request(text: str) -> bool:
     """Check if user is asking for technical support"""
-    support_phrases = [
-        'technical help', 'technical problem', 'contact support',
-        'something is wrong', 'technical issue', 'need support',
-        'not working', 'need help', 'have a problem',
-        'need technical help', 'facing a technical problem',
-        'want to contact support', 'wrong with my device',
-        'technical problem', 'need support',
-        'technical issue', 'help with my account',
-        'device is not working', 'website is not working',
-        'app crash', 'login issue', 'payment problem',
-        'error message', 'stuck', 'glitch', 'bug',
-        'my device', 'my phone', 'my app', 'my website'
-    ]
-    return any(phrase in text.lower() for phrase in support_phrases)
+    return classify_utterance(text).is_technical_support_request
 
 def is_feedback_request(text: str) -> bool:
     """Check if user is providing feedback"""
-    feedback_phrases = [
-        'feedback', 'review', 'suggestion',
-        'complaint', 'experience',
-        'like the', 'not happy', 'satisfied',
-        'rude', 'perfect', 'great experience',
-        'give feedback', 'share feedback',
-        'tell you about my experience',
-        'didn\'t like the service',
-        'liked the food', 'not happy with my order',
-        'satisfied with the service',
-        'great experience', 'staff was rude',
-        'everything was perfect', 'amazing service',
-        'terrible service', 'delicious food'
-    ]
-    return any(phrase in text.lower() for phrase in feedback_phrases)
+    return classify_utterance(text).is_feedback_request
 
 def extract_item_and_intent(text: str) -> Tuple[Optional[str], Optional[str]]:
     """Extract both item and intent type from query"""
     item = extract_dish_item(text)
-    if is_price_query(text):
+    signals = classify_utterance(text)
+    if signals.is_price_query:
         return item, 'price'
-    elif is_stock_query(text):
+    elif signals.is_stock_query:
         return item, 'stock'
-    elif is_technical_support_request(text):
+    elif signals.is_technical_support_request:
         return None, 'technical_support'
-    elif is_feedback_request(text):
+    elif signals.is_feedback_request:
         return None, 'feedback'
     return item, None
 
+@timed(NLP_SECONDS)
 def extract_order_details(user_input: str) -> List[Tuple[str, int]]:
     """Extract order details from user input"""
-    pattern = r'(\d+)\s+([a-zA-Z_\s]+?)(?=\s*\d+|and\s*\d+|$)'
-    matches = re.finditer(pattern, user_input.lower())
-    
-    items = []
-    for match in matches:
-        try:
-            quantity = int(match.group(1))
-            item = match.group(2).strip()
-            item = re.sub(r'\s+and$', '', item).strip()
-            if quantity > 0 and item:
-                items.append((item, quantity))
-        except (ValueError, IndexError):
-            continue
+    items = [(item, quantity) for quantity, item in iter_order_lines(user_input.lower()) if quantity > 0]
     
     combined_items: Dict[str, int] = {}
     for item_name, quantity in items:
@@ -259,11 +352,12 @@ def format_order_items(items: List[Tuple[str, int]]) -> str:
         return formatted[0]
     return ", ".join(formatted[:-1]) + f" and {formatted[-1]}"
 
+@timed(NLP_SECONDS)
 def extract_order_id(user_input: str) -> Optional[str]:
     """Extract order ID from user input"""
-    match = re.search(r'(?:order\s*[#]?\s*|status\s*of\s*|#|id\s*)?(\d{3,})', user_input.lower())
-    return match.group(1) if match else None
+    return find_order_id(user_input.lower())
 
+@timed(NLP_SECONDS)
 def extract_support_request_details(text: str) -> Tuple[Optional[str], Optional[str]]:
     """Extract issue type and description from support request"""
     issue_types = {
@@ -0,0 +1,63 @@
+from collections import deque
+from typing import Dict, Iterable, List, Mapping, Tuple
+
+# (category, phrase, start offset, end offset) with end exclusive
+Match = Tuple[str, str, int, int]
+
+
+class PhraseMatcher:
+    """Aho-Corasick automaton over several phrase lists; finds every phrase in one pass"""
+
+    def __init__(self, phrases_by_category: Mapping[str, Iterable[str]]):
+        # Node 0 is the root; each node has transitions, a failure link and its outputs
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._output: List[List[Tuple[str, str]]] = [[]]
+
+        for category, phrases in phrases_by_category.items():
+            for phrase in phrases:
+                self._add(category, phrase.lower())
+        self._build_failure_links()
+
+    def _add(self, category: str, phrase: str) -> None:
+        node = 0
+        for char in phrase:
+            next_node = self._goto[node].get(char)
+            if next_node is None:
+                next_node = len(self._goto)
+                self._goto.append({})
+                self._fail.append(0)
+                self._output.append([])
+                self._goto[node][char] = next_node
+            node = next_node
+        if (category, phrase) not in self._output[node]:
+            self._output[node].append((category, phrase))
+
+    def _build_failure_links(self) -> None:
+        queue = deque(self._goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for char, child in self._goto[node].items():
+                queue.append(child)
+                fallback = self._fail[node]
+                while fallback and char not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                target = self._goto[fallback].get(char, 0)
+                self._fail[child] = target if target != child else 0
+                # Inherit matches that end at the failure target (suffix phrases)
+                self._output[child] = self._output[child] + self._output[self._fail[child]]
+
+    def scan(self, text: str) -> List[Match]:
+        """Return every (category, phrase, start, end) occurrence in text, in end-offset order"""
+        goto, fail, output = self._goto, self._fail, self._output
+        matches: List[Match] = []
+        node = 0
+        for index, char in enumerate(text):
+            while node and char not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(char, 0)
+            if output[node]:
+                end = index + 1
+                for category, phrase in output[node]:
+                    matches.append((category, phrase, end - len(phrase), end))
+        return matches
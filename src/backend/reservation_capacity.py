@@ -0,0 +1,210 @@
+import threading
+import time
+import logging
+from contextlib import contextmanager
+from datetime import date, datetime, time as dt_time, timedelta
+from typing import Any, Callable, ContextManager, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+CAPACITY_CONFIG = {
+    "tables": {2: 6, 4: 8, 6: 4, 8: 2},   # seats per table -> number of tables
+    "opening_hour": 12,                   # first bookable slot
+    "closing_hour": 23,                   # no slot may start at or after this hour
+    "slot_minutes": 60,                   # seating length; bookings are counted per seating on this grid
+    "day_cache_seconds": 60,              # how long a loaded day is trusted for searches
+    "max_booking_retries": 3              # retries after an InnoDB deadlock between concurrent bookings
+}
+
+
+class _DeadlockError(Exception):
+    pass
+
+
+def allocate_tables(tables: Dict[int, int], parties: List[int]) -> Optional[Dict[int, int]]:
+    """Seat parties greedily (largest first) and return remaining tables, or None if they don't fit"""
+    remaining = dict(tables)
+    sizes = sorted(remaining)
+    for party in sorted(parties, reverse=True):
+        # Smallest single table that fits the party
+        table = next((size for size in sizes if size >= party and remaining[size] > 0), None)
+        if table is not None:
+            remaining[table] -= 1
+            continue
+        # Large party: push together the biggest free tables until everyone is seated
+        seated = 0
+        for size in reversed(sizes):
+            while remaining[size] > 0 and seated < party:
+                remaining[size] -= 1
+                seated += size
+        if seated < party:
+            return None
+    return remaining
+
+
+class ReservationCapacity:
+    """Per-seating table capacity with an in-memory per-day view and atomic DB-backed booking"""
+
+    def __init__(self, connection_factory: Callable[[], ContextManager[Any]], config: Optional[Dict[str, Any]] = None):
+        self._connection_factory = connection_factory
+        self.config = dict(CAPACITY_CONFIG, **(config or {}))
+        self._lock = threading.Lock()
+        # date -> (loaded_at, {seating start -> [party sizes]})
+        self._days: Dict[date, Tuple[float, Dict[dt_time, List[int]]]] = {}
+        self._slot_locks: Dict[Tuple[date, dt_time], threading.Lock] = {}
+
+    def is_open(self, slot: dt_time) -> bool:
+        return self.config["opening_hour"] <= slot.hour < self.config["closing_hour"]
+
+    def seating(self, slot: dt_time) -> dt_time:
+        """Start of the seating on the slot_minutes grid (from opening_hour) that a time falls in"""
+        step = self.config["slot_minutes"]
+        opening = self.config["opening_hour"] * 60
+        minutes = slot.hour * 60 + slot.minute
+        start = opening + (minutes - opening) // step * step
+        return dt_time(start // 60, start % 60)
+
+    def _seating_bounds(self, seating: dt_time) -> Tuple[str, str]:
+        """[start, end) of a seating as TIME literals; the last one may end at 24:00:00"""
+        start = seating.hour * 60 + seating.minute
+        end = start + self.config["slot_minutes"]
+        return f"{start // 60:02d}:{start % 60:02d}:00", f"{end // 60:02d}:{end % 60:02d}:00"
+
+    def fits(self, parties: List[int], guests: int) -> bool:
+        return allocate_tables(self.config["tables"], parties + [guests]) is not None
+
+    def _load_day(self, day: date) -> Dict[dt_time, List[int]]:
+        """Read one day's confirmed bookings grouped by seating (served by idx_reservations_slot)"""
+        with self._connection_factory() as conn:
+            cursor = conn.cursor()
+            cursor.execute("""
+                SELECT reservation_time, guests
+                FROM reservations
+                WHERE reservation_date = %s AND status = 'confirmed'
+            """, (day,))
+            slots: Dict[dt_time, List[int]] = {}
+            for reservation_time, guests in cursor.fetchall():
+                slots.setdefault(self.seating(_to_time(reservation_time)), []).append(int(guests))
+        with self._lock:
+            self._days[day] = (time.monotonic(), slots)
+            # Past days are never searched again
+            today = date.today()
+            for stale in [d for d in self._days if d < today]:
+                del self._days[stale]
+            for key in [k for k in self._slot_locks if k[0] < today]:
+                del self._slot_locks[key]
+        return slots
+
+    def day_bookings(self, day: date) -> Dict[dt_time, List[int]]:
+        """Return the cached per-seating bookings for a day, loading it when missing or stale"""
+        with self._lock:
+            cached = self._days.get(day)
+        if cached and time.monotonic() - cached[0] < self.config["day_cache_seconds"]:
+            return cached[1]
+        return self._load_day(day)
+
+    def invalidate(self, day: Optional[date] = None) -> None:
+        """Forget cached bookings for one day, or for all days"""
+        with self._lock:
+            if day is None:
+                self._days.clear()
+            else:
+                self._days.pop(day, None)
+
+    @contextmanager
+    def _slot_lock(self, day: date, seating: dt_time):
+        # Serialize bookings for the same seating within this process; the row locks
+        # taken below make the check-and-insert atomic across processes too
+        with self._lock:
+            lock = self._slot_locks.setdefault((day, seating), threading.Lock())
+        with lock:
+            yield
+
+    def book(self, day: date, slot: dt_time, guests: int) -> Tuple[bool, str, Optional[int]]:
+        """Atomically check capacity for the seating a time falls in and insert the reservation
+
+        19:00 and 19:30 share the 19:00 seating with 60-minute slots, so they
+        draw on the same tables. The reservation keeps the requested time.
+        """
+        if not self.is_open(slot):
+            return False, "slot_closed", None
+
+        seating = self.seating(slot)
+        with self._slot_lock(day, seating):
+            for attempt in range(self.config["max_booking_retries"]):
+                try:
+                    reservation_id, parties = self._book_in_transaction(day, seating, slot, guests)
+                    break
+                except _DeadlockError:
+                    logger.warning(f"Deadlock booking {day} {slot}, retrying ({attempt + 1})")
+            else:
+                return False, "slot_busy", None
+
+        if reservation_id is None:
+            return False, "slot_full", None
+
+        with self._lock:
+            cached = self._days.get(day)
+            if cached:
+                cached[1][seating] = parties + [guests]
+        return True, "", reservation_id
+
+    def _book_in_transaction(
+        self, day: date, seating: dt_time, slot: dt_time, guests: int
+    ) -> Tuple[Optional[int], List[int]]:
+        with self._connection_factory() as conn:
+            conn.start_transaction()
+            try:
+                cursor = conn.cursor()
+                # FOR UPDATE takes next-key locks on the seating's (date, time) index range,
+                # so a concurrent booking anywhere in the same seating waits until we commit
+                cursor.execute("""
+                    SELECT guests FROM reservations
+                    WHERE reservation_date = %s AND reservation_time >= %s AND reservation_time < %s
+                      AND status = 'confirmed'
+                    FOR UPDATE
+                """, (day, *self._seating_bounds(seating)))
+                parties = [int(row[0]) for row in cursor.fetchall()]
+
+                if not self.fits(parties, guests):
+                    conn.rollback()
+                    return None, parties
+
+                cursor.execute("""
+                    INSERT INTO reservations
+                    (guests, reservation_date, reservation_time, status)
+                    VALUES (%s, %s, %s, 'confirmed')
+                """, (guests, day, slot.strftime('%H:%M:%S')))
+                reservation_id = cursor.lastrowid
+                conn.commit()
+                return reservation_id, parties
+            except Exception as e:
+                conn.rollback()
+                if getattr(e, "errno", None) == 1213:  # ER_LOCK_DEADLOCK
+                    raise _DeadlockError() from e
+                raise
+
+    def next_available(self, guests: int, start: datetime, count: int = 3, days: int = 7) -> List[datetime]:
+        """Find the next `count` slot start times from `start` that can seat `guests`"""
+        found: List[datetime] = []
+        step = timedelta(minutes=self.config["slot_minutes"])
+        for offset in range(days):
+            day = start.date() + timedelta(days=offset)
+            bookings = self.day_bookings(day)
+            candidate = datetime.combine(day, dt_time(self.config["opening_hour"]))
+            closing = datetime.combine(day, dt_time(0)) + timedelta(hours=self.config["closing_hour"])
+            while candidate < closing:
+                if candidate >= start and self.fits(bookings.get(candidate.time(), []), guests):
+                    found.append(candidate)
+                    if len(found) >= count:
+                        return found
+                candidate += step
+        return found
+
+
+def _to_time(value: Any) -> dt_time:
+    """mysql.connector returns TIME columns as timedelta"""
+    if isinstance(value, timedelta):
+        seconds = int(value.total_seconds())
+        return dt_time(seconds // 3600, (seconds % 3600) // 60, seconds % 60)
+    return value
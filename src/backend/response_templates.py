@@ -1,533 +1,697 @@
 from fastapi.responses import JSONResponse
 from typing import Dict, Any, List, Tuple, Optional
-from datetime import datetime, timedelta
+from datetime import datetime
+import json
 import random
+import re
 from order_utils import format_order_items
+from datetime_parser import ParsedDateTime
+from metrics import Histogram, timed
 
+try:
+    import orjson
+except ImportError:  # optional; the standard library encoder produces the same bytes, only slower
+    orjson = None
+
+
+# Time to build and encode each kind of reply
+RESPONSE_BUILD_SECONDS = Histogram(
+    "karachibites_response_build_seconds", "Time spent building webhook responses", ["builder"]
+)
+
+
+def _dumps(content: Any) -> bytes:
+    """Compact UTF-8 JSON, byte-for-byte what JSONResponse would send"""
+    if orjson is not None:
+        return orjson.dumps(content)
+    return json.dumps(content, ensure_ascii=False, allow_nan=False, separators=(",", ":")).encode("utf-8")
+
+
+class PrerenderedJSONResponse(JSONResponse):
+    """JSONResponse that sends ready-made JSON bytes as-is and encodes anything else with _dumps"""
+
+    def render(self, content: Any) -> bytes:
+        return content if isinstance(content, bytes) else _dumps(content)
+
+
+def slot(name: str) -> str:
+    """Placeholder inside a template string, filled in when the ResponseTemplate is rendered"""
+    return f"\ue000{name}\ue001"
+
+
+class ResponseTemplate:
+    """A response body encoded to JSON once; per call only the slot values are escaped and spliced in"""
+
+    _SLOT = re.compile("\ue000(\\w+)\ue001".encode("utf-8"))
+
+    def __init__(self, content: Dict[str, Any], status_code: int = 200):
+        parts = self._SLOT.split(_dumps(content))
+        self._literals = parts[0::2]
+        self._slots = [name.decode("utf-8") for name in parts[1::2]]
+        self.status_code = status_code
+
+    def render_bytes(self, **values: Any) -> bytes:
+        if not self._slots:
+            return self._literals[0]
+        # Slots only ever sit inside JSON strings, so each value is escaped as a string body
+        escaped = {name: _dumps(str(value))[1:-1] for name, value in values.items()}
+        chunks = [self._literals[0]]
+        for name, literal in zip(self._slots, self._literals[1:]):
+            chunks.append(escaped[name])
+            chunks.append(literal)
+        return b"".join(chunks)
+
+    def __call__(self, status_code: Optional[int] = None, **values: Any) -> JSONResponse:
+        return PrerenderedJSONResponse(self.render_bytes(**values), status_code=status_code or self.status_code)
+
+
+# Error text per message key; only the one asked for is formatted
+_ERROR_MESSAGES = {
+    "invalid_order_id": lambda context: "❌ Please enter a valid Order ID (numbers only)",
+    "order_not_found": lambda context: f"❌ Order #{context if context else 'N/A'} not found",
+    "order_creation_failed": lambda context: f"❌ {context if context else 'Order creation failed'}",
+    "database_error": lambda context: "⚠️ Temporary database issue",
+    "system_error": lambda context: f"⚠️ Our systems are busy. {context if context else 'Please try again later.'}",
+    "item_not_found": lambda context: f"❌ We don't have information about '{context.replace('_', ' ') if context and hasattr(context, 'replace') else 'that item'}'",
+    "support_ticket_failed": lambda context: f"❌ Failed to create support ticket: {context if context else 'Unknown error'}",
+    "reservation_failed": lambda context: f"❌ Reservation failed: {context if context else 'Please try again'}",
+    "feedback_failed": lambda context: f"❌ Failed to submit feedback: {context if context else 'Please try again'}"
+}
+
+_ERROR = ResponseTemplate(
+    {
+        "fulfillmentText": slot("text"),
+        "payload": {
+            "richContent": [[{
+                "type": "chips",
+                "options": [
+                    {"text": "🔄 Try again"},
+                    {"text": "📞 Contact support"}
+                ]
+            }]]
+        }
+    },
+    status_code=400
+)
+
+@timed(RESPONSE_BUILD_SECONDS)
 def error_response(message: str, context: Any = None, status_code: int = 400) -> JSONResponse:
-    error_messages = {
-        "invalid_order_id": "❌ Please enter a valid Order ID (numbers only)",
-        "order_not_found": f"❌ Order #{context if context else 'N/A'} not found",
-        "order_creation_failed": f"❌ {context if context else 'Order creation failed'}",
-        "database_error": "⚠️ Temporary database issue",
-        "system_error": f"⚠️ Our systems are busy. {context if context else 'Please try again later.'}",
-        "item_not_found": f"❌ We don't have information about '{context.replace('_', ' ') if context and hasattr(context, 'replace') else 'that item'}'",
-        "support_ticket_failed": f"❌ Failed to create support ticket: {context if context else 'Unknown error'}",
-        "reservation_failed": f"❌ Reservation failed: {context if context else 'Please try again'}",
-        "feedback_failed": f"❌ Failed to submit feedback: {context if context else 'Please try again'}"
-    }
-    
-    # Safely get the error message
-    fulfillment_text = error_messages.get(message, "⚠️ Something went wrong")
+    build = _ERROR_MESSAGES.get(message)
+    fulfillment_text = build(context) if build else "⚠️ Something went wrong"
     if context is None and ':' in fulfillment_text:
         fulfillment_text = fulfillment_text.split(':')[0]  # Remove context part if None
-    
-    return JSONResponse(
-        content={
-            "fulfillmentText": fulfillment_text,
-            "payload": {
-                "richContent": [[{
-                    "type": "chips",
-                    "options": [
-                        {"text": "🔄 Try again"},
-                        {"text": "📞 Contact support"}
-                    ]
-                }]]
-            }
-        },
-        status_code=status_code
-    )
 
+    return _ERROR(status_code=status_code, text=fulfillment_text)
+
+def _product_templates(options_in_stock: List[Dict[str, Any]], options_out_of_stock: List[Dict[str, Any]]) -> Dict[bool, ResponseTemplate]:
+    """One template per stock state, keyed by item['in_stock']"""
+    return {
+        in_stock: ResponseTemplate({
+            "fulfillmentText": slot("text"),
+            "payload": {"richContent": [[{"type": "chips", "options": options}]]}
+        })
+        for in_stock, options in ((True, options_in_stock), (False, options_out_of_stock))
+    }
+
+_PLACE_ORDER_CHIP = {"text": "🛒 Place Order", "intent": "PlaceOrder", "parameters": {"dish_items": slot("dish")}}
+
+_PRODUCT_PRICE = _product_templates(
+    [_PLACE_ORDER_CHIP, {"text": "🔙 Back to menu", "intent": "Show_Menu"}],
+    [{"text": "⏳ Notify when available", "intent": "Notify_Me"}, {"text": "🔙 Back to menu", "intent": "Show_Menu"}]
+)
+
+# Price and stock answers offer the same chips
+_PRODUCT_STOCK = _PRODUCT_PRICE
+
+_PRODUCT_FULL = _product_templates(
+    [_PLACE_ORDER_CHIP, {"text": "🔍 More details", "intent": "Product_Details"}],
+    [{"text": "⏳ Notify me", "intent": "Notify_Me"}, {"text": "🔍 More details", "intent": "Product_Details"}]
+)
+
+@timed(RESPONSE_BUILD_SECONDS)
 def product_price_response(item: Dict) -> JSONResponse:
-    return JSONResponse(
-        content={
-            "fulfillmentText": (
-                f"💰 Price Information:\n"
-                f"🍽️ Item: {item['name'].title()}\n"
-                f"💵 Price: Rs. {item['price']:.2f}\n"
-                f"📦 Category: {item['category']}\n\n"
-                f"Would you like to place an order?"
-            ),
-            "payload": {
-                "richContent": [[{
-                    "type": "chips",
-                    "options": [
-                        {
-                            "text": "🛒 Place Order",
-                            "intent": "PlaceOrder",
-                            "parameters": {"dish_items": item['name']}
-                        } if item['in_stock'] else
-                        {
-                            "text": "⏳ Notify when available",
-                            "intent": "Notify_Me"
-                        },
-                        {
-                            "text": "🔙 Back to menu",
-                            "intent": "Show_Menu"
-                        }
-                    ]
-                }]]
-            }
-        }
+    return _PRODUCT_PRICE[bool(item['in_stock'])](
+        text=(
+            f"💰 Price Information:\n"
+            f"🍽️ Item: {item['name'].title()}\n"
+            f"💵 Price: Rs. {item['price']:.2f}\n"
+            f"📦 Category: {item['category']}\n\n"
+            f"Would you like to place an order?"
+        ),
+        dish=item['name']
     )
 
+@timed(RESPONSE_BUILD_SECONDS)
 def product_stock_response(item: Dict) -> JSONResponse:
     status = "✅ In stock" if item['in_stock'] else "❌ Out of stock"
-    return JSONResponse(
-        content={
-            "fulfillmentText": (
-                f"📦 Availability Information:\n"
-                f"🍽️ Item: {item['name'].title()}\n"
-                f"🔄 Status: {status}\n"
-                f"📦 Category: {item['category']}"
-            ),
-            "payload": {
-                "richContent": [[{
-                    "type": "chips",
-                    "options": [
-                        {
-                            "text": "🛒 Place Order",
-                            "intent": "PlaceOrder",
-                            "parameters": {"dish_items": item['name']}
-                        } if item['in_stock'] else
-                        {
-                            "text": "⏳ Notify when available",
-                            "intent": "Notify_Me"
-                        },
-                        {
-                            "text": "🔙 Back to menu",
-                            "intent": "Show_Menu"
-                        }
-                    ]
-                }]]
-            }
-        }
+    return _PRODUCT_STOCK[bool(item['in_stock'])](
+        text=(
+            f"📦 Availability Information:\n"
+            f"🍽️ Item: {item['name'].title()}\n"
+            f"🔄 Status: {status}\n"
+            f"📦 Category: {item['category']}"
+        ),
+        dish=item['name']
     )
 
+@timed(RESPONSE_BUILD_SECONDS)
 def product_full_response(item: Dict) -> JSONResponse:
-    return JSONResponse(
-        content={
-            "fulfillmentText": (
-                f"ℹ️ Product Information:\n"
-                f"🍽️ Item: {item['name'].title()}\n"
-                f"💰 Price: Rs. {item['price']:.2f}\n"
-                f"📦 Status: {'✅ In stock' if item['in_stock'] else '❌ Out of stock'}\n"
-                f"🍽️ Category: {item['category']}\n\n"
-                f"Would you like to place an order?"
-            ),
-            "payload": {
-                "richContent": [[{
-                    "type": "chips",
-                    "options": [
-                        {
-                            "text": "🛒 Place Order",
-                            "intent": "PlaceOrder",
-                            "parameters": {"dish_items": item['name']}
-                        } if item['in_stock'] else
-                        {
-                            "text": "⏳ Notify me", 
-                            "intent": "Notify_Me"
-                        },
-                        {
-                            "text": "🔍 More details",
-                            "intent": "Product_Details"
-                        }
-                    ]
-                }]]
-            }
+    return _PRODUCT_FULL[bool(item['in_stock'])](
+        text=(
+            f"ℹ️ Product Information:\n"
+            f"🍽️ Item: {item['name'].title()}\n"
+            f"💰 Price: Rs. {item['price']:.2f}\n"
+            f"📦 Status: {'✅ In stock' if item['in_stock'] else '❌ Out of stock'}\n"
+            f"🍽️ Category: {item['category']}\n\n"
+            f"Would you like to place an order?"
+        ),
+        dish=item['name']
+    )
+
+# One template per number of suggestions, each suggestion offered as a chip
+_ITEM_SUGGESTIONS = {
+    count: ResponseTemplate({
+        "fulfillmentText": f"❓ We don't have '{slot('item')}'. Did you mean {slot('choices')}?",
+        "payload": {
+            "richContent": [[{
+                "type": "chips",
+                "options": [
+                    {"text": slot(f"label{i}"), "intent": "Product_Details", "parameters": {"dish_items": slot(f"dish{i}")}}
+                    for i in range(count)
+                ] + [{"text": "📋 Show menu", "intent": "Show_Menu"}]
+            }]]
         }
+    })
+    for count in range(1, 4)
+}
+
+@timed(RESPONSE_BUILD_SECONDS)
+def item_suggestion_response(item_name: str, suggestions: List[str]) -> JSONResponse:
+    """Ask which menu item was meant instead of answering for a guessed one"""
+    suggestions = suggestions[:len(_ITEM_SUGGESTIONS)]
+    return _ITEM_SUGGESTIONS[len(suggestions)](
+        item=item_name.replace('_', ' '),
+        choices=" or ".join(name.title() for name in suggestions),
+        **{f"dish{i}": name for i, name in enumerate(suggestions)},
+        **{f"label{i}": name.title() for i, name in enumerate(suggestions)}
     )
 
-def order_success_response(message: str, order_id: str, items: List[Tuple[str, int]]) -> JSONResponse:
-    items_str = format_order_items(items)
-    return JSONResponse(
-        content={
-            "fulfillmentText": (
-                f"🎉 Order #{order_id} confirmed!\n"
-                f"🍽️ Items: {items_str}\n"
-                f"⏳ Estimated ready by: {(datetime.now() + timedelta(minutes=random.randint(20, 40))).strftime('%I:%M %p')}\n"
-                f"🔍 Check status with: 'Status #{order_id}'"
-            ),
-            "payload": {
-                "richContent": [[
-                    {
-                        "type": "info",
-                        "title": "✅ Order Confirmed",
-                        "text": [
-                            f"Order #{order_id} confirmed!",
-                            f"Items: {items_str}",
-                            f"Estimated ready by: {(datetime.now() + timedelta(minutes=random.randint(20, 40))).strftime('%I:%M %p')}"
-                        ]
-                    },
-                    {
-                        "type": "chips",
-                        "options": [
-                            {"text": f"🔍 Check order #{order_id}", "intent": "Check_Status"},
-                            {"text": "🛒 New order", "intent": "Place_Order"}
-                        ]
-                    }
-                ]]
+_ORDER_SUCCESS = ResponseTemplate({
+    "fulfillmentText": (
+        f"🎉 Order #{slot('order_id')} confirmed!\n"
+        f"🍽️ Items: {slot('items')}\n"
+        f"💵 Total: Rs. {slot('total')}\n"
+        f"⏳ Estimated ready by: {slot('ready_by')}\n"
+        f"🔍 Check status with: 'Status #{slot('order_id')}'"
+    ),
+    "payload": {
+        "richContent": [[
+            {
+                "type": "info",
+                "title": "✅ Order Confirmed",
+                "text": [
+                    f"Order #{slot('order_id')} confirmed!",
+                    f"Items: {slot('items')}",
+                    f"Total: Rs. {slot('total')}",
+                    f"Estimated ready by: {slot('ready_by')}"
+                ]
+            },
+            {
+                "type": "chips",
+                "options": [
+                    {"text": f"🔍 Check order #{slot('order_id')}", "intent": "Check_Status"},
+                    {"text": "🛒 New order", "intent": "Place_Order"}
+                ]
             }
-        }
+        ]]
+    }
+})
+
+@timed(RESPONSE_BUILD_SECONDS)
+def order_success_response(
+    message: str, order_id: str, items: List[Tuple[str, int]], total: float, ready_at: Optional[datetime] = None
+) -> JSONResponse:
+    ready_by = ready_at.strftime('%I:%M %p') if ready_at else "shortly"
+    return _ORDER_SUCCESS(order_id=order_id, items=format_order_items(items), total=f"{total:.2f}", ready_by=ready_by)
+
+_CART = ResponseTemplate({
+    "fulfillmentText": (
+        f"🛒 Your cart:\n{slot('lines')}\n"
+        f"💵 Total: Rs. {slot('total')}\n"
+        f"{slot('unavailable')}"
+        f"Say 'confirm order' to place it, or add more items."
+    ),
+    "payload": {
+        "richContent": [[
+            {
+                "type": "info",
+                "title": "🛒 Your Cart",
+                "text": [slot("lines"), f"Total: Rs. {slot('total')}"]
+            },
+            {
+                "type": "chips",
+                "options": [
+                    {"text": "✅ Confirm order", "intent": "Confirm_Order"},
+                    {"text": "➕ Add more items", "intent": "PlaceOrder"},
+                    {"text": "🗑️ Clear cart", "intent": "Clear_Cart"}
+                ]
+            }
+        ]]
+    }
+})
+
+@timed(RESPONSE_BUILD_SECONDS)
+def cart_response(lines: List[Tuple[str, int, float]], total: float, unavailable: List[str]) -> JSONResponse:
+    return _CART(
+        lines="\n".join(
+            f"• {quantity} x {name.replace('_', ' ').title()} — Rs. {quantity * price:.2f}"
+            for name, quantity, price in lines
+        ),
+        total=f"{total:.2f}",
+        unavailable=f"⚠️ Not available right now: {', '.join(unavailable)}\n" if unavailable else ""
     )
 
+_CART_UNAVAILABLE = ResponseTemplate({
+    "fulfillmentText": f"❌ Sorry, we can't add {slot('items')} right now. What else would you like?",
+    "payload": {
+        "richContent": [[{
+            "type": "chips",
+            "options": [
+                {"text": "📋 Show menu", "intent": "Show_Menu"},
+                {"text": "📝 Custom order...", "intent": "Custom_Order"}
+            ]
+        }]]
+    }
+})
+
+@timed(RESPONSE_BUILD_SECONDS)
+def cart_unavailable_response(unavailable: List[str]) -> JSONResponse:
+    return _CART_UNAVAILABLE(items=", ".join(unavailable))
+
+_CART_CLEARED = ResponseTemplate({
+    "fulfillmentText": "🗑️ Your cart is empty now. What would you like to order?",
+    "payload": {
+        "richContent": [[{
+            "type": "chips",
+            "options": [
+                {"text": "🍛 2 Chicken Biryani + 🥤 1 Pepsi", "intent": "Quick_Order"},
+                {"text": "🏠 Main Menu", "intent": "Main_Menu"}
+            ]
+        }]]
+    }
+})
+
+@timed(RESPONSE_BUILD_SECONDS)
+def cart_cleared_response() -> JSONResponse:
+    return _CART_CLEARED()
+
+_SUPPORT_TICKET = ResponseTemplate({
+    "fulfillmentText": (
+        f"🎫 {slot('greeting')}Support ticket created!\n"
+        f"📝 We've received your request about: {slot('description')}\n"
+        f"👨‍💻 Our technical team will contact you soon.\n"
+        f"⏱️ Expected response time: within 24 hours"
+    ),
+    "payload": {
+        "richContent": [[
+            {
+                "type": "info",
+                "title": "✅ Support Request Received",
+                "text": [
+                    f"Ticket ID: #{slot('ticket_id')}",
+                    f"Issue: {slot('description')}",
+                    "Our team will contact you shortly",
+                    "Priority: Medium"
+                ]
+            },
+            {
+                "type": "chips",
+                "options": [
+                    {"text": "🛒 Place an order", "intent": "Place_Order"},
+                    {"text": "❓ FAQ", "intent": "FAQ"},
+                    {"text": "🏠 Back to main menu", "intent": "Main_Menu"}
+                ]
+            }
+        ]]
+    }
+})
+
+@timed(RESPONSE_BUILD_SECONDS)
 def support_ticket_response(description: str, name: Optional[str] = None) -> JSONResponse:
     greeting = f"Thanks, {name}! " if name else ""
-    return JSONResponse(
-        content={
-            "fulfillmentText": (
-                f"🎫 {greeting}Support ticket created!\n"
-                f"📝 We've received your request about: {description}\n"
-                f"👨‍💻 Our technical team will contact you soon.\n"
-                f"⏱️ Expected response time: within 24 hours"
-            ),
-            "payload": {
-                "richContent": [[
-                    {
-                        "type": "info",
-                        "title": "✅ Support Request Received",
-                        "text": [
-                            f"Ticket ID: #{random.randint(1000, 9999)}",
-                            f"Issue: {description}",
-                            "Our team will contact you shortly",
-                            "Priority: Medium"
-                        ]
-                    },
-                    {
-                        "type": "chips",
-                        "options": [
-                            {"text": "🛒 Place an order", "intent": "Place_Order"},
-                            {"text": "❓ FAQ", "intent": "FAQ"},
-                            {"text": "🏠 Back to main menu", "intent": "Main_Menu"}
-                        ]
-                    }
-                ]]
-            }
-        }
-    )
+    return _SUPPORT_TICKET(greeting=greeting, description=description, ticket_id=random.randint(1000, 9999))
 
+_FEEDBACK_PROMPT_NAME = ResponseTemplate({
+    "fulfillmentText": "💬 I'd love to hear your feedback! May I have your name, please?",
+    "payload": {
+        "richContent": [[{
+            "type": "chips",
+            "options": [
+                {"text": "⏩ Skip this step", "intent": "GiveCustomerFeedback - skip_name"},
+                {"text": "🏠 Main Menu", "intent": "Main_Menu"}
+            ]
+        }]]
+    }
+})
+
+@timed(RESPONSE_BUILD_SECONDS)
 def feedback_prompt_name_response() -> JSONResponse:
     """Response to ask for user's name for feedback"""
-    return JSONResponse(
-        content={
-            "fulfillmentText": "💬 I'd love to hear your feedback! May I have your name, please?",
-            "payload": {
-                "richContent": [[{
-                    "type": "chips",
-                    "options": [
-                        {"text": "⏩ Skip this step", "intent": "GiveCustomerFeedback - skip_name"},
-                        {"text": "🏠 Main Menu", "intent": "Main_Menu"}
-                    ]
-                }]]
-            }
-        }
-    )
+    return _FEEDBACK_PROMPT_NAME()
+
+_FEEDBACK_PROMPT_PHONE = ResponseTemplate({
+    "fulfillmentText": f"📱 {slot('greeting')}Can you share your phone number?",
+    "payload": {
+        "richContent": [[{
+            "type": "chips",
+            "options": [
+                {"text": "⏩ Skip this step", "intent": "GiveCustomerFeedback - skip_phone"},
+                {"text": "🏠 Main Menu", "intent": "Main_Menu"}
+            ]
+        }]]
+    }
+})
 
+@timed(RESPONSE_BUILD_SECONDS)
 def feedback_prompt_phone_response(name: Optional[str] = None) -> JSONResponse:
     """Response to ask for user's phone number for feedback"""
     greeting = f"Thanks, {name}! " if name else ""
-    return JSONResponse(
-        content={
-            "fulfillmentText": f"📱 {greeting}Can you share your phone number?",
-            "payload": {
-                "richContent": [[{
-                    "type": "chips",
-                    "options": [
-                        {"text": "⏩ Skip this step", "intent": "GiveCustomerFeedback - skip_phone"},
-                        {"text": "🏠 Main Menu", "intent": "Main_Menu"}
-                    ]
-                }]]
-            }
-        }
-    )
+    return _FEEDBACK_PROMPT_PHONE(greeting=greeting)
 
+_FEEDBACK_PROMPT_TEXT = ResponseTemplate({
+    "fulfillmentText": f"📝 {slot('greeting')}Please share your feedback.",
+    "payload": {
+        "richContent": [[{
+            "type": "chips",
+            "options": [
+                {"text": "🏠 Main Menu", "intent": "Main_Menu"}
+            ]
+        }]]
+    }
+})
+
+@timed(RESPONSE_BUILD_SECONDS)
 def feedback_prompt_text_response(name: Optional[str] = None) -> JSONResponse:
     """Response to ask for feedback text"""
-    greeting = f"Thanks{', ' + name if name else ''}! " 
-    return JSONResponse(
-        content={
-            "fulfillmentText": f"📝 {greeting}Please share your feedback.",
-            "payload": {
-                "richContent": [[{
-                    "type": "chips",
-                    "options": [
-                        {"text": "🏠 Main Menu", "intent": "Main_Menu"}
-                    ]
-                }]]
+    greeting = f"Thanks{', ' + name if name else ''}! "
+    return _FEEDBACK_PROMPT_TEXT(greeting=greeting)
+
+_FEEDBACK_SUBMITTED = ResponseTemplate({
+    "fulfillmentText": f"✨ {slot('greeting')}We appreciate your valuable feedback! Your thoughts will help us improve our services.",
+    "payload": {
+        "richContent": [[
+            {
+                "type": "info",
+                "title": "✅ Feedback Received",
+                "text": [
+                    "✅ Your feedback has been submitted successfully",
+                    "🙏 We're grateful for your input",
+                    "🌟 Your feedback helps us improve"
+                ]
+            },
+            {
+                "type": "chips",
+                "options": [
+                    {"text": "🛒 Place an order", "intent": "Place_Order"},
+                    {"text": "📅 Make reservation", "intent": "MakeReservation"},
+                    {"text": "🏠 Main menu", "intent": "Main_Menu"}
+                ]
             }
-        }
-    )
+        ]]
+    }
+})
 
+@timed(RESPONSE_BUILD_SECONDS)
 def feedback_submitted_response(name: Optional[str] = None) -> JSONResponse:
     """Response after successful feedback submission"""
     greeting = f"Thank you, {name}! " if name else "Thank you! "
-    return JSONResponse(
-        content={
-            "fulfillmentText": f"✨ {greeting}We appreciate your valuable feedback! Your thoughts will help us improve our services.",
-            "payload": {
-                "richContent": [[
-                    {
-                        "type": "info",
-                        "title": "✅ Feedback Received",
-                        "text": [
-                            "✅ Your feedback has been submitted successfully",
-                            "🙏 We're grateful for your input",
-                            "🌟 Your feedback helps us improve"
-                        ]
-                    },
-                    {
-                        "type": "chips",
-                        "options": [
-                            {"text": "🛒 Place an order", "intent": "Place_Order"},
-                            {"text": "📅 Make reservation", "intent": "MakeReservation"},
-                            {"text": "🏠 Main menu", "intent": "Main_Menu"}
-                        ]
-                    }
-                ]]
-            }
-        }
-    )
+    return _FEEDBACK_SUBMITTED(greeting=greeting)
+
+_FEEDBACK_CANCELLED = ResponseTemplate({
+    "fulfillmentText": "👍 No problem at all! If you change your mind later, feel free to share your feedback anytime.",
+    "payload": {
+        "richContent": [[{
+            "type": "chips",
+            "options": [
+                {"text": "🛒 Place an order", "intent": "Place_Order"},
+                {"text": "📅 Make reservation", "intent": "MakeReservation"},
+                {"text": "🏠 Main menu", "intent": "Main_Menu"}
+            ]
+        }]]
+    }
+})
 
+@timed(RESPONSE_BUILD_SECONDS)
 def feedback_cancelled_response() -> JSONResponse:
     """Response when user cancels feedback"""
-    return JSONResponse(
-        content={
-            "fulfillmentText": "👍 No problem at all! If you change your mind later, feel free to share your feedback anytime.",
-            "payload": {
-                "richContent": [[{
-                    "type": "chips",
-                    "options": [
-                        {"text": "🛒 Place an order", "intent": "Place_Order"},
-                        {"text": "📅 Make reservation", "intent": "MakeReservation"},
-                        {"text": "🏠 Main menu", "intent": "Main_Menu"}
-                    ]
-                }]]
-            }
-        }
-    )
+    return _FEEDBACK_CANCELLED()
 
+_TECHNICAL_SUPPORT_NAME = ResponseTemplate({
+    "fulfillmentText": "🔧 I'm sorry to hear you're experiencing an issue. May I have your name, please?",
+    "payload": {
+        "richContent": [[{
+            "type": "chips",
+            "options": [
+                {"text": "⏩ Skip this step", "intent": "Technical_Support - skip_name"},
+                {"text": "❌ Cancel", "intent": "Technical_Support - cancel"}
+            ]
+        }]]
+    }
+})
+
+@timed(RESPONSE_BUILD_SECONDS)
 def technical_support_name_response() -> JSONResponse:
     """Response to ask for user's name for technical support"""
-    return JSONResponse(
-        content={
-            "fulfillmentText": "🔧 I'm sorry to hear you're experiencing an issue. May I have your name, please?",
-            "payload": {
-                "richContent": [[{
-                    "type": "chips",
-                    "options": [
-                        {"text": "⏩ Skip this step", "intent": "Technical_Support - skip_name"},
-                        {"text": "❌ Cancel", "intent": "Technical_Support - cancel"}
-                    ]
-                }]]
-            }
-        }
-    )
+    return _TECHNICAL_SUPPORT_NAME()
+
+_TECHNICAL_SUPPORT_PHONE = ResponseTemplate({
+    "fulfillmentText": f"📱 {slot('greeting')}Can you share your phone number in case we need to follow up?",
+    "payload": {
+        "richContent": [[{
+            "type": "chips",
+            "options": [
+                {"text": "⏩ Skip this step", "intent": "Technical_Support - skip_phone"},
+                {"text": "❌ Cancel", "intent": "Technical_Support - cancel"}
+            ]
+        }]]
+    }
+})
 
+@timed(RESPONSE_BUILD_SECONDS)
 def technical_support_phone_response(name: Optional[str] = None) -> JSONResponse:
     """Response to ask for user's phone number for technical support"""
     greeting = f"Thanks, {name}! " if name else ""
-    return JSONResponse(
-        content={
-            "fulfillmentText": f"📱 {greeting}Can you share your phone number in case we need to follow up?",
-            "payload": {
-                "richContent": [[{
-                    "type": "chips",
-                    "options": [
-                        {"text": "⏩ Skip this step", "intent": "Technical_Support - skip_phone"},
-                        {"text": "❌ Cancel", "intent": "Technical_Support - cancel"}
-                    ]
-                }]]
-            }
-        }
-    )
+    return _TECHNICAL_SUPPORT_PHONE(greeting=greeting)
+
+_TECHNICAL_SUPPORT_ISSUE = ResponseTemplate({
+    "fulfillmentText": f"🔍 {slot('greeting')}What type of issue are you facing?",
+    "payload": {
+        "richContent": [[{
+            "type": "chips",
+            "options": [
+                {"text": "📱 Device Problem", "intent": "Technical_Support - issue", "parameters": {"issue": "device"}},
+                {"text": "🔐 Account Issue", "intent": "Technical_Support - issue", "parameters": {"issue": "account"}},
+                {"text": "💻 Technical Issue", "intent": "Technical_Support - issue", "parameters": {"issue": "technical"}},
+                {"text": "🌐 Website Problem", "intent": "Technical_Support - issue", "parameters": {"issue": "website"}},
+                {"text": "❓ Other", "intent": "Technical_Support - issue", "parameters": {"issue": "general"}}
+            ]
+        }]]
+    }
+})
 
+@timed(RESPONSE_BUILD_SECONDS)
 def technical_support_issue_response(name: Optional[str] = None) -> JSONResponse:
     """Response to ask for issue type"""
     greeting = f"Thanks{', ' + name if name else ''}! "
-    return JSONResponse(
-        content={
-            "fulfillmentText": f"🔍 {greeting}What type of issue are you facing?",
-            "payload": {
-                "richContent": [[{
-                    "type": "chips",
-                    "options": [
-                        {"text": "📱 Device Problem", "intent": "Technical_Support - issue", "parameters": {"issue": "device"}},
-                        {"text": "🔐 Account Issue", "intent": "Technical_Support - issue", "parameters": {"issue": "account"}},
-                        {"text": "💻 Technical Issue", "intent": "Technical_Support - issue", "parameters": {"issue": "technical"}},
-                        {"text": "🌐 Website Problem", "intent": "Technical_Support - issue", "parameters": {"issue": "website"}},
-                        {"text": "❓ Other", "intent": "Technical_Support - issue", "parameters": {"issue": "general"}}
-                    ]
-                }]]
-            }
-        }
-    )
+    return _TECHNICAL_SUPPORT_ISSUE(greeting=greeting)
+
+_ISSUE_EMOJI = {
+    "device": "📱",
+    "account": "🔐",
+    "technical": "💻",
+    "website": "🌐",
+    "general": "❓"
+}
 
+_TECHNICAL_SUPPORT_DESCRIPTION = ResponseTemplate({
+    "fulfillmentText": f"{slot('emoji')} Please describe your {slot('issue_type')} issue in detail.",
+    "payload": {
+        "richContent": [[{
+            "type": "chips",
+            "options": [
+                {"text": "❌ Cancel", "intent": "Technical_Support - cancel"}
+            ]
+        }]]
+    }
+})
+
+@timed(RESPONSE_BUILD_SECONDS)
 def technical_support_description_response(issue_type: str) -> JSONResponse:
     """Response to ask for detailed description of technical issue"""
-    emoji_map = {
-        "device": "📱",
-        "account": "🔐",
-        "technical": "💻",
-        "website": "🌐",
-        "general": "❓"
+    return _TECHNICAL_SUPPORT_DESCRIPTION(emoji=_ISSUE_EMOJI.get(issue_type, "🔧"), issue_type=issue_type)
+
+_TECHNICAL_SUPPORT_CANCELLED = ResponseTemplate({
+    "fulfillmentText": "👍 I understand. If you need help later, feel free to contact our support team anytime.",
+    "payload": {
+        "richContent": [[{
+            "type": "chips",
+            "options": [
+                {"text": "🛒 Place an order", "intent": "Place_Order"},
+                {"text": "❓ FAQ", "intent": "FAQ"},
+                {"text": "🏠 Main Menu", "intent": "Main_Menu"}
+            ]
+        }]]
     }
-    emoji = emoji_map.get(issue_type, "🔧")
-    
-    return JSONResponse(
-        content={
-            "fulfillmentText": f"{emoji} Please describe your {issue_type} issue in detail.",
-            "payload": {
-                "richContent": [[{
-                    "type": "chips",
-                    "options": [
-                        {"text": "❌ Cancel", "intent": "Technical_Support - cancel"}
-                    ]
-                }]]
-            }
-        }
-    )
+})
 
+@timed(RESPONSE_BUILD_SECONDS)
 def technical_support_cancelled_response() -> JSONResponse:
     """Response when user cancels technical support request"""
-    return JSONResponse(
-        content={
-            "fulfillmentText": "👍 I understand. If you need help later, feel free to contact our support team anytime.",
-            "payload": {
-                "richContent": [[{
-                    "type": "chips",
-                    "options": [
-                        {"text": "🛒 Place an order", "intent": "Place_Order"},
-                        {"text": "❓ FAQ", "intent": "FAQ"},
-                        {"text": "🏠 Main Menu", "intent": "Main_Menu"}
-                    ]
-                }]]
-            }
-        }
-    )
+    return _TECHNICAL_SUPPORT_CANCELLED()
+
+_ASK_FOR_ORDER_ITEMS = ResponseTemplate({
+    "fulfillmentText": "🍽️ What would you like to order today? (Example: '2 chicken biryani and 1 pepsi')",
+    "payload": {
+        "richContent": [[{
+            "type": "chips",
+            "options": [
+                {"text": "🍛 2 Chicken Biryani + 🥤 1 Pepsi", "intent": "Quick_Order"},
+                {"text": "🍔 1 Beef Burger + 🥤 2 Colas", "intent": "Quick_Order"},
+                {"text": "🍲 1 Mutton Karahi + 🫓 2 Naan", "intent": "Quick_Order"},
+                {"text": "📝 Custom order...", "intent": "Custom_Order"}
+            ]
+        }]]
+    }
+})
 
+@timed(RESPONSE_BUILD_SECONDS)
 def ask_for_order_items() -> JSONResponse:
-    return JSONResponse(
-        content={
-            "fulfillmentText": "🍽️ What would you like to order today? (Example: '2 chicken biryani and 1 pepsi')",
-            "payload": {
-                "richContent": [[{
-                    "type": "chips",
-                    "options": [
-                        {"text": "🍛 2 Chicken Biryani + 🥤 1 Pepsi", "intent": "Quick_Order"},
-                        {"text": "🍔 1 Beef Burger + 🥤 2 Colas", "intent": "Quick_Order"},
-                        {"text": "🍲 1 Mutton Karahi + 🫓 2 Naan", "intent": "Quick_Order"},
-                        {"text": "📝 Custom order...", "intent": "Custom_Order"}
-                    ]
-                }]]
-            }
-        }
-    )
+    return _ASK_FOR_ORDER_ITEMS()
+
+_ASK_FOR_ORDER_NUMBER = ResponseTemplate({
+    "fulfillmentText": "🔢 Please provide your Order ID (example: '1019')",
+    "payload": {
+        "richContent": [[{
+            "type": "chips",
+            "options": [
+                {"text": "🔍 Check order status", "intent": "Check_Status"},
+                {"text": "🛒 Place new order", "intent": "Place_Order"}
+            ]
+        }]]
+    }
+})
 
+@timed(RESPONSE_BUILD_SECONDS)
 def ask_for_order_number() -> JSONResponse:
-    return JSONResponse(
-        content={
-            "fulfillmentText": "🔢 Please provide your Order ID (example: '1019')",
-            "payload": {
-                "richContent": [[{
-                    "type": "chips",
-                    "options": [
-                        {"text": "🔍 Check order status", "intent": "Check_Status"},
-                        {"text": "🛒 Place new order", "intent": "Place_Order"}
-                    ]
-                }]]
+    return _ASK_FOR_ORDER_NUMBER()
+
+_STATUS_EMOJI = {
+    'Pending': "⏳",
+    'Confirmed': "✅",
+    'Preparing': "👨‍🍳",
+    'On the way': "🛵",
+    'Delivered': "🎉",
+    'Cancelled': "❌"
+}
+
+_STATUS_MESSAGES = {
+    'Pending': "⏳ Awaiting confirmation",
+    'Confirmed': "✅ Being prepared",
+    'Preparing': "👨‍🍳 Cooking in progress",
+    'Delivered': "🎉 Delivered",
+    'Cancelled': "❌ Cancelled"
+}
+
+_ORDER_STATUS = ResponseTemplate({
+    "fulfillmentText": (
+        f"📦 Order #{slot('order_id')}\n"
+        f"{slot('status_msg')}\n"
+        f"🍽️ Items: {slot('items')}"
+    ),
+    "payload": {
+        "richContent": [[
+            {
+                "type": "info",
+                "title": f"{slot('status_emoji')} Order #{slot('order_id')} Status",
+                "text": [
+                    f"Status: {slot('status_msg')}",
+                    f"Items: {slot('items')}",
+                    f"Estimated: {slot('estimated')}"
+                ]
+            },
+            {
+                "type": "chips",
+                "options": [
+                    {"text": "🛒 New order", "intent": "Place_Order"},
+                    {"text": "📞 Support", "intent": "Contact_Support"}
+                ]
             }
-        }
-    )
+        ]]
+    }
+})
 
+@timed(RESPONSE_BUILD_SECONDS)
 def order_status_response(order: Dict) -> JSONResponse:
-    status_emoji = {
-        'Pending': "⏳",
-        'Confirmed': "✅",
-        'Preparing': "👨‍🍳",
-        'On the way': "🛵",
-        'Delivered': "🎉",
-        'Cancelled': "❌"
-    }.get(order['status'], "🔄")
-    
-    status_msg = {
-        'Pending': "⏳ Awaiting confirmation",
-        'Confirmed': "✅ Being prepared",
-        'Preparing': "👨‍🍳 Cooking in progress",
-        'On the way': f"🛵 Out for delivery (ETA: {order['estimated_time']})",
-        'Delivered': "🎉 Delivered",
-        'Cancelled': "❌ Cancelled"
-    }.get(order['status'], order['status'])
-    
-    return JSONResponse(
-        content={
-            "fulfillmentText": (
-                f"📦 Order #{order['order_id']}\n"
-                f"{status_msg}\n"
-                f"🍽️ Items: {order['items']}"
-            ),
-            "payload": {
-                "richContent": [[
-                    {
-                        "type": "info",
-                        "title": f"{status_emoji} Order #{order['order_id']} Status",
-                        "text": [
-                            f"Status: {status_msg}",
-                            f"Items: {order['items']}",
-                            f"Estimated: {order.get('estimated_time', '')}"
-                        ]
-                    },
-                    {
-                        "type": "chips",
-                        "options": [
-                            {"text": "🛒 New order", "intent": "Place_Order"},
-                            {"text": "📞 Support", "intent": "Contact_Support"}
-                        ]
-                    }
-                ]]
-            }
-        }
+    status = order['status']
+    if status == 'On the way':
+        status_msg = f"🛵 Out for delivery (ETA: {order['estimated_time']})"
+    else:
+        status_msg = _STATUS_MESSAGES.get(status, status)
+
+    return _ORDER_STATUS(
+        order_id=order['order_id'],
+        status_msg=status_msg,
+        items=order['items'],
+        status_emoji=_STATUS_EMOJI.get(status, "🔄"),
+        estimated=order.get('estimated_time', '')
     )
 
+_RESERVATION_QUESTIONS = {
+    "guest_count": ResponseTemplate({"fulfillmentText": "👥 How many guests will be dining? (1-20)"}),
+    "reserve_date_time": ResponseTemplate({"fulfillmentText": "📅 What date and time would you like to book for? (e.g., '10 Jan 10 AM' or 'January 10 2 PM')"})
+}
+
+@timed(RESPONSE_BUILD_SECONDS)
 def ask_reservation_question(missing_param: str) -> JSONResponse:
-    questions = {
-        "guest_count": "👥 How many guests will be dining? (1-20)",
-        "reserve_date_time": "📅 What date and time would you like to book for? (e.g., '10 Jan 10 AM' or 'January 10 2 PM')"
-    }
-    return JSONResponse(
-        content={"fulfillmentText": questions[missing_param]}
-    )
+    return _RESERVATION_QUESTIONS[missing_param]()
 
-def reservation_success_response(reservation_id: int, guests: int, date: str, time: str) -> JSONResponse:
-    return JSONResponse(
-        content={
-            "fulfillmentText": (
-                f"🎉 Reservation confirmed!\n"
-                f"📅 Date: {date}\n"
-                f"⏰ Time: {time}\n"
-                f"👥 Guests: {guests}\n"
-                f"Your reservation ID is #{reservation_id}"
-            ),
-            "payload": {
-                "richContent": [[
-                    {
-                        "type": "info",
-                        "title": "✅ Reservation Confirmed",
-                        "text": [
-                            f"Reservation #{reservation_id} confirmed!",
-                            f"📅 Date: {date}",
-                            f"⏰ Time: {time}",
-                            f"👥 Guests: {guests}"
-                        ]
-                    },
-                    {
-                        "type": "chips",
-                        "options": [
-                            {"text": "📅 View my reservations", "intent": "ViewReservations"},
-                            {"text": "🛎️ Special requests", "intent": "SpecialRequests"},
-                            {"text": "🛒 Place an order", "intent": "PlaceOrder"}
-                        ]
-                    }
-                ]]
+_RESERVATION_SUCCESS = ResponseTemplate({
+    "fulfillmentText": (
+        f"🎉 Reservation confirmed!\n"
+        f"📅 Date: {slot('date')}\n"
+        f"⏰ Time: {slot('time')}\n"
+        f"👥 Guests: {slot('guests')}\n"
+        f"Your reservation ID is #{slot('reservation_id')}"
+    ),
+    "payload": {
+        "richContent": [[
+            {
+                "type": "info",
+                "title": "✅ Reservation Confirmed",
+                "text": [
+                    f"Reservation #{slot('reservation_id')} confirmed!",
+                    f"📅 Date: {slot('date')}",
+                    f"⏰ Time: {slot('time')}",
+                    f"👥 Guests: {slot('guests')}"
+                ]
+            },
+            {
+                "type": "chips",
+                "options": [
+                    {"text": "📅 View my reservations", "intent": "ViewReservations"},
+                    {"text": "🛎️ Special requests", "intent": "SpecialRequests"},
+                    {"text": "🛒 Place an order", "intent": "PlaceOrder"}
+                ]
             }
-        }
-    )
\ No newline at end of file
+        ]]
+    }
+})
+
+@timed(RESPONSE_BUILD_SECONDS)
+def reservation_success_response(reservation_id: int, guests: int, when: ParsedDateTime) -> JSONResponse:
+    return _RESERVATION_SUCCESS(
+        reservation_id=reservation_id,
+        guests=guests,
+        date=when.display_date,
+        time=when.display_time
+    )
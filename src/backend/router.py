@@ -0,0 +1,115 @@
+import time
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Optional, Tuple
+
+from fastapi.responses import JSONResponse
+
+from metrics import LatencyStats
+from order_utils import UtteranceMatches
+
+# Handlers return a response, or None to let the next route try
+Handler = Callable[["Turn"], Awaitable[Optional[JSONResponse]]]
+# Called as timing_hook(route name, seconds, handled) after every handler invocation
+TimingHook = Callable[[str, float, bool], None]
+
+
+class Turn:
+    """Everything a handler needs about one webhook request"""
+    __slots__ = ("session_id", "session", "user_input", "intent", "parameters", "signals", "awaiting", "committed")
+
+    def __init__(
+        self,
+        session_id: str,
+        session: Dict[str, Any],
+        user_input: str,
+        intent: str,
+        parameters: Dict[str, Any],
+        signals: UtteranceMatches,
+        awaiting: Iterable[str] = ()
+    ):
+        self.session_id = session_id
+        self.session = session
+        self.user_input = user_input
+        self.intent = intent
+        self.parameters = parameters
+        self.signals = signals
+        self.awaiting = tuple(awaiting)
+        # Set by a handler once it has written something (an order, a reservation, a ticket);
+        # such a turn must not be re-run if its session save loses a race
+        self.committed = False
+
+
+class IntentRouter:
+    """Dispatches a turn by awaiting state, then intent displayName, then an ordered keyword fallback
+
+    Awaiting-state and intent routes are dict lookups; only turns neither claims
+    walk the fallback list, in registration order, until a handler responds.
+    """
+
+    def __init__(self, timing_hook: Optional[TimingHook] = None):
+        self.timing_hook = timing_hook
+        self._awaiting: Dict[str, List[Tuple[str, Handler]]] = {}
+        self._intents: Dict[str, Tuple[str, Handler]] = {}
+        self._fallbacks: List[Tuple[str, Handler]] = []
+        self._default: Optional[Tuple[str, Handler]] = None
+        self._latency: Dict[str, LatencyStats] = {}
+
+    @staticmethod
+    def _route_name(handler: Handler, name: Optional[str]) -> str:
+        return name or f"{handler.__module__.rsplit('.', 1)[-1]}.{handler.__name__}"
+
+    def add_awaiting(self, states: Iterable[str], handler: Handler, name: Optional[str] = None) -> None:
+        route = (self._route_name(handler, name), handler)
+        for state in states:
+            self._awaiting.setdefault(state, []).append(route)
+
+    def add_intent(self, intents: Iterable[str], handler: Handler, name: Optional[str] = None) -> None:
+        route = (self._route_name(handler, name), handler)
+        for intent in intents:
+            if intent in self._intents:
+                raise ValueError(f"Intent {intent!r} is already routed to {self._intents[intent][0]}")
+            self._intents[intent] = route
+
+    def add_fallback(self, handler: Handler, name: Optional[str] = None) -> None:
+        self._fallbacks.append((self._route_name(handler, name), handler))
+
+    def set_default(self, handler: Handler, name: Optional[str] = None) -> None:
+        self._default = (self._route_name(handler, name), handler)
+
+    async def _call(self, route: Tuple[str, Handler], turn: Turn) -> Optional[JSONResponse]:
+        name, handler = route
+        started = time.perf_counter()
+        response = await handler(turn)
+        elapsed = time.perf_counter() - started
+        stats = self._latency.get(name)
+        if stats is None:
+            stats = self._latency.setdefault(name, LatencyStats())
+        stats.observe(elapsed)
+        if self.timing_hook is not None:
+            self.timing_hook(name, elapsed, response is not None)
+        return response
+
+    async def dispatch(self, turn: Turn) -> Optional[JSONResponse]:
+        for state in turn.awaiting:
+            for route in self._awaiting.get(state, ()):
+                response = await self._call(route, turn)
+                if response is not None:
+                    return response
+
+        route = self._intents.get(turn.intent)
+        if route is not None:
+            response = await self._call(route, turn)
+            if response is not None:
+                return response
+
+        for route in self._fallbacks:
+            response = await self._call(route, turn)
+            if response is not None:
+                return response
+
+        if self._default is not None:
+            return await self._call(self._default, turn)
+        return None
+
+    def stats(self) -> Dict[str, Any]:
+        """Per-route handler latency, including calls that passed the turn on"""
+        return {name: stats.snapshot() for name, stats in sorted(self._latency.items())}
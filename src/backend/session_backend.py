@@ -0,0 +1,315 @@
+import abc
+import asyncio
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from session_store import SESSION_CONFIG, SessionStore
+
+try:
+    import redis.asyncio as aioredis
+except ImportError:  # only needed for the redis backend
+    aioredis = None
+
+logger = logging.getLogger(__name__)
+
+# Where conversation state lives. "memory" is per-process; use "sqlite" (one host)
+# or "redis" (many hosts) when running uvicorn with --workers or behind a load balancer.
+SESSION_BACKEND_CONFIG = {
+    "backend": "memory",
+    "sqlite_path": "sessions.sqlite3",
+    "redis_url": "redis://localhost:6379/0",
+    "key_prefix": "karachibites:session:",
+    "idle_ttl_seconds": SESSION_CONFIG["idle_ttl_seconds"]
+}
+
+
+class SessionConflictError(Exception):
+    """Raised when another worker saved the session after this turn loaded it"""
+
+
+class SessionCodec:
+    """Compact JSON for session state: only fields that differ from a fresh session are stored"""
+
+    def __init__(self, defaults: Callable[[], Dict[str, Any]]):
+        self.defaults = defaults
+        self._template = defaults()
+        # Encoding of a session nobody has touched yet
+        self.empty = self.encode(self._template)
+
+    @staticmethod
+    def _strip(value: Any, default: Any) -> Any:
+        if not (isinstance(value, dict) and isinstance(default, dict)):
+            return value
+        return {
+            key: SessionCodec._strip(item, default.get(key))
+            for key, item in value.items()
+            if key not in default or item != default[key]
+        }
+
+    @staticmethod
+    def _merge(target: Dict[str, Any], stored: Dict[str, Any]) -> Dict[str, Any]:
+        for key, item in stored.items():
+            if isinstance(item, dict) and isinstance(target.get(key), dict):
+                SessionCodec._merge(target[key], item)
+            else:
+                target[key] = item
+        return target
+
+    def encode(self, state: Dict[str, Any]) -> bytes:
+        return json.dumps(self._strip(state, self._template), separators=(",", ":"), ensure_ascii=False).encode()
+
+    def decode(self, blob: Optional[bytes]) -> Dict[str, Any]:
+        state = self.defaults()
+        return self._merge(state, json.loads(blob)) if blob else state
+
+
+class LoadedSession:
+    """A session read for one turn, with the version and bytes it was read at"""
+    __slots__ = ("session_id", "state", "version", "blob")
+
+    def __init__(self, session_id: str, state: Dict[str, Any], version: int, blob: Optional[bytes]):
+        self.session_id = session_id
+        self.state = state
+        self.version = version
+        self.blob = blob
+
+
+class SessionBackend(abc.ABC):
+    """Load a session at the start of a turn and save it back with optimistic concurrency
+
+    Every stored session carries a version; a save only succeeds if the version
+    is still the one the turn loaded, so two workers racing on one session
+    cannot silently overwrite each other. Unchanged sessions are not written.
+    """
+
+    def __init__(self, codec: SessionCodec, idle_ttl_seconds: float):
+        self.codec = codec
+        self.idle_ttl_seconds = idle_ttl_seconds
+        self._stats = {"loads": 0, "saves": 0, "unchanged": 0, "conflicts": 0, "merged": 0}
+
+    @abc.abstractmethod
+    async def _read(self, session_id: str) -> Tuple[Optional[bytes], int]:
+        """Return (stored bytes or None, version); version 0 means never saved"""
+
+    @abc.abstractmethod
+    async def _write(self, session_id: str, blob: bytes, expected_version: int) -> bool:
+        """Store blob as expected_version + 1 if the stored version is still expected_version"""
+
+    async def load(self, session_id: str) -> LoadedSession:
+        blob, version = await self._read(session_id)
+        self._stats["loads"] += 1
+        return LoadedSession(session_id, self.codec.decode(blob), version, blob)
+
+    async def save(self, loaded: LoadedSession) -> None:
+        blob = self.codec.encode(loaded.state)
+        if blob == (loaded.blob or self.codec.empty):
+            self._stats["unchanged"] += 1
+            return
+        if not await self._write(loaded.session_id, blob, loaded.version):
+            self._stats["conflicts"] += 1
+            raise SessionConflictError(f"Session {loaded.session_id} changed since version {loaded.version}")
+        self._stats["saves"] += 1
+        loaded.version += 1
+        loaded.blob = blob
+
+    async def save_merged(self, loaded: LoadedSession, attempts: int = 3) -> bool:
+        """Save a turn that lost the version race after committing a side effect
+
+        Such a turn cannot be re-run, so every top-level field it changed is
+        written over the latest stored session; fields it left alone keep the
+        other worker's values. Returns False if every attempt conflicted again.
+        """
+        base = self.codec.decode(loaded.blob)
+        changes = {key: value for key, value in loaded.state.items() if value != base.get(key)}
+        for _ in range(attempts):
+            latest = await self.load(loaded.session_id)
+            latest.state.update(changes)
+            try:
+                await self.save(latest)
+            except SessionConflictError:
+                continue
+            self._stats["merged"] += 1
+            return True
+        return False
+
+    async def close(self) -> None:
+        pass
+
+    def _backend_stats(self) -> Dict[str, Any]:
+        return {}
+
+    def stats(self) -> Dict[str, Any]:
+        return {"backend": type(self).__name__, **self._stats, **self._backend_stats()}
+
+
+class MemorySessionBackend(SessionBackend):
+    """Per-process sessions in a SessionStore; fine for a single worker"""
+
+    def __init__(self, codec: SessionCodec, idle_ttl_seconds: float, **store_options):
+        super().__init__(codec, idle_ttl_seconds)
+        self._lock = threading.Lock()
+        self._store = SessionStore(lambda: None, idle_ttl_seconds=idle_ttl_seconds, **store_options)
+
+    async def _read(self, session_id: str) -> Tuple[Optional[bytes], int]:
+        entry = self._store.peek(session_id)
+        return (entry[1], entry[0]) if entry else (None, 0)
+
+    async def _write(self, session_id: str, blob: bytes, expected_version: int) -> bool:
+        with self._lock:
+            entry = self._store.peek(session_id)
+            if (entry[0] if entry else 0) != expected_version:
+                return False
+            self._store.set(session_id, (expected_version + 1, blob))
+            return True
+
+    def _backend_stats(self) -> Dict[str, Any]:
+        return self._store.stats()
+
+
+class SQLiteSessionBackend(SessionBackend):
+    """Sessions in a local SQLite file, shared by every worker process on the host
+
+    sqlite3 blocks, and waits up to its busy timeout while another process holds
+    the write lock, so every statement runs on one dedicated thread instead of
+    the event loop.
+    """
+
+    def __init__(self, codec: SessionCodec, idle_ttl_seconds: float, path: str,
+                 sweep_interval_seconds: float = SESSION_CONFIG["sweep_interval_seconds"],
+                 sweep_batch: int = SESSION_CONFIG["sweep_batch"]):
+        super().__init__(codec, idle_ttl_seconds)
+        self.path = path
+        self.sweep_interval_seconds = sweep_interval_seconds
+        self.sweep_batch = sweep_batch
+        self._last_sweep = time.time()
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="session-sqlite")
+        # Autocommit; every statement below is a single atomic write
+        self._conn = sqlite3.connect(path, timeout=5.0, isolation_level=None, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS sessions ("
+            "id TEXT PRIMARY KEY, version INTEGER NOT NULL, data BLOB NOT NULL, updated_at REAL NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_sessions_updated ON sessions (updated_at)")
+
+    async def _run(self, func: Callable[..., Any], *args: Any) -> Any:
+        return await asyncio.get_running_loop().run_in_executor(self._executor, func, *args)
+
+    async def _read(self, session_id: str) -> Tuple[Optional[bytes], int]:
+        return await self._run(self._read_sync, session_id)
+
+    async def _write(self, session_id: str, blob: bytes, expected_version: int) -> bool:
+        return await self._run(self._write_sync, session_id, blob, expected_version)
+
+    def _read_sync(self, session_id: str) -> Tuple[Optional[bytes], int]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT version, data, updated_at FROM sessions WHERE id = ?", (session_id,)
+            ).fetchone()
+        if row is None:
+            return None, 0
+        version, data, updated_at = row
+        # An expired row still holds the version a fresh session has to replace
+        if time.time() - updated_at > self.idle_ttl_seconds:
+            return None, version
+        return data, version
+
+    def _write_sync(self, session_id: str, blob: bytes, expected_version: int) -> bool:
+        now = time.time()
+        with self._lock:
+            if expected_version == 0:
+                cursor = self._conn.execute(
+                    "INSERT INTO sessions (id, version, data, updated_at) VALUES (?, 1, ?, ?) "
+                    "ON CONFLICT(id) DO NOTHING",
+                    (session_id, blob, now)
+                )
+            else:
+                cursor = self._conn.execute(
+                    "UPDATE sessions SET version = version + 1, data = ?, updated_at = ? "
+                    "WHERE id = ? AND version = ?",
+                    (blob, now, session_id, expected_version)
+                )
+            if now - self._last_sweep >= self.sweep_interval_seconds:
+                self._last_sweep = now
+                self._conn.execute(
+                    "DELETE FROM sessions WHERE id IN "
+                    "(SELECT id FROM sessions WHERE updated_at < ? ORDER BY updated_at LIMIT ?)",
+                    (now - self.idle_ttl_seconds, self.sweep_batch)
+                )
+        return cursor.rowcount == 1
+
+    async def close(self) -> None:
+        await self._run(self._close_sync)
+        self._executor.shutdown(wait=True)
+
+    def _close_sync(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+    def _backend_stats(self) -> Dict[str, Any]:
+        # Called from the sync /stats and /metrics endpoints, which run on a worker thread
+        with self._lock:
+            live = self._conn.execute(
+                "SELECT COUNT(*) FROM sessions WHERE updated_at >= ?", (time.time() - self.idle_ttl_seconds,)
+            ).fetchone()[0]
+        return {"live": live, "bytes": os.path.getsize(self.path) if os.path.exists(self.path) else 0}
+
+
+class RedisSessionBackend(SessionBackend):
+    """Sessions in Redis hashes ({v: version, d: data}) that expire after the idle TTL"""
+
+    # Compare-and-set in one round trip; a missing key counts as version 0
+    _CAS_SCRIPT = """
+local current = redis.call('HGET', KEYS[1], 'v') or '0'
+if current ~= ARGV[1] then
+    return 0
+end
+redis.call('HSET', KEYS[1], 'v', tonumber(ARGV[1]) + 1, 'd', ARGV[2])
+redis.call('EXPIRE', KEYS[1], ARGV[3])
+return 1
+"""
+
+    def __init__(self, codec: SessionCodec, idle_ttl_seconds: float, url: str, key_prefix: str):
+        if aioredis is None:
+            raise RuntimeError("The redis session backend needs the 'redis' package (pip install redis)")
+        super().__init__(codec, idle_ttl_seconds)
+        self.key_prefix = key_prefix
+        self._client = aioredis.from_url(url)
+        self._cas = self._client.register_script(self._CAS_SCRIPT)
+
+    async def _read(self, session_id: str) -> Tuple[Optional[bytes], int]:
+        version, data = await self._client.hmget(self.key_prefix + session_id, "v", "d")
+        return data, int(version or 0)
+
+    async def _write(self, session_id: str, blob: bytes, expected_version: int) -> bool:
+        stored = await self._cas(
+            keys=[self.key_prefix + session_id],
+            args=[expected_version, blob, int(self.idle_ttl_seconds)]
+        )
+        return stored == 1
+
+    async def close(self) -> None:
+        # redis-py 5 renamed close() to aclose()
+        await getattr(self._client, "aclose", self._client.close)()
+
+
+def create_session_backend(defaults: Callable[[], Dict[str, Any]], config: Optional[Dict[str, Any]] = None) -> SessionBackend:
+    """Build the backend named in SESSION_BACKEND_CONFIG"""
+    config = config or SESSION_BACKEND_CONFIG
+    codec = SessionCodec(defaults)
+    kind = config["backend"]
+    if kind == "memory":
+        return MemorySessionBackend(codec, config["idle_ttl_seconds"])
+    if kind == "sqlite":
+        return SQLiteSessionBackend(codec, config["idle_ttl_seconds"], config["sqlite_path"])
+    if kind == "redis":
+        return RedisSessionBackend(codec, config["idle_ttl_seconds"], config["redis_url"], config["key_prefix"])
+    raise ValueError(f"Unknown session backend: {kind}")
@@ -0,0 +1,136 @@
+import sys
+import threading
+import time
+from collections import OrderedDict
+from itertools import islice
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+SESSION_CONFIG = {
+    "idle_ttl_seconds": 1800,       # drop a conversation after 30 minutes without a turn
+    "max_sessions": 10000,          # least recently active sessions go first past this
+    "sweep_interval_seconds": 30,   # how often a request also clears out expired sessions
+    "sweep_batch": 256,             # most sessions one sweep may remove, so no request stalls
+    "size_sample": 256              # sessions measured when estimating memory use
+}
+
+
+def _deep_size(obj: Any, seen: Optional[set] = None) -> int:
+    """Approximate bytes held by a session's nested dicts, lists and scalars"""
+    seen = seen if seen is not None else set()
+    if id(obj) in seen:
+        return 0
+    seen.add(id(obj))
+    size = sys.getsizeof(obj)
+    if isinstance(obj, dict):
+        size += sum(_deep_size(k, seen) + _deep_size(v, seen) for k, v in obj.items())
+    elif isinstance(obj, (list, tuple, set)):
+        size += sum(_deep_size(item, seen) for item in obj)
+    return size
+
+
+class SessionStore:
+    """Conversation state keyed by session ID, expiring idle sessions and capped in size
+
+    Entries are kept in least-recently-active order, so expired sessions are
+    always at the front and a sweep only touches what it removes.
+    """
+
+    def __init__(
+        self,
+        factory: Callable[[], Any],
+        idle_ttl_seconds: float = SESSION_CONFIG["idle_ttl_seconds"],
+        max_sessions: int = SESSION_CONFIG["max_sessions"],
+        sweep_interval_seconds: float = SESSION_CONFIG["sweep_interval_seconds"],
+        sweep_batch: int = SESSION_CONFIG["sweep_batch"],
+        size_sample: int = SESSION_CONFIG["size_sample"]
+    ):
+        self._factory = factory
+        self.idle_ttl_seconds = idle_ttl_seconds
+        self.max_sessions = max_sessions
+        self.sweep_interval_seconds = sweep_interval_seconds
+        self.sweep_batch = sweep_batch
+        self.size_sample = size_sample
+        self._lock = threading.Lock()
+        self._sessions: "OrderedDict[str, Tuple[float, Any]]" = OrderedDict()
+        self._last_sweep = time.monotonic()
+        self._stats = {"created": 0, "expired": 0, "evicted": 0, "sweeps": 0}
+
+    def get(self, session_id: str) -> Any:
+        """Return the session's state, starting a fresh one if it is new or has expired"""
+        session = self.peek(session_id)
+        if session is None:
+            session = self._factory()
+            with self._lock:
+                self._stats["created"] += 1
+        self.set(session_id, session)
+        return session
+
+    def peek(self, session_id: str) -> Optional[Any]:
+        """Return the session without creating it or refreshing its idle timer"""
+        with self._lock:
+            entry = self._sessions.get(session_id)
+            if entry is None:
+                return None
+            if time.monotonic() - entry[0] > self.idle_ttl_seconds:
+                del self._sessions[session_id]
+                self._stats["expired"] += 1
+                return None
+            return entry[1]
+
+    def set(self, session_id: str, session: Any) -> None:
+        """Store the session as most recently active, evicting the least active past the cap"""
+        now = time.monotonic()
+        with self._lock:
+            self._sessions[session_id] = (now, session)
+            self._sessions.move_to_end(session_id)
+            while len(self._sessions) > self.max_sessions:
+                self._sessions.popitem(last=False)
+                self._stats["evicted"] += 1
+            sweep_due = now - self._last_sweep >= self.sweep_interval_seconds
+        if sweep_due:
+            self.sweep()
+
+    def discard(self, session_id: str) -> None:
+        with self._lock:
+            self._sessions.pop(session_id, None)
+
+    def sweep(self, limit: Optional[int] = None) -> int:
+        """Remove up to `limit` expired sessions from the idle end; returns how many went"""
+        limit = self.sweep_batch if limit is None else limit
+        now = time.monotonic()
+        removed = 0
+        with self._lock:
+            self._last_sweep = now
+            self._stats["sweeps"] += 1
+            while removed < limit and self._sessions:
+                session_id, (last_seen, _) = next(iter(self._sessions.items()))
+                if now - last_seen <= self.idle_ttl_seconds:
+                    break
+                del self._sessions[session_id]
+                removed += 1
+            self._stats["expired"] += removed
+        return removed
+
+    def __contains__(self, session_id: str) -> bool:
+        return session_id in self._sessions
+
+    def __len__(self) -> int:
+        return len(self._sessions)
+
+    def stats(self) -> Dict[str, Any]:
+        """Live session count, estimated bytes and eviction counters"""
+        with self._lock:
+            count = len(self._sessions)
+            step = max(1, count // self.size_sample)
+            sample: List[Any] = [
+                session for _, session in islice(self._sessions.values(), 0, None, step)
+            ][:self.size_sample]
+            counters = dict(self._stats)
+        sampled_bytes = sum(_deep_size(session) for session in sample)
+        return {
+            **counters,
+            "live": count,
+            "bytes": int(sampled_bytes / len(sample) * count) if sample else 0,
+            "max_sessions": self.max_sessions,
+            "idle_ttl_seconds": self.idle_ttl_seconds
+        }
@@ -0,0 +1,233 @@
+import glob
+import json
+import logging
+import os
+import queue
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+from metrics import LatencyStats
+
+logger = logging.getLogger(__name__)
+
+WRITE_BEHIND_CONFIG = {
+    "enabled": False,                          # opt-in: feedback/tickets are written synchronously otherwise
+    "max_queue": 10000,                        # records held in memory before enqueue() refuses
+    "batch_size": 200,                         # flush once this many records are waiting...
+    "flush_interval": 1.0,                     # ...or after this many seconds
+    "replay_interval": 30.0,                   # seconds between attempts to replay a leftover spill file
+    "spill_path": "write_behind_spill.jsonl"   # append-only file used on shutdown or DB outage
+}
+
+
+class WriteBehindQueue:
+    """Bounded in-process queue that batches low-priority inserts on a background thread"""
+
+    def __init__(
+        self,
+        flushers: Dict[str, Callable[[List[Dict[str, Any]]], None]],
+        max_queue: int = 10000,
+        batch_size: int = 200,
+        flush_interval: float = 1.0,
+        spill_path: str = "write_behind_spill.jsonl",
+        replay_interval: float = 30.0
+    ):
+        self._flushers = flushers
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.replay_interval = replay_interval
+        self.spill_path = spill_path
+        self._queue: "queue.Queue[Dict[str, Any]]" = queue.Queue(maxsize=max_queue)
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._db_down = False
+        self.flush_latency = LatencyStats()
+        self._stats = {
+            "enqueued": 0,
+            "rejected": 0,
+            "flushed": 0,
+            "batches": 0,
+            "flush_errors": 0,
+            "spilled": 0,
+            "replayed": 0,
+            "replay_attempts": 0
+        }
+
+    def start(self) -> None:
+        """Start the flush worker; it replays any spilled records first, then retries on a timer"""
+        if self._thread is not None:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="write-behind", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = 10.0) -> None:
+        """Flush what we can, then spill anything left so it survives the restart"""
+        if self._thread is None:
+            return
+        self._stop.set()
+        self._thread.join(timeout)
+        self._thread = None
+        leftovers = self._drain(self._queue.qsize())
+        if leftovers:
+            self._spill(leftovers)
+
+    def enqueue(self, kind: str, record: Dict[str, Any]) -> bool:
+        """Queue a record for a later batched insert; False when the queue is full"""
+        if kind not in self._flushers:
+            raise ValueError(f"Unknown write-behind record kind: {kind}")
+        try:
+            self._queue.put_nowait({"kind": kind, "record": record})
+        except queue.Full:
+            self._stats["rejected"] += 1
+            return False
+        self._stats["enqueued"] += 1
+        return True
+
+    def _drain(self, limit: int) -> List[Dict[str, Any]]:
+        entries = []
+        while len(entries) < limit:
+            try:
+                entries.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return entries
+
+    def _run(self) -> None:
+        # A spill left by an earlier run is replayed even if no new record ever arrives
+        next_replay = time.monotonic()
+        while not self._stop.is_set():
+            if time.monotonic() >= next_replay:
+                if self._spill_pending():
+                    self._stats["replay_attempts"] += 1
+                    self._replay_spill()
+                next_replay = time.monotonic() + self.replay_interval
+            batch = self._collect_batch()
+            if batch:
+                self._flush(batch)
+        # Final drain on shutdown: one last attempt before stop() spills the rest
+        batch = self._drain(self._queue.qsize())
+        if batch:
+            self._flush(batch)
+
+    def _collect_batch(self) -> List[Dict[str, Any]]:
+        """Block until batch_size records arrive or flush_interval elapses"""
+        batch: List[Dict[str, Any]] = []
+        deadline = time.monotonic() + self.flush_interval
+        while len(batch) < self.batch_size and not self._stop.is_set():
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+            batch.extend(self._drain(self.batch_size - len(batch)))
+        return batch
+
+    def _flush(self, entries: List[Dict[str, Any]], replay_on_recovery: bool = True) -> bool:
+        """Write entries grouped by kind; spill them to disk if the database is unavailable"""
+        by_kind: Dict[str, List[Dict[str, Any]]] = {}
+        for entry in entries:
+            by_kind.setdefault(entry["kind"], []).append(entry)
+
+        ok = True
+        for kind, group in by_kind.items():
+            started = time.perf_counter()
+            try:
+                self._flushers[kind]([entry["record"] for entry in group])
+            except Exception as e:
+                ok = False
+                self._stats["flush_errors"] += 1
+                logger.error(f"Write-behind flush of {len(group)} {kind} records failed: {e}")
+                self._spill(group)
+                continue
+            self.flush_latency.observe(time.perf_counter() - started)
+            self._stats["flushed"] += len(group)
+            self._stats["batches"] += 1
+
+        was_down, self._db_down = self._db_down, not ok
+        if ok and was_down and replay_on_recovery:
+            # Database is reachable again: push whatever spilled during the outage
+            self._replay_spill()
+        return ok
+
+    def _spill(self, entries: List[Dict[str, Any]]) -> None:
+        try:
+            with open(self.spill_path, "a", encoding="utf-8") as f:
+                for entry in entries:
+                    f.write(json.dumps(entry, separators=(",", ":")) + "\n")
+                f.flush()
+                os.fsync(f.fileno())
+            self._stats["spilled"] += len(entries)
+        except OSError as e:
+            logger.error(f"Write-behind spill of {len(entries)} records lost: {e}")
+
+    def _spill_pending(self) -> bool:
+        return os.path.exists(self.spill_path) or bool(glob.glob(f"{glob.escape(self.spill_path)}.*.replay"))
+
+    def _replay_spill(self) -> None:
+        """Re-insert records spilled by a previous run or outage"""
+        if os.path.exists(self.spill_path):
+            try:
+                # Claim the current spill file; new spills start a fresh one
+                os.replace(self.spill_path, f"{self.spill_path}.{time.time_ns()}.replay")
+            except OSError as e:
+                logger.error(f"Could not claim write-behind spill file: {e}")
+                return
+
+        # Also picks up files left behind by a crash during an earlier replay
+        for replay_path in sorted(glob.glob(f"{glob.escape(self.spill_path)}.*.replay")):
+            try:
+                with open(replay_path, encoding="utf-8") as f:
+                    entries = [json.loads(line) for line in f if line.strip()]
+            except (OSError, ValueError) as e:
+                logger.error(f"Could not read write-behind spill file {replay_path}: {e}")
+                continue
+
+            logger.info(f"Replaying {len(entries)} spilled write-behind records")
+            for i in range(0, len(entries), self.batch_size):
+                chunk = entries[i:i + self.batch_size]
+                if not self._flush(chunk, replay_on_recovery=False):
+                    # Database still down: _flush spilled the failed chunk, keep the rest too
+                    self._spill(entries[i + self.batch_size:])
+                    break
+                self._stats["replayed"] += len(chunk)
+            os.remove(replay_path)
+            if self._db_down:
+                return
+
+    def stats(self) -> Dict[str, Any]:
+        """Queue depth, flush counters and flush latency"""
+        return {
+            **self._stats,
+            "depth": self._queue.qsize(),
+            "running": self._thread is not None,
+            "db_down": self._db_down,
+            "flush_latency": self.flush_latency.snapshot()
+        }
+
+
+_write_behind: Optional[WriteBehindQueue] = None
+
+
+def get_write_behind() -> Optional[WriteBehindQueue]:
+    """Return the process-wide write-behind queue, or None when the mode is disabled"""
+    global _write_behind
+    if not WRITE_BEHIND_CONFIG["enabled"]:
+        return None
+    if _write_behind is None:
+        import database
+        _write_behind = WriteBehindQueue(
+            flushers={
+                "feedback": database.insert_feedback_batch,
+                "support_ticket": database.insert_support_ticket_batch
+            },
+            max_queue=WRITE_BEHIND_CONFIG["max_queue"],
+            batch_size=WRITE_BEHIND_CONFIG["batch_size"],
+            flush_interval=WRITE_BEHIND_CONFIG["flush_interval"],
+            spill_path=WRITE_BEHIND_CONFIG["spill_path"],
+            replay_interval=WRITE_BEHIND_CONFIG["replay_interval"]
+        )
+    return _write_behind
@@ -0,0 +1,97 @@
+"""Per-utterance cost of order, ID, dish and datetime extraction.
+
+Runs each extractor over short chat turns and over long pasted messages,
+alongside the string patterns they replaced, so the scaling is visible:
+
+    python src/benchmarks/extraction_bench.py --rounds 2000 --paste-words 400
+"""
+import argparse
+import re
+import sys
+import time
+from pathlib import Path
+from typing import Callable, List
+
+BENCH_DIR = Path(__file__).resolve().parent
+sys.path.insert(0, str(BENCH_DIR.parent / "backend"))
+
+from database import parse_datetime_input  # noqa: E402
+from order_utils import extract_dish_item, extract_order_details, extract_order_id  # noqa: E402
+
+SHORT = [
+    "i want 2 chicken biryani and 1 pepsi",
+    "what's the status of order #1042",
+    "what is the price of zinger burger",
+    "is haleem available today",
+    "book a table for 10 jan 27 8 pm"
+]
+
+FILLER = "please make sure the food is hot and packed well because we are having guests over tonight"
+
+
+def pasted(words: int) -> List[str]:
+    """Long messages with the interesting part at the end, as when users paste a chat log"""
+    filler = " ".join((FILLER.split() * (words // len(FILLER.split()) + 1))[:words])
+    return [f"{filler} {text}" for text in SHORT]
+
+
+def legacy_extract(text: str) -> None:
+    """The string patterns used before extraction_grammar, compiled through re's cache"""
+    lower = text.lower()
+    list(re.finditer(r'(\d+)\s+([a-zA-Z_\s]+?)(?=\s*\d+|and\s*\d+|$)', lower))
+    re.search(r'(?:order\s*[#]?\s*|status\s*of\s*|#|id\s*)?(\d{3,})', lower)
+    re.search(r'(?:price of|cost of|how much is|tell me the price of)\s+([a-zA-Z\s]+)', text.lower())
+    for pattern in (
+        r'(?:is|are)\s+([a-zA-Z\s]+)\s+(?:available|in stock|left)',
+        r'(?:tell me about|what is|what\'s)\s+([a-zA-Z\s]+)',
+        r'([a-zA-Z\s]+)\s+(?:price|cost|availability)',
+        r'(?:i\'d like|i want)\s+([a-zA-Z\s]+)',
+        r'(?:order|get me)\s+([a-zA-Z\s]+)'
+    ):
+        if re.search(pattern, text.lower()):
+            break
+    for pattern in (
+        r'(\d{1,2})\s+([a-z]{3,})\s+(\d{1,2}|\d{4})\s+(\d{1,2})\s+([ap]m)',
+        r'(\d{1,2})/(\d{1,2})/(\d{1,2}|\d{4})\s+(\d{1,2})\s+([ap]m)',
+        r'(\d{1,2})\s+([a-z]{3,})\s+(\d{1,2})\s+([ap]m)'
+    ):
+        if re.compile(pattern, re.IGNORECASE).search(lower):
+            break
+
+
+def grammar_extract(text: str) -> None:
+    extract_order_details(text)
+    extract_order_id(text)
+    extract_dish_item(text)
+    parse_datetime_input(text)
+
+
+def time_per_utterance(func: Callable[[str], None], texts: List[str], rounds: int) -> float:
+    started = time.perf_counter()
+    for _ in range(rounds):
+        for text in texts:
+            func(text)
+    return (time.perf_counter() - started) / (rounds * len(texts)) * 1e6
+
+
+def main_cli() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark utterance extraction")
+    parser.add_argument("--rounds", type=int, default=2000)
+    parser.add_argument("--paste-words", type=int, default=400, help="length of the long pasted messages")
+    args = parser.parse_args()
+
+    # parse_datetime_input logs every call; keep the numbers about extraction
+    import logging
+    logging.disable(logging.INFO)
+
+    long_rounds = max(1, args.rounds // 20)
+    print(f"{'input':<20}{'legacy us':>12}{'grammar us':>12}{'speedup':>10}")
+    for label, texts, rounds in (("short turns", SHORT, args.rounds),
+                                 (f"{args.paste_words}-word paste", pasted(args.paste_words), long_rounds)):
+        legacy = time_per_utterance(legacy_extract, texts, rounds)
+        grammar = time_per_utterance(grammar_extract, texts, rounds)
+        print(f"{label:<20}{legacy:>12.1f}{grammar:>12.1f}{legacy / grammar:>9.1f}x")
+
+
+if __name__ == "__main__":
+    main_cli()
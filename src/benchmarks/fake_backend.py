@@ -0,0 +1,185 @@
+import itertools
+import re
+import threading
+import time
+from datetime import date, datetime, time as dt_time
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+import database
+from menu_catalog import MenuCatalog
+from order_utils import ITEM_ALIASES
+from reservation_capacity import ReservationCapacity
+
+SCHEMA_FILE = Path(__file__).resolve().parents[1] / "schema" / "Resturant_db.sql"
+
+
+def load_seed_menu() -> List[Dict[str, Any]]:
+    """Read the seeded menu_items rows out of the schema file"""
+    sql = SCHEMA_FILE.read_text(encoding="utf-8")
+    return [
+        {"name": name, "price": float(price), "category": category, "in_stock": in_stock == "1"}
+        for name, price, category, in_stock in re.findall(r"\('(\w+)',\s*(\d+),\s*'([\w ]+)',\s*([01])\)", sql)
+    ]
+
+
+class FakeBackend:
+    """In-memory stand-in for the MySQL-backed functions in database.py"""
+
+    def __init__(self, latency_ms: float = 0.0):
+        self.latency = latency_ms / 1000.0
+        self._lock = threading.Lock()
+        self._order_ids = itertools.count(1000)
+        self.orders: Dict[int, Dict[str, Any]] = {}
+        self.feedback: List[Dict[str, Any]] = []
+        self.tickets: List[Dict[str, Any]] = []
+        self.menu_rows = load_seed_menu()
+
+    def _io(self) -> None:
+        """Simulate a database round trip"""
+        if self.latency:
+            time.sleep(self.latency)
+
+    def create_order(self, items: List[Tuple[str, int]]) -> Tuple[bool, str, Optional[int]]:
+        if not items:
+            return False, "No items in order", None
+        ok, message, order_ids = self.create_orders([items])
+        return ok, "Order created successfully", order_ids[0]
+
+    def create_orders(self, orders: List[List[Tuple[str, int]]]) -> Tuple[bool, str, List[int]]:
+        tickets = [database.kitchen_eta.place(items) for items in orders]
+        self._io()
+        order_ids = []
+        with self._lock:
+            for items, ticket in zip(orders, tickets):
+                order_id = next(self._order_ids)
+                self.orders[order_id] = {
+                    "order_id": order_id,
+                    "status": "Confirmed",
+                    "estimated_time": ticket.ready_at.strftime('%H:%M'),
+                    "items": [(name.replace(' ', '_').lower().strip(), qty) for name, qty in items]
+                }
+                database.kitchen_eta.bind(ticket, order_id)
+                order_ids.append(order_id)
+        return True, f"{len(order_ids)} orders created successfully", order_ids
+
+    def get_order_status(self, order_id: str) -> Tuple[bool, Optional[Dict], str]:
+        clean_id = ''.join(c for c in order_id if c.isdigit())
+        if not clean_id:
+            return False, None, "invalid_order_id"
+        self._io()
+        order = self.orders.get(int(clean_id))
+        if not order:
+            return False, None, "order_not_found"
+        return True, {
+            "order_id": order["order_id"],
+            "status": order["status"],
+            "estimated_time": order["estimated_time"],
+            "items": ", ".join(f"{qty} {name.replace('_', ' ')}" for name, qty in order["items"])
+        }, ""
+
+    def update_order_status(self, order_id: int, status: str) -> Tuple[bool, str]:
+        if status not in database.ORDER_STATUSES:
+            return False, "invalid_status"
+        self._io()
+        with self._lock:
+            order = self.orders.get(int(order_id))
+            if not order:
+                return False, "order_not_found"
+            order["status"] = status
+            ready_times = database.kitchen_eta.status_changed(order_id, status)
+            for other_id, ready_at in ready_times:
+                self.orders[other_id]["estimated_time"] = ready_at.strftime('%H:%M')
+        database.publish_order_changes(int(order_id), status, ready_times)
+        return True, "Order status updated successfully"
+
+    def submit_customer_feedback(self, user_id, name, phone_number, feedback_text, source_platform="chatbot"):
+        self._io()
+        self.feedback.append({
+            "session_id": user_id,
+            "customer_name": database.extract_name_value(name),
+            "phone": phone_number,
+            "feedback_text": feedback_text,
+            "source_platform": source_platform
+        })
+        return True, "Feedback submitted successfully"
+
+    def create_support_ticket(self, session_id, name, phone_number, issue_type, description):
+        self._io()
+        self.tickets.append({
+            "session_id": session_id,
+            "customer_name": database.extract_name_value(name),
+            "phone": phone_number,
+            "user_message": description,
+            "issue_category": issue_type
+        })
+        return True, "Support ticket created successfully"
+
+    def insert_feedback_batch(self, records: List[Dict[str, Any]]) -> None:
+        self._io()
+        self.feedback.extend(records)
+
+    def insert_support_ticket_batch(self, records: List[Dict[str, Any]]) -> None:
+        self._io()
+        self.tickets.extend(records)
+
+
+class FakeReservationCapacity(ReservationCapacity):
+    """Capacity engine with reservations kept in memory instead of MySQL"""
+
+    def __init__(self, backend: FakeBackend):
+        super().__init__(connection_factory=None)
+        self._backend = backend
+        self._booked: Dict[Tuple[date, dt_time], List[int]] = {}
+        self._reservation_ids = itertools.count(1)
+
+    def _load_day(self, day: date) -> Dict[dt_time, List[int]]:
+        self._backend._io()
+        slots = {slot: list(parties) for (d, slot), parties in self._booked.items() if d == day}
+        with self._lock:
+            self._days[day] = (time.monotonic(), slots)
+        return slots
+
+    def _book_in_transaction(
+        self, day: date, seating: dt_time, slot: dt_time, guests: int
+    ) -> Tuple[Optional[int], List[int]]:
+        self._backend._io()
+        parties = self._booked.setdefault((day, seating), [])
+        if not self.fits(parties, guests):
+            return None, list(parties)
+        existing = list(parties)
+        parties.append(guests)
+        return next(self._reservation_ids), existing
+
+
+def install(latency_ms: float = 0.0, monkeypatch=None) -> FakeBackend:
+    """Point database.py at in-memory data; returns the backend for inspection
+
+    Pass pytest's monkeypatch from a test so every swap is undone at teardown;
+    the benchmarks call it bare because they own the whole process.
+    """
+    backend = FakeBackend(latency_ms)
+    patch = monkeypatch.setattr if monkeypatch is not None else setattr
+    for name in (
+        "create_order", "create_orders", "get_order_status", "update_order_status",
+        "submit_customer_feedback", "create_support_ticket",
+        "insert_feedback_batch", "insert_support_ticket_batch"
+    ):
+        patch(database, name, getattr(backend, name))
+
+    menu_catalog = MenuCatalog(lambda: backend.menu_rows, aliases=ITEM_ALIASES)
+    menu_catalog.refresh()
+    patch(database, "menu_catalog", menu_catalog)
+    patch(database, "reservation_capacity", FakeReservationCapacity(backend))
+    schema_status = {
+        "ok": True,
+        "tables": {"reservations": True, "customer_feedback": True, "orders": True, "support_tickets": True},
+        "schema_version": database.SCHEMA_VERSION,
+        "checked_at": datetime.now().isoformat(timespec="seconds"),
+        "duration_ms": 0.0
+    }
+    patch(database, "_schema_status", schema_status)
+    patch(database, "validate_schema", lambda force=False: schema_status)
+    patch(database, "warm_menu_cache", lambda: None)
+    patch(database, "warm_kitchen_eta", lambda: None)
+    return backend
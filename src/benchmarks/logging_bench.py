@@ -0,0 +1,165 @@
+"""Per-request cost of logging on the webhook path.
+
+Replays the recorded corpus one turn at a time against main.app (fake
+backend) with logging off, with a synchronous file handler as before the
+queue pipeline, and with the queued JSON pipeline from log_pipeline (all
+records, and INFO sampled at 10%). --write-delay-ms makes every file write
+that slow, standing in for a busy disk:
+
+    python src/benchmarks/logging_bench.py --rounds 5 --flows 200
+    python src/benchmarks/logging_bench.py --write-delay-ms 2
+"""
+import argparse
+import asyncio
+import copy
+import logging
+import statistics
+import sys
+import tempfile
+import time
+import uuid
+from pathlib import Path
+from typing import Callable, Dict, List, Tuple
+
+BENCH_DIR = Path(__file__).resolve().parent
+sys.path.insert(0, str(BENCH_DIR.parent / "backend"))
+sys.path.insert(0, str(BENCH_DIR))
+
+import fake_backend  # noqa: E402
+
+fake_backend.install()
+
+import main  # noqa: E402
+from log_pipeline import configure_logging, shutdown_logging  # noqa: E402
+from webhook_bench import DEFAULT_CORPUS, ASGIClient, build_schedule, load_flows  # noqa: E402
+
+
+WRITE_DELAY = {"seconds": 0.0}
+
+
+class SlowFileHandler(logging.FileHandler):
+    """FileHandler whose every write takes at least --write-delay-ms"""
+
+    def emit(self, record: logging.LogRecord) -> None:
+        if WRITE_DELAY["seconds"]:
+            time.sleep(WRITE_DELAY["seconds"])
+        super().emit(record)
+
+
+def _slow_rotating_handlers(log_path: str) -> None:
+    """Swap the pipeline's file handler for the slow one"""
+    import log_pipeline
+    listener = log_pipeline._listener
+    handler = SlowFileHandler(log_path, encoding="utf-8")
+    handler.setFormatter(log_pipeline.JsonFormatter())
+    for old in listener.handlers:
+        old.close()
+    listener.handlers = [handler]
+
+
+def logging_off(log_path: str) -> None:
+    shutdown_logging()
+    logging.disable(logging.CRITICAL)
+
+
+def logging_sync(log_path: str) -> None:
+    """The old setup: every record formatted and written on the request thread"""
+    shutdown_logging()
+    logging.disable(logging.NOTSET)
+    root = logging.getLogger()
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+    handler = SlowFileHandler(log_path, encoding="utf-8")
+    handler.setFormatter(logging.Formatter("%(levelname)s:%(name)s:%(message)s"))
+    root.addHandler(handler)
+    root.setLevel(logging.INFO)
+
+
+def logging_queued(log_path: str) -> None:
+    logging.disable(logging.NOTSET)
+    root = logging.getLogger()
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+        handler.close()
+    configure_logging({"console": False, "file_path": log_path})
+    _slow_rotating_handlers(log_path)
+
+
+def logging_sampled(log_path: str) -> None:
+    logging.disable(logging.NOTSET)
+    configure_logging({"console": False, "file_path": log_path, "sample_rates": {"INFO": 0.1}})
+    _slow_rotating_handlers(log_path)
+
+
+MODES: Dict[str, Callable[[str], None]] = {
+    "off": logging_off,
+    "sync file": logging_sync,
+    "queued json": logging_queued,
+    "queued 10%": logging_sampled
+}
+
+
+async def time_turns(client: ASGIClient, flows: List[Dict]) -> Tuple[float, float]:
+    """Mean wall and process CPU seconds per webhook call, turns sent one at a time
+
+    CPU time includes the log writer thread, so work moved off the request
+    path still counts there.
+    """
+    elapsed = 0.0
+    turns = 0
+    cpu_started = time.process_time()
+    for flow in flows:
+        session_id = f"logbench-{uuid.uuid4().hex[:12]}"
+        for turn in flow["turns"]:
+            payload = copy.deepcopy(turn["payload"])
+            payload["session"] = payload["session"].replace("SESSION", session_id)
+            payload["responseId"] = uuid.uuid4().hex
+            started = time.perf_counter()
+            await client.post_json("/webhook", payload)
+            elapsed += time.perf_counter() - started
+            turns += 1
+    # Let the writer finish this batch so its CPU lands in this measurement
+    await asyncio.sleep(0.1)
+    return elapsed / turns, (time.process_time() - cpu_started) / turns
+
+
+async def run(args: argparse.Namespace) -> Dict[str, List[Tuple[float, float]]]:
+    client = ASGIClient(main.app)
+    await client.startup()
+    flows = build_schedule(load_flows(Path(args.corpus)), args.flows, seed=42)
+    results: Dict[str, List[Tuple[float, float]]] = {mode: [] for mode in MODES}
+    with tempfile.TemporaryDirectory() as tmp:
+        await time_turns(client, flows[:20])
+        # Modes take turns each round so drift on the machine hits them all alike
+        for _ in range(args.rounds):
+            for mode, setup in MODES.items():
+                setup(str(Path(tmp) / f"{mode.replace(' ', '_')}.log"))
+                results[mode].append(await time_turns(client, flows))
+        shutdown_logging()
+        logging.disable(logging.NOTSET)
+    await client.shutdown()
+    return results
+
+
+def main_cli() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark webhook cost with logging off, synchronous and queued")
+    parser.add_argument("--corpus", default=str(DEFAULT_CORPUS))
+    parser.add_argument("--flows", type=int, default=200, help="conversation flows per measurement")
+    parser.add_argument("--rounds", type=int, default=5)
+    parser.add_argument("--write-delay-ms", type=float, default=0.0, help="extra time every log file write takes")
+    args = parser.parse_args()
+    WRITE_DELAY["seconds"] = args.write_delay_ms / 1000.0
+
+    results = asyncio.run(run(args))
+    wall_off = statistics.median(wall for wall, _ in results["off"])
+    cpu_off = statistics.median(cpu for _, cpu in results["off"])
+    print(f"{'logging':<14}{'wall us':>10}{'vs off':>9}{'cpu us':>10}{'vs off':>9}")
+    for mode, samples in results.items():
+        wall = statistics.median(w for w, _ in samples)
+        cpu = statistics.median(c for _, c in samples)
+        print(f"{mode:<14}{wall * 1e6:>10.1f}{(wall - wall_off) / wall_off * 100:>+8.1f}%"
+              f"{cpu * 1e6:>10.1f}{(cpu - cpu_off) / cpu_off * 100:>+8.1f}%")
+
+
+if __name__ == "__main__":
+    main_cli()
@@ -0,0 +1,99 @@
+"""Compare normalize_item_name against the pre-index implementation.
+
+    python src/benchmarks/normalize_bench.py --rounds 20000
+"""
+import argparse
+import re
+import sys
+import time
+from pathlib import Path
+
+BENCH_DIR = Path(__file__).resolve().parent
+sys.path.insert(0, str(BENCH_DIR.parent / "backend"))
+
+from order_utils import VALID_MENU_ITEMS, normalize_item_name  # noqa: E402
+
+# Exact names, aliases, partial matches and misses in roughly chat-log proportions
+SAMPLES = [
+    "Chicken Biryani", "biryani", "pepsi", "Zinger Burger", "naan", "haleem",
+    "biriyani", "coke", "kabab", "kebab", "burger", "karahi", "zigar",
+    "chicken biryani plate", "naan bread", "large pepsi and", "lassi please", "bbq",
+    "pizza", "sushi", "pasta"
+]
+
+
+def legacy_normalize_item_name(item_name: str) -> str:
+    """normalize_item_name as it was before the alias index, including the alias dict it built on every call"""
+    item_name = item_name.lower().strip()
+    item_name = re.sub(r'\s+and$', '', item_name)
+    item_name = re.sub(r'\s+', '_', item_name)
+
+    item_mapping = {
+        # Basics
+        'biriyani': 'biryani', 'biryan': 'biryani', 'bryani': 'biryani',
+        'chickenbiryani': 'chicken_biryani',
+        'beefburger': 'beef_burger',
+
+        # Beverages
+        'cola': 'pepsi', 'cold_drink': 'pepsi', 'pepis': 'pepsi',
+        'coke': 'pepsi', 'soft_drink': 'pepsi', 'soda': 'pepsi',
+
+        # Kebabs
+        'seekh': 'seekh_kebab', 'seekh_kabab': 'seekh_kebab',
+        'chapli': 'chapli_kebab', 'chapli_kabab': 'chapli_kebab',
+        'shami': 'shami_kebab', 'shami_kabab': 'shami_kebab',
+
+        # Naan
+        'naan_bread': 'naan', 'tandoori': 'tandoori_naan',
+
+        # Special deals
+        'biryani_deal': 'biryani_combo', 'biryani_special': 'biryani_combo',
+        'bbq_combo': 'bbq_platter', 'bbq_deal': 'bbq_platter', 'bbq_special': 'bbq_platter',
+        'nihari_deal': 'nihari_combo', 'nihari_special': 'nihari_combo',
+        'burger_combo': 'zinger_combo', 'burger_deal': 'zinger_combo', 'zinger_deal': 'zinger_combo',
+        'dessert_deal': 'dessert_combo', 'sweet_combo': 'dessert_combo',
+
+        # Common variations
+        'zigar': 'zinger_burger', 'zinger': 'zinger_burger',
+        'chicken_karahi': 'karahi', 'mutton_karahi': 'karahi',
+        'ruhafza': 'rooh_afza', 'roohafza': 'rooh_afza'
+    }
+
+    if item_name in VALID_MENU_ITEMS:
+        return item_name
+    if item_name in item_mapping:
+        return item_mapping[item_name]
+    for valid_item in VALID_MENU_ITEMS:
+        if item_name in valid_item or valid_item in item_name:
+            return valid_item
+    return item_name
+
+
+def time_per_call(func, rounds: int) -> float:
+    started = time.perf_counter()
+    for _ in range(rounds):
+        for sample in SAMPLES:
+            func(sample)
+    return (time.perf_counter() - started) / (rounds * len(SAMPLES)) * 1e9
+
+
+def main_cli() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark normalize_item_name")
+    parser.add_argument("--rounds", type=int, default=20000)
+    args = parser.parse_args()
+
+    legacy_ns = time_per_call(legacy_normalize_item_name, args.rounds)
+    indexed_ns = time_per_call(normalize_item_name, args.rounds)
+    print(f"{'implementation':<16}{'ns/call':>10}")
+    print(f"{'legacy':<16}{legacy_ns:>10.0f}")
+    print(f"{'alias index':<16}{indexed_ns:>10.0f}")
+    print(f"speedup: {legacy_ns / indexed_ns:.1f}x")
+
+    changed = [(s, legacy_normalize_item_name(s), normalize_item_name(s)) for s in SAMPLES
+               if legacy_normalize_item_name(s) != normalize_item_name(s)]
+    for sample, old, new in changed:
+        print(f"differs: {sample!r}: legacy={old} indexed={new}")
+
+
+if __name__ == "__main__":
+    main_cli()
@@ -0,0 +1,170 @@
+"""Per-response cost of building and encoding webhook replies.
+
+Times a few builders from response_templates against the dict-per-call
+JSONResponse versions they replaced, for a static prompt, a prompt with one
+slot, an error and an order status card:
+
+    python src/benchmarks/response_bench.py --rounds 20000
+"""
+import argparse
+import sys
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from fastapi.responses import JSONResponse
+
+BENCH_DIR = Path(__file__).resolve().parent
+sys.path.insert(0, str(BENCH_DIR.parent / "backend"))
+
+import response_templates  # noqa: E402
+from response_templates import (  # noqa: E402
+    ask_for_order_items, error_response, feedback_prompt_phone_response, order_status_response
+)
+
+ORDER = {"order_id": 1042, "status": "On the way", "items": "2 x Chicken Biryani, 1 x Pepsi", "estimated_time": "20 mins"}
+
+
+def legacy_ask_for_order_items() -> JSONResponse:
+    return JSONResponse(
+        content={
+            "fulfillmentText": "🍽️ What would you like to order today? (Example: '2 chicken biryani and 1 pepsi')",
+            "payload": {
+                "richContent": [[{
+                    "type": "chips",
+                    "options": [
+                        {"text": "🍛 2 Chicken Biryani + 🥤 1 Pepsi", "intent": "Quick_Order"},
+                        {"text": "🍔 1 Beef Burger + 🥤 2 Colas", "intent": "Quick_Order"},
+                        {"text": "🍲 1 Mutton Karahi + 🫓 2 Naan", "intent": "Quick_Order"},
+                        {"text": "📝 Custom order...", "intent": "Custom_Order"}
+                    ]
+                }]]
+            }
+        }
+    )
+
+
+def legacy_feedback_prompt_phone_response(name: Optional[str] = None) -> JSONResponse:
+    greeting = f"Thanks, {name}! " if name else ""
+    return JSONResponse(
+        content={
+            "fulfillmentText": f"📱 {greeting}Can you share your phone number?",
+            "payload": {
+                "richContent": [[{
+                    "type": "chips",
+                    "options": [
+                        {"text": "⏩ Skip this step", "intent": "GiveCustomerFeedback - skip_phone"},
+                        {"text": "🏠 Main Menu", "intent": "Main_Menu"}
+                    ]
+                }]]
+            }
+        }
+    )
+
+
+def legacy_error_response(message: str, context: Any = None, status_code: int = 400) -> JSONResponse:
+    error_messages = {
+        "invalid_order_id": "❌ Please enter a valid Order ID (numbers only)",
+        "order_not_found": f"❌ Order #{context if context else 'N/A'} not found",
+        "order_creation_failed": f"❌ {context if context else 'Order creation failed'}",
+        "database_error": "⚠️ Temporary database issue",
+        "system_error": f"⚠️ Our systems are busy. {context if context else 'Please try again later.'}",
+        "item_not_found": f"❌ We don't have information about '{context.replace('_', ' ') if context and hasattr(context, 'replace') else 'that item'}'",
+        "support_ticket_failed": f"❌ Failed to create support ticket: {context if context else 'Unknown error'}",
+        "reservation_failed": f"❌ Reservation failed: {context if context else 'Please try again'}",
+        "feedback_failed": f"❌ Failed to submit feedback: {context if context else 'Please try again'}"
+    }
+    fulfillment_text = error_messages.get(message, "⚠️ Something went wrong")
+    if context is None and ':' in fulfillment_text:
+        fulfillment_text = fulfillment_text.split(':')[0]
+    return JSONResponse(
+        content={
+            "fulfillmentText": fulfillment_text,
+            "payload": {
+                "richContent": [[{
+                    "type": "chips",
+                    "options": [
+                        {"text": "🔄 Try again"},
+                        {"text": "📞 Contact support"}
+                    ]
+                }]]
+            }
+        },
+        status_code=status_code
+    )
+
+
+def legacy_order_status_response(order: Dict) -> JSONResponse:
+    status_emoji = {
+        'Pending': "⏳", 'Confirmed': "✅", 'Preparing': "👨‍🍳",
+        'On the way': "🛵", 'Delivered': "🎉", 'Cancelled': "❌"
+    }.get(order['status'], "🔄")
+    status_msg = {
+        'Pending': "⏳ Awaiting confirmation",
+        'Confirmed': "✅ Being prepared",
+        'Preparing': "👨‍🍳 Cooking in progress",
+        'On the way': f"🛵 Out for delivery (ETA: {order['estimated_time']})",
+        'Delivered': "🎉 Delivered",
+        'Cancelled': "❌ Cancelled"
+    }.get(order['status'], order['status'])
+    return JSONResponse(
+        content={
+            "fulfillmentText": f"📦 Order #{order['order_id']}\n{status_msg}\n🍽️ Items: {order['items']}",
+            "payload": {
+                "richContent": [[
+                    {
+                        "type": "info",
+                        "title": f"{status_emoji} Order #{order['order_id']} Status",
+                        "text": [
+                            f"Status: {status_msg}",
+                            f"Items: {order['items']}",
+                            f"Estimated: {order.get('estimated_time', '')}"
+                        ]
+                    },
+                    {
+                        "type": "chips",
+                        "options": [
+                            {"text": "🛒 New order", "intent": "Place_Order"},
+                            {"text": "📞 Support", "intent": "Contact_Support"}
+                        ]
+                    }
+                ]]
+            }
+        }
+    )
+
+
+# (label, legacy call, template call)
+CASES: List[Tuple[str, Callable[[], JSONResponse], Callable[[], JSONResponse]]] = [
+    ("static prompt", legacy_ask_for_order_items, ask_for_order_items),
+    ("one slot", lambda: legacy_feedback_prompt_phone_response("Ayesha"), lambda: feedback_prompt_phone_response("Ayesha")),
+    ("error", lambda: legacy_error_response("order_not_found", "1042"), lambda: error_response("order_not_found", "1042")),
+    ("status card", lambda: legacy_order_status_response(ORDER), lambda: order_status_response(ORDER)),
+]
+
+
+def time_per_call(func: Callable[[], JSONResponse], rounds: int) -> float:
+    started = time.perf_counter()
+    for _ in range(rounds):
+        func()
+    return (time.perf_counter() - started) / rounds * 1e9
+
+
+def main_cli() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark response building and encoding")
+    parser.add_argument("--rounds", type=int, default=20000)
+    args = parser.parse_args()
+
+    encoder = "orjson" if response_templates.orjson is not None else "json"
+    print(f"encoder: {encoder}")
+    print(f"{'response':<16}{'legacy ns':>12}{'template ns':>14}{'speedup':>10}")
+    for label, legacy, templated in CASES:
+        if legacy().body != templated().body:
+            print(f"differs: {label}")
+        legacy_ns = time_per_call(legacy, args.rounds)
+        templated_ns = time_per_call(templated, args.rounds)
+        print(f"{label:<16}{legacy_ns:>12.0f}{templated_ns:>14.0f}{legacy_ns / templated_ns:>9.1f}x")
+
+
+if __name__ == "__main__":
+    main_cli()
@@ -0,0 +1,193 @@
+"""Load test for the /orders/{id}/events Server-Sent Events streams.
+
+Opens many idle streams against main.app in-process (fake backend, no
+sockets), spread over a set of orders, then moves those orders through the
+kitchen with POST /orders/{id}/status. Reports the memory each idle stream
+holds, and how long a status change takes to reach every stream watching
+the order:
+
+    python src/benchmarks/sse_bench.py --subscribers 5000 --orders 100 --updates 3
+"""
+import argparse
+import asyncio
+import gc
+import json
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Dict, List, Optional
+
+BENCH_DIR = Path(__file__).resolve().parent
+sys.path.insert(0, str(BENCH_DIR.parent / "backend"))
+sys.path.insert(0, str(BENCH_DIR))
+
+import fake_backend  # noqa: E402
+
+backend = fake_backend.install()
+
+import database  # noqa: E402
+import main  # noqa: E402
+from order_events import order_event_hub  # noqa: E402
+from webhook_bench import ASGIClient, percentile  # noqa: E402
+
+# Status updates are kitchen-only; the benchmark plays the kitchen display
+KITCHEN_HEADERS = {"X-Kitchen-Token": "sse-bench"}
+main.API_ACCESS_CONFIG["kitchen_token"] = KITCHEN_HEADERS["X-Kitchen-Token"]
+
+# Statuses each order is moved through; the last one ends its streams
+STATUS_STEPS = ["Preparing", "On the way", "Delivered"]
+
+
+class Stream:
+    """One EventSource-like client: a GET /orders/{id}/events held open until the stream ends"""
+
+    def __init__(self, app, order_id: int):
+        self.app = app
+        self.order_id = order_id
+        self.status = 0
+        self.events: List[Dict] = []
+        self.received_at: List[float] = []
+        self.opened = asyncio.get_running_loop().create_future()
+        self.disconnect = asyncio.get_running_loop().create_future()
+        self._buffer = b""
+
+    async def run(self) -> None:
+        path = f"/orders/{self.order_id}/events"
+        scope = {
+            "type": "http",
+            "asgi": {"version": "3.0"},
+            "http_version": "1.1",
+            "method": "GET",
+            "scheme": "http",
+            "path": path,
+            "raw_path": path.encode(),
+            "query_string": b"",
+            "root_path": "",
+            "headers": [(b"accept", b"text/event-stream")],
+            "client": ("127.0.0.1", 50000),
+            "server": ("127.0.0.1", 5000)
+        }
+        requested = False
+
+        async def receive():
+            nonlocal requested
+            if not requested:
+                requested = True
+                return {"type": "http.request", "body": b"", "more_body": False}
+            await self.disconnect
+            return {"type": "http.disconnect"}
+
+        async def send(message):
+            if message["type"] == "http.response.start":
+                self.status = message["status"]
+            elif message["type"] == "http.response.body":
+                self._feed(message.get("body", b""))
+
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            if not self.opened.done():
+                self.opened.set_result(False)
+
+    def _feed(self, chunk: bytes) -> None:
+        self._buffer += chunk
+        while b"\n\n" in self._buffer:
+            message, self._buffer = self._buffer.split(b"\n\n", 1)
+            for line in message.split(b"\n"):
+                if line.startswith(b"data: "):
+                    self.events.append(json.loads(line[6:]))
+                    self.received_at.append(time.perf_counter())
+                    if not self.opened.done():
+                        self.opened.set_result(True)
+
+
+def current_bytes() -> int:
+    gc.collect()
+    return tracemalloc.get_traced_memory()[0]
+
+
+async def run(args: argparse.Namespace) -> Dict[str, float]:
+    client = ASGIClient(main.app)
+    await client.startup()
+    order_event_hub.max_subscribers = max(order_event_hub.max_subscribers, args.subscribers)
+    _, _, order_ids = database.create_orders([[("chicken_biryani", 2), ("pepsi", 1)]] * args.orders)
+
+    tracemalloc.start()
+    baseline = current_bytes()
+    started = time.perf_counter()
+    streams = [Stream(main.app, order_ids[i % len(order_ids)]) for i in range(args.subscribers)]
+    tasks = []
+    # Clients connect in waves, as after a deploy; each open reads the order once
+    for first in range(0, len(streams), args.connect_batch):
+        batch = streams[first:first + args.connect_batch]
+        tasks.extend(asyncio.create_task(stream.run()) for stream in batch)
+        await asyncio.gather(*(stream.opened for stream in batch))
+    open_seconds = time.perf_counter() - started
+    opened = [stream.status == 200 for stream in streams]
+    idle_bytes = current_bytes() - baseline
+    tracemalloc.stop()
+
+    watchers: Dict[int, List[Stream]] = {}
+    for stream in streams:
+        if stream.status == 200:
+            watchers.setdefault(stream.order_id, []).append(stream)
+
+    latencies: List[float] = []
+    missed = 0
+    for status in STATUS_STEPS[-args.updates:]:
+        for order_id in order_ids:
+            sent = time.perf_counter()
+            code, _ = await client.post_json(f"/orders/{order_id}/status", {"status": status}, KITCHEN_HEADERS)
+            if code != 200:
+                raise RuntimeError(f"status update for order {order_id} failed with {code}")
+            # Let every woken stream write its event before timing the next update
+            await asyncio.sleep(0)
+            for _ in range(20):
+                if all(stream.events[-1].get("status") == status for stream in watchers.get(order_id, ())):
+                    break
+                await asyncio.sleep(0.001)
+            for stream in watchers.get(order_id, ()):
+                if stream.events[-1].get("status") == status:
+                    latencies.append(stream.received_at[-1] - sent)
+                else:
+                    missed += 1
+
+    # Streams end by themselves once their order is delivered; disconnect any that did not
+    for stream in streams:
+        if not stream.disconnect.done():
+            stream.disconnect.set_result(None)
+    await asyncio.wait_for(asyncio.gather(*tasks), timeout=30)
+    await client.shutdown()
+    return {
+        "opened": sum(opened),
+        "open_seconds": open_seconds,
+        "bytes_per_stream": idle_bytes / max(sum(opened), 1),
+        "deliveries": len(latencies),
+        "missed": missed,
+        "p50_ms": percentile(latencies, 0.50) * 1000,
+        "p99_ms": percentile(latencies, 0.99) * 1000,
+        "max_ms": max(latencies, default=0.0) * 1000,
+        "open_after": order_event_hub.stats()["subscribers"]
+    }
+
+
+def main_cli() -> None:
+    parser = argparse.ArgumentParser(description="Load test order event streams")
+    parser.add_argument("--subscribers", type=int, default=5000, help="streams held open at once")
+    parser.add_argument("--orders", type=int, default=100, help="orders the streams are spread over")
+    parser.add_argument("--connect-batch", type=int, default=500, help="streams opened at a time")
+    parser.add_argument("--updates", type=int, default=len(STATUS_STEPS), choices=range(1, len(STATUS_STEPS) + 1),
+                        help="status changes per order; the last is always Delivered")
+    args = parser.parse_args()
+
+    result = asyncio.run(run(args))
+    print(f"streams opened:      {result['opened']} in {result['open_seconds']:.2f}s")
+    print(f"memory per stream:   {result['bytes_per_stream'] / 1024:.1f} KiB (idle, traced Python allocations)")
+    print(f"events delivered:    {result['deliveries']} ({result['missed']} missed)")
+    print(f"update to delivery:  p50 {result['p50_ms']:.2f} ms, p99 {result['p99_ms']:.2f} ms, max {result['max_ms']:.2f} ms")
+    print(f"streams still open:  {result['open_after']}")
+
+
+if __name__ == "__main__":
+    main_cli()
@@ -0,0 +1,236 @@
+"""Replay recorded Dialogflow webhook turns against main.app in-process.
+
+Drives the FastAPI app directly through ASGI (no server, no sockets) so the
+numbers reflect webhook handling only. Examples:
+
+    python src/benchmarks/webhook_bench.py --backend fake --flows 2000 --concurrency 32
+    python src/benchmarks/webhook_bench.py --backend fake --db-latency-ms 3 --output after.json --compare before.json
+    python src/benchmarks/webhook_bench.py --backend mysql --flows 200
+"""
+import argparse
+import asyncio
+import copy
+import json
+import platform
+import random
+import sys
+import time
+import uuid
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+BENCH_DIR = Path(__file__).resolve().parent
+sys.path.insert(0, str(BENCH_DIR.parent / "backend"))
+sys.path.insert(0, str(BENCH_DIR))
+
+DEFAULT_CORPUS = BENCH_DIR / "corpus" / "webhook_corpus.json"
+
+
+def percentile(samples: List[float], p: float) -> float:
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(p * len(ordered)))]
+
+
+class ASGIClient:
+    """Minimal in-process ASGI driver for JSON POSTs and app lifespan"""
+
+    def __init__(self, app):
+        self.app = app
+        self._lifespan_queue: Optional[asyncio.Queue] = None
+        self._lifespan_task: Optional[asyncio.Task] = None
+
+    async def startup(self) -> None:
+        self._lifespan_queue = asyncio.Queue()
+        started = asyncio.get_running_loop().create_future()
+
+        async def receive():
+            return await self._lifespan_queue.get()
+
+        async def send(message):
+            if message["type"] == "lifespan.startup.complete" and not started.done():
+                started.set_result(True)
+            elif message["type"] == "lifespan.startup.failed" and not started.done():
+                started.set_exception(RuntimeError(message.get("message", "startup failed")))
+
+        self._lifespan_task = asyncio.create_task(self.app({"type": "lifespan", "asgi": {"version": "3.0"}}, receive, send))
+        await self._lifespan_queue.put({"type": "lifespan.startup"})
+        await started
+
+    async def shutdown(self) -> None:
+        if self._lifespan_task is None:
+            return
+        await self._lifespan_queue.put({"type": "lifespan.shutdown"})
+        await self._lifespan_task
+
+    async def post_json(
+        self, path: str, payload: Dict[str, Any], headers: Optional[Dict[str, str]] = None
+    ) -> Tuple[int, bytes]:
+        body = json.dumps(payload).encode()
+        scope = {
+            "type": "http",
+            "asgi": {"version": "3.0"},
+            "http_version": "1.1",
+            "method": "POST",
+            "scheme": "http",
+            "path": path,
+            "raw_path": path.encode(),
+            "query_string": b"",
+            "root_path": "",
+            "headers": [(b"content-type", b"application/json"), (b"content-length", str(len(body)).encode())]
+            + [(name.lower().encode(), value.encode()) for name, value in (headers or {}).items()],
+            "client": ("127.0.0.1", 50000),
+            "server": ("127.0.0.1", 5000)
+        }
+        sent = False
+        status = 0
+        chunks: List[bytes] = []
+
+        async def receive():
+            nonlocal sent
+            if not sent:
+                sent = True
+                return {"type": "http.request", "body": body, "more_body": False}
+            await asyncio.sleep(3600)
+            return {"type": "http.disconnect"}
+
+        async def send(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            elif message["type"] == "http.response.body":
+                chunks.append(message.get("body", b""))
+
+        await self.app(scope, receive, send)
+        return status, b"".join(chunks)
+
+
+def load_flows(corpus_path: Path) -> List[Dict[str, Any]]:
+    with open(corpus_path, encoding="utf-8") as f:
+        return json.load(f)["flows"]
+
+
+def build_schedule(flows: List[Dict[str, Any]], count: int, seed: int) -> List[Dict[str, Any]]:
+    """Weighted, reproducible sequence of flows to replay"""
+    rng = random.Random(seed)
+    weights = [flow.get("weight", 1) for flow in flows]
+    return rng.choices(flows, weights=weights, k=count)
+
+
+async def run_flow(client: ASGIClient, flow: Dict[str, Any], samples: Dict[str, List[float]], errors: Dict[str, int]) -> None:
+    session_id = f"bench-{uuid.uuid4().hex[:12]}"
+    for turn in flow["turns"]:
+        payload = copy.deepcopy(turn["payload"])
+        payload["session"] = payload["session"].replace("SESSION", session_id)
+        payload["responseId"] = uuid.uuid4().hex
+        started = time.perf_counter()
+        status, body = await client.post_json("/webhook", payload)
+        elapsed = time.perf_counter() - started
+        samples.setdefault(turn["label"], []).append(elapsed)
+        if status >= 500 or not body:
+            errors[turn["label"]] = errors.get(turn["label"], 0) + 1
+
+
+async def run_benchmark(args: argparse.Namespace) -> Dict[str, Any]:
+    if args.backend == "fake":
+        import fake_backend
+        fake_backend.install(latency_ms=args.db_latency_ms)
+
+    import main
+
+    client = ASGIClient(main.app)
+    await client.startup()
+
+    flows = load_flows(Path(args.corpus))
+    samples: Dict[str, List[float]] = {}
+    errors: Dict[str, int] = {}
+
+    # Warm-up pass so one-time imports and cache loads don't skew the numbers
+    for flow in flows:
+        await run_flow(client, flow, {}, {})
+
+    schedule = build_schedule(flows, args.flows, args.seed)
+    semaphore = asyncio.Semaphore(args.concurrency)
+
+    async def guarded(flow):
+        async with semaphore:
+            await run_flow(client, flow, samples, errors)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(guarded(flow) for flow in schedule))
+    wall = time.perf_counter() - started
+    await client.shutdown()
+
+    def summarize(values: List[float], error_count: int) -> Dict[str, Any]:
+        return {
+            "count": len(values),
+            "errors": error_count,
+            "throughput_rps": round(len(values) / wall, 1) if wall else 0.0,
+            "mean_ms": round(sum(values) / len(values) * 1000, 3) if values else 0.0,
+            "p50_ms": round(percentile(values, 0.50) * 1000, 3),
+            "p95_ms": round(percentile(values, 0.95) * 1000, 3),
+            "p99_ms": round(percentile(values, 0.99) * 1000, 3)
+        }
+
+    all_samples = [value for values in samples.values() for value in values]
+    return {
+        "meta": {
+            "backend": args.backend,
+            "flows": args.flows,
+            "concurrency": args.concurrency,
+            "db_latency_ms": args.db_latency_ms,
+            "seed": args.seed,
+            "corpus": str(args.corpus),
+            "python": platform.python_version(),
+            "started_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "wall_seconds": round(wall, 3)
+        },
+        "overall": summarize(all_samples, sum(errors.values())),
+        "intents": {label: summarize(values, errors.get(label, 0)) for label, values in sorted(samples.items())}
+    }
+
+
+def print_report(results: Dict[str, Any], baseline: Optional[Dict[str, Any]] = None) -> None:
+    header = f"{'intent':<24}{'count':>7}{'err':>5}{'rps':>10}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}"
+    if baseline:
+        header += f"{'p95 Δ':>10}"
+    print(header)
+    rows = list(results["intents"].items()) + [("OVERALL", results["overall"])]
+    for label, row in rows:
+        line = (f"{label:<24}{row['count']:>7}{row['errors']:>5}{row['throughput_rps']:>10}"
+                f"{row['p50_ms']:>10.3f}{row['p95_ms']:>10.3f}{row['p99_ms']:>10.3f}")
+        if baseline:
+            old = baseline["overall"] if label == "OVERALL" else baseline["intents"].get(label)
+            if old and old["p95_ms"]:
+                line += f"{(row['p95_ms'] - old['p95_ms']) / old['p95_ms'] * 100:>+9.1f}%"
+        print(line)
+
+
+def main_cli() -> None:
+    parser = argparse.ArgumentParser(description="Replay Dialogflow webhook traffic against main.app")
+    parser.add_argument("--backend", choices=["fake", "mysql"], default="fake",
+                        help="in-memory fake database.py backend, or the MySQL instance in DB_CONFIG")
+    parser.add_argument("--corpus", default=str(DEFAULT_CORPUS))
+    parser.add_argument("--flows", type=int, default=1000, help="number of conversation flows to replay")
+    parser.add_argument("--concurrency", type=int, default=16, help="flows in flight at once")
+    parser.add_argument("--db-latency-ms", type=float, default=0.0, help="simulated round-trip time for the fake backend")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", help="write results as JSON to this path")
+    parser.add_argument("--compare", help="baseline results JSON to diff against")
+    args = parser.parse_args()
+
+    results = asyncio.run(run_benchmark(args))
+    baseline = None
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            baseline = json.load(f)
+    print_report(results, baseline)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+        print(f"Results written to {args.output}")
+
+
+if __name__ == "__main__":
+    main_cli()
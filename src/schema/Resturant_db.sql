@@ -14,7 +14,9 @@ CREATE TABLE IF NOT EXISTS orders (
     order_id INT AUTO_INCREMENT PRIMARY KEY,
     status ENUM('Pending','Confirmed','Preparing','On the way','Delivered','Cancelled') NOT NULL DEFAULT 'Pending',
     estimated_time VARCHAR(20) NOT NULL,
-    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    estimated_ready_at DATETIME NULL,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    INDEX idx_orders_status (status, order_id)
 ) ENGINE=InnoDB AUTO_INCREMENT=1000;
 
 
@@ -24,6 +26,7 @@ CREATE TABLE IF NOT EXISTS order_items (
     food_item VARCHAR(100) NOT NULL,
     quantity INT NOT NULL DEFAULT 1,
     created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    INDEX idx_order_items_order (order_id, id, food_item, quantity),
     FOREIGN KEY (order_id) REFERENCES orders(order_id) ON DELETE CASCADE
 ) ENGINE=InnoDB;
 
@@ -81,7 +84,8 @@ CREATE TABLE reservations (
     reservation_time TIME NOT NULL,
     status VARCHAR(20) DEFAULT 'confirmed',
     created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+    INDEX idx_reservations_slot (reservation_date, reservation_time, status)
 ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4;
 
 CREATE TABLE IF NOT EXISTS customer_feedback (
@@ -0,0 +1,7 @@
+import sys
+from pathlib import Path
+
+SRC_DIR = Path(__file__).resolve().parents[1]
+# Backend modules import each other by bare name, as they do when main.py is run from src/backend
+sys.path.insert(0, str(SRC_DIR / "backend"))
+sys.path.insert(0, str(SRC_DIR / "benchmarks"))
@@ -0,0 +1,32 @@
+import asyncio
+
+from fastapi.responses import JSONResponse
+
+from idempotency import IdempotencyCache, idempotency_key
+
+
+def _deliver(cache, req, answers):
+    async def answer():
+        answers.append(req)
+        return JSONResponse({"turn": len(answers)})
+
+    key, ttl_seconds = idempotency_key(req)
+    return asyncio.run(cache.run(key, ttl_seconds, answer))
+
+
+def test_repeated_text_without_response_id_runs_every_time():
+    cache, answers = IdempotencyCache(), []
+    req = {"session": "s", "queryResult": {"queryText": "add 1 naan"}}
+    first = _deliver(cache, req, answers)
+    second = _deliver(cache, req, answers)
+    assert len(answers) == 2
+    assert first.body != second.body
+
+
+def test_redelivered_response_id_replays_the_first_answer():
+    cache, answers = IdempotencyCache(), []
+    req = {"responseId": "abc", "session": "s", "queryResult": {"queryText": "add 1 naan"}}
+    first = _deliver(cache, req, answers)
+    second = _deliver(cache, req, answers)
+    assert len(answers) == 1
+    assert first.body == second.body
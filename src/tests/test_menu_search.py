@@ -0,0 +1,51 @@
+import pytest
+
+from fake_backend import load_seed_menu
+from menu_catalog import MenuCatalog
+from order_utils import ITEM_ALIASES, VALID_MENU_ITEMS
+
+
+@pytest.fixture(scope="module")
+def catalog():
+    catalog = MenuCatalog(load_seed_menu, aliases=ITEM_ALIASES)
+    catalog.refresh()
+    return catalog
+
+
+@pytest.mark.parametrize("name", sorted(VALID_MENU_ITEMS | set(ITEM_ALIASES.values())))
+def test_every_name_order_utils_emits_is_on_the_menu(catalog, name):
+    assert catalog.lookup_exact(name)["name"] == name
+
+
+@pytest.mark.parametrize("query, expected", [
+    ("chicken_biryani", "chicken_biryani"),
+    ("coke", "pepsi"),
+    ("roohafza", "rooh_afza"),
+    ("chiken_biryani", "chicken_biryani"),
+    ("shami_kabab", "shami_kebab"),
+    ("mutton_karai", "mutton_karahi"),
+    ("chocolate_lava_cake", "chocolate_lava"),
+    ("fruit_chaat", "fruit_chat"),
+])
+def test_exact_alias_and_typo_names_resolve(catalog, query, expected):
+    assert catalog.lookup(query)["name"] == expected
+
+
+@pytest.mark.parametrize("query", [
+    "chicken_karahi", "cheese_burger", "mutton_biryani", "chocolate_cake",
+    "chicken_burger", "beef_kebab", "beef_biryani",
+])
+def test_unknown_dish_sharing_a_word_is_not_substituted(catalog, query):
+    assert catalog.lookup(query) is None
+
+
+@pytest.mark.parametrize("query", ["burger", "beef_kebab"])
+def test_ambiguous_names_are_not_resolved(catalog, query):
+    # Several items are equally close, so none of them is picked
+    assert catalog.lookup(query) is None
+
+
+def test_unknown_dish_still_gets_ranked_suggestions(catalog):
+    names = [item["name"] for item, _ in catalog.search("cheese_burger", limit=3)]
+    assert names[0] == "beef_burger"
+    assert "zinger_burger" in names
@@ -0,0 +1,18 @@
+from metrics import Counter, MetricsRegistry
+
+
+def test_counter_metadata_uses_the_sample_name():
+    registry = MetricsRegistry()
+    shed = Counter("karachibites_admission_shed", "Shed turns", ["reason"], registry=registry)
+    shed.labels("queue_full").inc()
+
+    assert registry.render().splitlines() == [
+        "# HELP karachibites_admission_shed_total Shed turns",
+        "# TYPE karachibites_admission_shed_total counter",
+        'karachibites_admission_shed_total{reason="queue_full"} 1.0',
+    ]
+
+
+def test_counter_name_already_ending_in_total_is_kept():
+    registry = MetricsRegistry()
+    assert Counter("events_total", "Events", registry=registry).name == "events_total"
@@ -0,0 +1,32 @@
+import pytest
+
+import database
+import fake_backend
+
+
+@pytest.fixture(autouse=True)
+def backend(monkeypatch):
+    return fake_backend.install(monkeypatch=monkeypatch)
+
+
+@pytest.mark.parametrize("name", ["chicken_burger", "beef_kebab", "beef_biryani", "cheese_burger"])
+def test_unknown_dish_is_never_priced_as_another(name):
+    success, priced, _ = database.price_order_items([(name, 3)])
+    assert success
+    assert priced["lines"] == []
+    assert priced["total"] == 0
+    assert priced["unavailable"] == [name.replace("_", " ")]
+
+
+def test_exact_names_and_aliases_are_priced_and_merged():
+    success, priced, _ = database.price_order_items([("pepsi", 1), ("coke", 2), ("chicken_biryani", 1)])
+    assert success
+    assert priced["lines"] == [("pepsi", 3, 100.0), ("chicken_biryani", 1, 400.0)]
+    assert priced["total"] == 700.0
+
+
+def test_typo_is_reported_with_a_hint_instead_of_priced():
+    success, priced, _ = database.price_order_items([("chiken_biryani", 2)])
+    assert success
+    assert priced["lines"] == []
+    assert priced["unavailable"] == ["chiken biryani (did you mean chicken biryani?)"]
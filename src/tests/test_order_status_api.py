@@ -0,0 +1,62 @@
+import pytest
+from fastapi.testclient import TestClient
+
+import fake_backend
+import main
+
+TOKEN = "kitchen-secret"
+
+
+@pytest.fixture
+def client(monkeypatch):
+    backend = fake_backend.install(monkeypatch=monkeypatch)
+    monkeypatch.setitem(main.API_ACCESS_CONFIG, "kitchen_token", TOKEN)
+    ok, _, order_id = backend.create_order([("pepsi", 1)])
+    assert ok
+    return TestClient(main.app), order_id
+
+
+@pytest.mark.parametrize("headers", [{}, {"X-Kitchen-Token": "guess"}])
+def test_status_update_without_the_kitchen_token_is_refused(client, headers):
+    client, order_id = client
+    response = client.post(f"/orders/{order_id}/status", json={"status": "Delivered"}, headers=headers)
+    assert response.status_code == 403
+
+
+def test_status_update_with_the_kitchen_token(client):
+    client, order_id = client
+    response = client.post(f"/orders/{order_id}/status", json={"status": "Preparing"},
+                           headers={"X-Kitchen-Token": TOKEN})
+    assert response.status_code == 200
+
+
+def test_status_updates_are_refused_while_no_token_is_configured(client, monkeypatch):
+    client, order_id = client
+    monkeypatch.setitem(main.API_ACCESS_CONFIG, "kitchen_token", "")
+    response = client.post(f"/orders/{order_id}/status", json={"status": "Delivered"},
+                           headers={"X-Kitchen-Token": ""})
+    assert response.status_code == 403
+
+
+def test_order_lookup_returns_the_order_or_a_real_404(client):
+    client, order_id = client
+    response = client.get(f"/orders/{order_id}")
+    assert response.status_code == 200
+    assert response.json()["order_id"] == order_id
+    assert client.get("/orders/999999").status_code == 404
+
+
+def test_cors_is_only_granted_to_configured_origins(client, monkeypatch):
+    client, order_id = client
+    monkeypatch.setitem(main.API_ACCESS_CONFIG, "frontend_origins", ("https://karachibites.pk",))
+    allowed = client.get(f"/orders/{order_id}", headers={"Origin": "https://karachibites.pk"})
+    other = client.get(f"/orders/{order_id}", headers={"Origin": "https://evil.example"})
+    assert allowed.headers["access-control-allow-origin"] == "https://karachibites.pk"
+    assert "access-control-allow-origin" not in other.headers
+
+
+def test_the_site_is_served_by_the_app(client):
+    client, _ = client
+    response = client.get("/")
+    assert response.status_code == 200
+    assert "trackForm" in response.text
@@ -0,0 +1,172 @@
+from contextlib import contextmanager
+from datetime import datetime
+
+import pytest
+from fastapi.testclient import TestClient
+
+import database
+import main
+from kitchen_eta import KitchenETA
+from ttl_cache import TTLCache
+
+
+class FakeConnection:
+    """Just enough of a mysql.connector connection over an in-memory orders table"""
+
+    def __init__(self, statuses, fail_commit: bool):
+        self.statuses = statuses
+        self.fail_commit = fail_commit
+        self.pending = {}
+        self.rowcount = 0
+        self._row = None
+
+    def start_transaction(self):
+        self.pending = {}
+
+    def cursor(self):
+        return self
+
+    def execute(self, sql, params=()):
+        sql = " ".join(sql.split())
+        if sql.startswith("SELECT status FROM orders"):
+            status = self.statuses.get(params[0])
+            self._row = (status,) if status else None
+        elif sql.startswith("UPDATE orders SET status"):
+            status, order_id = params
+            # Like mysql.connector: changed rows, not matched rows
+            self.rowcount = int(self.statuses.get(order_id, status) != status)
+            self.pending[order_id] = status
+
+    def fetchone(self):
+        return self._row
+
+    def executemany(self, *args):
+        pass
+
+    def commit(self):
+        if self.fail_commit:
+            raise RuntimeError("commit failed")
+        self.statuses.update(self.pending)
+
+    def rollback(self):
+        self.pending = {}
+
+
+@pytest.fixture
+def kitchen(monkeypatch):
+    kitchen = KitchenETA()
+    placed = datetime.now()
+    for order_id, items in ((1, [("mutton_karahi", 4)]), (2, [("chicken_biryani", 2)])):
+        kitchen.bind(kitchen.place(items, now=placed), order_id)
+    monkeypatch.setattr(database, "kitchen_eta", kitchen)
+    published = []
+    monkeypatch.setattr(database, "publish_order_changes", lambda *args: published.append(args))
+    return kitchen, published
+
+
+def _connect(monkeypatch, fail_commit):
+    statuses = {1: "Confirmed", 2: "Confirmed"}
+
+    @contextmanager
+    def get_db_connection():
+        yield FakeConnection(statuses, fail_commit)
+    monkeypatch.setattr(database, "get_db_connection", get_db_connection)
+    return statuses
+
+
+def test_failed_commit_leaves_the_kitchen_model_untouched(kitchen, monkeypatch):
+    kitchen, published = kitchen
+    before = kitchen.ready_at(2)
+    _connect(monkeypatch, fail_commit=True)
+
+    success, _ = database.update_order_status(1, "Delivered")
+
+    assert not success
+    assert kitchen.ready_at(1) is not None
+    assert kitchen.ready_at(2) == before
+    assert published == []
+
+
+def test_committed_change_updates_the_model_and_publishes(kitchen, monkeypatch):
+    kitchen, published = kitchen
+    before = kitchen.ready_at(2)
+    _connect(monkeypatch, fail_commit=False)
+
+    success, _ = database.update_order_status(1, "Delivered")
+
+    assert success
+    assert kitchen.ready_at(1) is None
+    assert kitchen.ready_at(2) < before
+    assert published == [(1, "Delivered", [(2, kitchen.ready_at(2))])]
+
+
+@pytest.mark.parametrize("fail_commit", [True, False])
+def test_retimed_orders_leave_the_status_cache_only_after_commit(kitchen, monkeypatch, fail_commit):
+    cache = TTLCache(ttl_seconds=60)
+    cache.set(2, {"status": "Confirmed"})
+    monkeypatch.setattr(database, "order_status_cache", cache)
+    _connect(monkeypatch, fail_commit=fail_commit)
+
+    database.update_order_status(1, "Delivered")
+
+    assert (cache.get(2) is not None) == fail_commit
+
+
+def test_preview_matches_the_applied_retiming(kitchen):
+    kitchen, _ = kitchen
+    now = datetime.now()
+    preview = kitchen.preview_status_change(1, "Delivered", now)
+    assert preview and kitchen.ready_at(1) is not None
+    assert kitchen.status_changed(1, "Delivered", now) == preview
+
+
+def test_withdrawn_ticket_no_longer_delays_later_orders(kitchen):
+    kitchen, _ = kitchen
+    now = datetime.now()
+    before = kitchen.ready_at(2)
+    unwritten = kitchen.place([("mutton_karahi", 6)], now=now)
+    late = kitchen.place([("pepsi", 1)], now=now)
+    kitchen.bind(late, 3)
+    quoted = late.ready_at
+
+    retimed = kitchen.withdraw(unwritten, now=now)
+
+    assert retimed == [(3, late.ready_at)] and late.ready_at < quoted
+    assert kitchen.ready_at(2) == before
+    assert kitchen.withdraw(unwritten, now=now) == []
+
+
+@pytest.mark.parametrize("status", ["Delivered", "Cancelled"])
+def test_finished_orders_are_pruned_from_the_queue(kitchen, status):
+    kitchen, _ = kitchen
+    kitchen.status_changed(1, status)
+    kitchen.status_changed(2, status)
+    assert kitchen.ready_at(1) is None and kitchen.ready_at(2) is None
+    assert kitchen.stats()["open_orders"] == 0
+    assert kitchen.status_changed(2, status) == []
+
+
+def test_same_status_twice_succeeds_and_is_published_both_times(kitchen, monkeypatch):
+    kitchen, published = kitchen
+    statuses = _connect(monkeypatch, fail_commit=False)
+
+    assert database.update_order_status(2, "Preparing") == (True, "Order status updated successfully")
+    assert database.update_order_status(2, "Preparing") == (True, "Order status updated successfully")
+
+    assert statuses[2] == "Preparing"
+    assert [args[:2] for args in published] == [(2, "Preparing"), (2, "Preparing")]
+
+
+def test_unknown_order_is_not_found(kitchen, monkeypatch):
+    _connect(monkeypatch, fail_commit=False)
+    assert database.update_order_status(99, "Preparing") == (False, "order_not_found")
+
+
+def test_posting_the_same_status_twice_returns_200_both_times(kitchen, monkeypatch):
+    _connect(monkeypatch, fail_commit=False)
+    monkeypatch.setitem(main.API_ACCESS_CONFIG, "kitchen_token", "kitchen-secret")
+    client = TestClient(main.app)
+    for _ in range(2):
+        response = client.post("/orders/2/status", json={"status": "Preparing"},
+                               headers={"X-Kitchen-Token": "kitchen-secret"})
+        assert response.status_code == 200
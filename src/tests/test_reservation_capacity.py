@@ -0,0 +1,40 @@
+from datetime import date, datetime, time, timedelta
+
+import pytest
+
+from fake_backend import FakeBackend, FakeReservationCapacity
+
+DAY = date.today() + timedelta(days=1)
+
+
+@pytest.fixture
+def capacity():
+    capacity = FakeReservationCapacity(FakeBackend())
+    # One four-top: a single party of four fills the room
+    capacity.config["tables"] = {4: 1}
+    return capacity
+
+
+def test_half_hour_booking_shares_the_full_seating(capacity):
+    assert capacity.book(DAY, time(19, 0), 4)[0]
+    assert capacity.book(DAY, time(19, 30), 4) == (False, "slot_full", None)
+    assert capacity.book(DAY, time(19, 15), 2) == (False, "slot_full", None)
+
+
+def test_next_seating_is_still_bookable(capacity):
+    assert capacity.book(DAY, time(19, 30), 4)[0]
+    assert capacity.book(DAY, time(20, 0), 4)[0]
+
+
+def test_seating_snaps_to_the_slot_grid(capacity):
+    assert capacity.seating(time(19, 45)) == time(19, 0)
+    capacity.config["slot_minutes"] = 90
+    assert capacity.seating(time(13, 45)) == time(13, 30)
+    assert capacity.seating(time(13, 15)) == time(12, 0)
+
+
+def test_next_available_skips_the_full_seating(capacity):
+    capacity.book(DAY, time(19, 30), 4)
+    slots = capacity.next_available(4, datetime.combine(DAY, time(19, 0)), count=1)
+    assert [slot.time() for slot in slots] == [time(20, 0)]
+
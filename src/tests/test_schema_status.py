@@ -0,0 +1,58 @@
+import pytest
+
+import database
+
+TABLES = ("reservations", "customer_feedback", "orders", "support_tickets")
+
+
+@pytest.fixture
+def checks(monkeypatch):
+    """Replace the per-table checks with a switch and count validation runs"""
+    state = {"up": False, "runs": 0}
+
+    def check() -> bool:
+        state["runs"] += 1
+        return state["up"]
+
+    for name in ("verify_reservations_table", "verify_feedback_table",
+                 "verify_orders_table", "verify_support_tickets_table"):
+        monkeypatch.setattr(database, name, check)
+    monkeypatch.setattr(database, "_schema_status", {})
+    monkeypatch.setattr(database, "_schema_retry", {"at": 0.0, "delay": 0.0})
+    return state
+
+
+def test_failed_validation_is_retried_after_backoff(checks, monkeypatch):
+    clock = [1000.0]
+    monkeypatch.setattr(database.time, "monotonic", lambda: clock[0])
+
+    assert not database.validate_schema()["ok"]
+    assert checks["runs"] == len(TABLES)
+
+    # Still inside the backoff: the failure is served without re-checking
+    checks["up"] = True
+    assert not database.is_table_ready("reservations")
+    assert checks["runs"] == len(TABLES)
+
+    clock[0] += database.SCHEMA_RETRY_CONFIG["initial_seconds"]
+    assert database.is_table_ready("reservations")
+    assert checks["runs"] == 2 * len(TABLES)
+
+
+def test_backoff_doubles_up_to_the_maximum(checks, monkeypatch):
+    clock = [1000.0]
+    monkeypatch.setattr(database.time, "monotonic", lambda: clock[0])
+    delays = []
+    for _ in range(6):
+        database.get_schema_status()
+        delays.append(database._schema_retry["delay"])
+        clock[0] = database._schema_retry["at"]
+    assert delays == [2.0, 4.0, 8.0, 16.0, 30.0, 30.0]
+
+
+def test_successful_validation_is_cached(checks):
+    checks["up"] = True
+    assert database.validate_schema()["ok"]
+    database.get_schema_status()
+    database.is_table_ready("orders")
+    assert checks["runs"] == len(TABLES)
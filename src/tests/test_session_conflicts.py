@@ -0,0 +1,76 @@
+import asyncio
+
+import pytest
+
+import main
+from conversation import new_session, session_backend
+from session_backend import MemorySessionBackend, SessionCodec, SessionConflictError
+
+
+def _request(session_id: str):
+    return {"session": f"projects/x/agent/sessions/{session_id}", "queryResult": {"queryText": "that's all"}}
+
+
+async def _other_worker_saves(session_id: str) -> None:
+    other = await session_backend.load(session_id)
+    other.state["feedback"]["name"] = "Ayesha"
+    await session_backend.save(other)
+
+
+def test_save_merged_keeps_both_workers_changes():
+    async def scenario():
+        backend = MemorySessionBackend(SessionCodec(new_session), idle_ttl_seconds=60)
+        first = await backend.load("s")
+        second = await backend.load("s")
+        second.state["feedback"]["name"] = "Ayesha"
+        await backend.save(second)
+        first.state["cart"] = [["pepsi", 1]]
+        with pytest.raises(SessionConflictError):
+            await backend.save(first)
+        assert await backend.save_merged(first)
+        return (await backend.load("s")).state
+
+    state = asyncio.run(scenario())
+    assert state["cart"] == [["pepsi", 1]]
+    assert state["feedback"]["name"] == "Ayesha"
+
+
+@pytest.fixture
+def dispatch(monkeypatch):
+    calls = []
+
+    def install(committed: bool):
+        async def fake_dispatch(turn):
+            calls.append(turn)
+            if len(calls) == 1:
+                await _other_worker_saves(turn.session_id)
+            turn.session["context"] = f"turn-{len(calls)}"
+            turn.committed = committed
+            return "answer"
+
+        monkeypatch.setattr(main.router, "dispatch", fake_dispatch)
+        return calls
+
+    return install
+
+
+def _stored_state(session_id: str):
+    return asyncio.run(session_backend.load(session_id)).state
+
+
+def test_committed_turn_is_not_rerun_and_its_changes_are_merged(dispatch):
+    calls = dispatch(committed=True)
+    assert asyncio.run(main.answer_turn(_request("committed"))) == "answer"
+    assert len(calls) == 1
+    state = _stored_state("committed")
+    assert state["context"] == "turn-1"
+    assert state["feedback"]["name"] == "Ayesha"
+
+
+def test_uncommitted_turn_is_rerun_on_the_newer_session(dispatch):
+    calls = dispatch(committed=False)
+    assert asyncio.run(main.answer_turn(_request("rerun"))) == "answer"
+    assert len(calls) == 2
+    state = _stored_state("rerun")
+    assert state["context"] == "turn-2"
+    assert state["feedback"]["name"] == "Ayesha"
@@ -0,0 +1,45 @@
+import time
+
+from write_behind import WriteBehindQueue
+
+
+class Flusher:
+    def __init__(self):
+        self.up = False
+        self.written = []
+
+    def __call__(self, records):
+        if not self.up:
+            raise RuntimeError("database down")
+        self.written.extend(records)
+
+
+def _wait_for(condition, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not condition() and time.monotonic() < deadline:
+        time.sleep(0.01)
+    return condition()
+
+
+def test_spill_is_replayed_after_restart_without_new_writes(tmp_path):
+    spill_path = str(tmp_path / "spill.jsonl")
+    flusher = Flusher()
+
+    # First run: the database is down, so stopping spills the queued record
+    first = WriteBehindQueue({"feedback": flusher}, flush_interval=0.01, spill_path=spill_path)
+    first.start()
+    first.enqueue("feedback", {"text": "great biryani"})
+    first.stop()
+    assert flusher.written == []
+
+    # Restart while the database is still down, then it recovers; nothing new is enqueued
+    second = WriteBehindQueue({"feedback": flusher}, flush_interval=0.01, spill_path=spill_path,
+                              replay_interval=0.05)
+    second.start()
+    try:
+        assert _wait_for(lambda: second.stats()["replay_attempts"] >= 1)
+        flusher.up = True
+        assert _wait_for(lambda: flusher.written == [{"text": "great biryani"}])
+        assert not second._spill_pending()
+    finally:
+        second.stop()